@@ -2,10 +2,20 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import time
 from utils.scoring import ResumeJobScorer
-import docx
-import PyPDF2
+from utils.cache import PreprocessCache, content_hash
+from utils.batch import default_workers, iter_batch_analysis, result_row
+from utils.catalog import JobCatalog, read_postings
+from utils.metrics import Metrics
+from utils.incremental import IncrementalAnalyzer
+from utils.sections import DEFAULT_SECTION_WEIGHTS
+from utils.dedup import DEFAULT_THRESHOLD, NearDuplicateIndex
+from utils.archive import count_resumes, is_archive, iter_uploads
+from utils.semantic import SEMANTIC_MODEL_ENV
+from utils import extraction
 import io
+import os
 import base64
 
 # Page configuration
@@ -40,75 +50,88 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def read_pdf(file):
-    """Extract text from PDF file"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        st.error(f"Error reading PDF: {e}")
-        return ""
+# Columns shown in the batch results table
+BATCH_TABLE_COLUMNS = ['filename', 'overall_score', 'skill_match_score',
+                       'matched_skills_count', 'missing_skills_count', 'duplicate_of']
+
+# Rows per page of the batch results table
+BATCH_PAGE_SIZES = [25, 50, 100, 250]
+
+# Rows of the results table shown while a batch is still running
+PREVIEW_ROWS = 20
 
-def read_docx(file):
-    """Extract text from DOCX file"""
+# Batches with more resumes than this are charted as a histogram and top-N bars
+AGGREGATE_CHART_THRESHOLD = 50
+TOP_N_CHART = 25
+
+# Errors listed above the results; the rest are counted
+MAX_ERRORS_SHOWN = 20
+
+@st.cache_data(show_spinner="Extracting text...", max_entries=64)
+def extract_upload(name, data, mime_type):
+    """(text, error) for an upload; cached by content, so reruns don't extract it again"""
     try:
-        doc = docx.Document(file)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        # A single upload has every core to itself, so long PDFs are read page-parallel
+        return extraction.extract_text(name, data, mime_type, workers=default_workers()), None
     except Exception as e:
-        st.error(f"Error reading DOCX: {e}")
-        return ""
+        return "", str(e)
+
+def read_uploaded_file(uploaded_file):
+    """Extract text from an uploaded TXT, PDF or DOCX file"""
+    text, error = extract_upload(uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)
+    if error:
+        st.error(f"Error reading {uploaded_file.name}: {error}")
+    return text
+
+@st.cache_resource(show_spinner=False)
+def get_scorer():
+    """One scorer and preprocessing cache shared by every session (the scorer is thread-safe)"""
+    # An offline-fitted LSA model adds a semantic component to every score
+    return ResumeJobScorer(cache=PreprocessCache(), semantic=os.environ.get(SEMANTIC_MODEL_ENV) or None)
 
 def main():
     # Header
     st.markdown('<h1 class="main-header">📊 Resume-Job Match Scorer</h1>', unsafe_allow_html=True)
     
-    # Initialize scorer
-    if 'scorer' not in st.session_state:
-        st.session_state.scorer = ResumeJobScorer()
-    
     # Sidebar
     st.sidebar.title("Navigation")
     app_mode = st.sidebar.selectbox("Choose Mode", 
-                                   ["Single Analysis", "Batch Analysis", "About"])
+                                   ["Single Analysis", "Batch Analysis", "Job Matching", "About"])
     
     if app_mode == "Single Analysis":
         single_analysis()
     elif app_mode == "Batch Analysis":
         batch_analysis()
+    elif app_mode == "Job Matching":
+        job_matching()
     else:
         about_page()
 
+def resume_input():
+    """Resume text area or file upload; returns the resume text"""
+    st.subheader("📝 Resume Input")
+    resume_option = st.radio("Choose resume input method:", 
+                           ["Text Input", "File Upload"])
+    
+    resume_text = ""
+    if resume_option == "Text Input":
+        resume_text = st.text_area("Paste your resume text here:", 
+                                 height=200,
+                                 placeholder="Paste your resume content here...")
+    else:
+        uploaded_file = st.file_uploader("Upload Resume", 
+                                       type=['txt', 'pdf', 'docx'],
+                                       help="Supported formats: TXT, PDF, DOCX")
+        if uploaded_file:
+            resume_text = read_uploaded_file(uploaded_file)
+    return resume_text
+
 def single_analysis():
     """Single resume-job analysis mode"""
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("📝 Resume Input")
-        resume_option = st.radio("Choose resume input method:", 
-                               ["Text Input", "File Upload"])
-        
-        resume_text = ""
-        if resume_option == "Text Input":
-            resume_text = st.text_area("Paste your resume text here:", 
-                                     height=200,
-                                     placeholder="Paste your resume content here...")
-        else:
-            uploaded_file = st.file_uploader("Upload Resume", 
-                                           type=['txt', 'pdf', 'docx'],
-                                           help="Supported formats: TXT, PDF, DOCX")
-            if uploaded_file:
-                if uploaded_file.type == "text/plain":
-                    resume_text = str(uploaded_file.read(), "utf-8")
-                elif uploaded_file.type == "application/pdf":
-                    resume_text = read_pdf(uploaded_file)
-                elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                    resume_text = read_docx(uploaded_file)
+        resume_text = resume_input()
     
     with col2:
         st.subheader("💼 Job Description")
@@ -116,14 +139,93 @@ def single_analysis():
                                      height=200,
                                      placeholder="Paste the job description here...")
     
+    # Per-session editing state; unchanged paragraphs and job text are not reprocessed
+    if 'incremental' not in st.session_state:
+        st.session_state.incremental = IncrementalAnalyzer(get_scorer())
+    analyzer = st.session_state.incremental
+    
+    # Streamlit text areas only send their text on Ctrl+Enter or blur, with no
+    # keystroke events to debounce, so live analysis re-scores on each commit
+    live = st.toggle("Live analysis", value=False,
+                     help="Re-score without pressing Analyze each time the resume or job text is "
+                          "committed. Text boxes send their text on Ctrl+Enter or when you click "
+                          "outside them, not on every keystroke, so scores update then.")
+    
     # Analysis button
-    if st.button("🔍 Analyze Match", type="primary"):
+    if st.button("🔍 Analyze Match", type="primary") or (live and resume_text and job_description):
         if resume_text and job_description:
+            previous = analyzer.previous[2] if analyzer.previous else None
             with st.spinner("Analyzing your resume and job description..."):
-                results = st.session_state.scorer.analyze_match(resume_text, job_description)
-                display_results(results)
+                results = analyzer.analyze(resume_text, job_description)
+            render_score_changes(analyzer, previous, results)
+            display_results(results)
+            st.session_state.analyzed = pair_key(resume_text, job_description)
         else:
             st.warning("Please provide both resume and job description.")
+    
+    # Segmenting and scoring sections is a separate pass, so it only runs once the
+    # breakdown is switched on; the match is kept so the sliders only re-weight it
+    key = pair_key(resume_text, job_description) if resume_text and job_description else None
+    if key and st.session_state.get('analyzed') == key and st.toggle("🧩 Section breakdown", key="show_sections"):
+        sections = st.session_state.get('sections')
+        if sections is None or sections[0] != key:
+            sections = st.session_state.sections = (key, get_scorer().section_match(resume_text, job_description))
+        render_section_breakdown(sections[1])
+
+def pair_key(resume_text, job_description):
+    """Hash of a resume/job pair; hashing each text first keeps their boundary unambiguous"""
+    return content_hash(content_hash(resume_text) + content_hash(job_description))
+
+def render_section_breakdown(match):
+    """Per-section scores with adjustable section weights and similarity/skill blend"""
+    st.caption("Weights apply to the sections found in the resume and are renormalized over them; "
+               "skills count in every section with a non-zero weight")
+    weights = {}
+    columns = st.columns(len(match.sections))
+    for column, name in zip(columns, match.sections):
+        weights[name] = column.slider(name.title(), 0.0, 1.0,
+                                      DEFAULT_SECTION_WEIGHTS.get(name, 0.0), 0.05,
+                                      key=f"section_weight_{name}")
+    blend = get_scorer().blend
+    # The semantic share (if any) stays fixed; the slider splits the rest
+    semantic_share = blend.get('semantic', 0.0) if match.semantic is not None else 0.0
+    similarity_share = st.slider("Similarity share of the overall score", 0.0, 1.0 - semantic_share,
+                                 blend['similarity'], 0.05, key="section_blend")
+    
+    report = match.overall(weights, {'similarity': similarity_share, 'semantic': semantic_share,
+                                     'skills': 1 - semantic_share - similarity_share})
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Section-weighted overall", f"{report['overall_score']}%")
+    col2.metric("Section-weighted similarity", f"{report['similarity_score']}%")
+    col3.metric("Skill match in weighted sections", f"{report['skill_match_score']}%")
+    
+    st.dataframe(pd.DataFrame([{
+        'Section': row['section'].title(),
+        'Weight': row['weight'],
+        'Similarity': row['similarity_score'],
+        'Skill match': row['skill_match_score'],
+        'Skills': ', '.join(row['skills']),
+    } for row in report['section_scores']]), use_container_width=True, hide_index=True)
+
+def render_score_changes(analyzer, previous, results):
+    """Show how the score moved since the last analysis and which edits moved it"""
+    if previous is None or not analyzer.changes:
+        return
+    
+    st.metric("Overall Match Score", f"{results['overall_score']}%",
+              delta=f"{results['overall_score'] - previous['overall_score']:+.2f} pts since last analysis")
+    st.caption(f"Reprocessed {analyzer.reprocessed} of "
+               f"{analyzer.reprocessed + analyzer.reused} paragraphs")
+    
+    changes_df = pd.DataFrame([{
+        'Change': change['change'],
+        'Paragraph': change['paragraph'],
+        'Score impact': change['score_delta'],
+        'Skills gained': ', '.join(change['skills_gained']),
+        'Skills lost': ', '.join(change['skills_lost']),
+    } for change in analyzer.changes])
+    st.markdown("**What moved the score** (each edit applied on its own)")
+    st.dataframe(changes_df, use_container_width=True, hide_index=True)
 
 def display_results(results):
     """Display analysis results"""
@@ -164,12 +266,17 @@ def display_results(results):
     
     with col1:
         # Score comparison chart
+        labels = ['Overall Match', 'Skill Match']
+        values = [results['overall_score'], results['skill_match_score']]
+        if 'semantic_score' in results:
+            labels.append('Semantic Match')
+            values.append(results['semantic_score'])
         fig = go.Figure()
         fig.add_trace(go.Bar(
-            y=['Overall Match', 'Skill Match'],
-            x=[results['overall_score'], results['skill_match_score']],
+            y=labels,
+            x=values,
             orientation='h',
-            marker_color=['#1f77b4', '#ff7f0e']
+            marker_color=['#1f77b4', '#ff7f0e', '#2ca02c'][:len(values)]
         ))
         fig.update_layout(
             title="Match Scores Comparison",
@@ -224,6 +331,7 @@ def batch_analysis():
     st.info("""
     Upload multiple resumes and a job description to analyze them in batch.
     This feature is useful for recruiters or when comparing multiple candidates.
+    ZIP and TAR archives of resumes are unpacked one file at a time as they are analyzed.
     """)
     
     # Job description input
@@ -233,66 +341,307 @@ def batch_analysis():
     
     # Multiple resume upload
     uploaded_files = st.file_uploader("Upload Multiple Resumes", 
-                                    type=['txt', 'pdf', 'docx'],
+                                    type=['txt', 'pdf', 'docx', 'zip', 'tar', 'gz', 'tgz', 'bz2', 'xz'],
                                     accept_multiple_files=True,
-                                    help="Select multiple files to analyze")
+                                    help="Select multiple files, or ZIP/TAR archives of resumes")
+    
+    workers = st.sidebar.number_input("Worker processes", min_value=1,
+                                      max_value=default_workers(),
+                                      value=default_workers(),
+                                      help="Number of processes used to analyze resumes in parallel")
+    collect_diagnostics = st.sidebar.checkbox("Collect diagnostics", value=False,
+                                              help="Record per-stage timings, document sizes, "
+                                                   "cache hit rates and errors for the batch")
+    skip_identical = st.sidebar.checkbox("Skip identical files", value=True,
+                                         help="Analyze byte-identical files once and reuse the "
+                                              "score for every copy")
+    group_duplicates = st.sidebar.checkbox("Group near-duplicates", value=True,
+                                           help="Score each group of near-identical resumes once "
+                                                "and reuse the score for every copy")
+    duplicate_threshold = st.sidebar.slider("Near-duplicate similarity", 0.5, 1.0, DEFAULT_THRESHOLD, 0.05,
+                                            disabled=not group_duplicates,
+                                            help="Estimated share of overlapping word sequences "
+                                                 "above which two resumes count as copies")
     
     if st.button("Analyze Batch", type="primary") and job_description and uploaded_files:
         results = []
+        errors = []
         
-        with st.spinner("Analyzing multiple resumes..."):
-            for uploaded_file in uploaded_files:
-                # Extract text based on file type
-                resume_text = ""
-                try:
-                    if uploaded_file.type == "text/plain":
-                        resume_text = str(uploaded_file.read(), "utf-8")
-                    elif uploaded_file.type == "application/pdf":
-                        resume_text = read_pdf(uploaded_file)
-                    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                        resume_text = read_docx(uploaded_file)
-                    
-                    # Analyze
-                    analysis = st.session_state.scorer.analyze_match(resume_text, job_description)
-                    results.append({
-                        'filename': uploaded_file.name,
-                        'overall_score': analysis['overall_score'],
-                        'skill_match_score': analysis['skill_match_score'],
-                        'matched_skills_count': len(analysis['matched_skills']),
-                        'missing_skills_count': len(analysis['missing_skills'])
-                    })
-                    
-                except Exception as e:
-                    st.error(f"Error processing {uploaded_file.name}: {e}")
+        # Instrument this run only, through a copy that shares the scorer's resources
+        scorer = get_scorer().with_metrics(Metrics()) if collect_diagnostics else get_scorer()
         
-        # Display batch results
-        if results:
-            df = pd.DataFrame(results)
-            st.subheader("Batch Analysis Results")
-            
-            # Sort by overall score
-            df = df.sort_values('overall_score', ascending=False)
-            
-            # Display table
-            st.dataframe(df, use_container_width=True)
-            
-            # Visualization
-            col1, col2 = st.columns(2)
+        uploads = [(f.name, f, f.type) for f in uploaded_files]
+        # TAR archives can't be counted without reading them, so their batches have no total
+        counts = [count_resumes(name, f) if is_archive(name) else 1 for name, f, _ in uploads]
+        total = None if None in counts else sum(counts)
+        
+        progress = st.progress(0.0, text="Analyzing multiple resumes...")
+        error_slot = st.empty()
+        table_slot = st.empty()
+        chart_slot = st.empty()
+        
+        # Archive members are read lazily, as the workers take them
+        files = iter_uploads(uploads)
+        last_render = 0.0
+        
+        dedup = NearDuplicateIndex(duplicate_threshold) if group_duplicates else None
+        
+        for done, result in enumerate(iter_batch_analysis(files, job_description,
+                                                          scorer=scorer,
+                                                          workers=workers,
+                                                          dedup=dedup,
+                                                          skip_identical=skip_identical), start=1):
+            if result['error']:
+                errors.append(f"Error processing {result['filename']}: {result['error']}")
+            else:
+                row = result_row(result)
+                results.append({column: row[column] for column in BATCH_TABLE_COLUMNS})
             
-            with col1:
-                fig = px.bar(df, x='filename', y='overall_score',
-                           title="Overall Match Scores by Resume",
-                           color='overall_score',
-                           color_continuous_scale='Viridis')
-                fig.update_layout(xaxis_title="Resume", yaxis_title="Score (%)")
-                st.plotly_chart(fig, use_container_width=True)
+            if total:
+                progress.progress(min(done / total, 1.0), text=f"Analyzed {done}/{total} resumes")
+            else:
+                progress.progress(0.0, text=f"Analyzed {done} resumes")
             
-            with col2:
-                fig = px.scatter(df, x='overall_score', y='skill_match_score',
-                               size='matched_skills_count', color='filename',
-                               title="Overall Score vs Skill Match Score",
-                               hover_data=['filename'])
-                st.plotly_chart(fig, use_container_width=True)
+            # Redraw at most twice a second while results stream in
+            if time.monotonic() - last_render > 0.5:
+                last_render = time.monotonic()
+                if errors:
+                    error_slot.error(error_summary(errors))
+                if results:
+                    render_batch_preview(pd.DataFrame(results), table_slot, chart_slot, key=done)
+        
+        progress.empty()
+        error_slot.empty()
+        table_slot.empty()
+        chart_slot.empty()
+        
+        # Kept so paging and sorting the table rerun the script without re-analyzing
+        st.session_state.batch = {'rows': results, 'errors': errors, 'metrics': scorer.metrics}
+        first_batch_page()
+    
+    batch = st.session_state.get('batch')
+    if batch:
+        if batch['errors']:
+            st.error(error_summary(batch['errors']))
+        if batch['rows']:
+            render_batch_results(pd.DataFrame(batch['rows']))
+        if batch['metrics'] is not None:
+            render_diagnostics(batch['metrics'])
+
+def error_summary(errors):
+    """The first few batch errors, plus a count of the rest"""
+    shown = "\n\n".join(errors[:MAX_ERRORS_SHOWN])
+    if len(errors) > MAX_ERRORS_SHOWN:
+        shown += f"\n\n... and {len(errors) - MAX_ERRORS_SHOWN} more"
+    return shown
+
+def sort_batch_results(df, column='overall_score', ascending=False):
+    """Sort results, keeping each group's copies right below the resume that was scored"""
+    df = df.assign(group=df['duplicate_of'].fillna(df['filename']))
+    if column == 'overall_score':
+        df = df.sort_values([column, 'group', 'duplicate_of'], ascending=[ascending, True, True],
+                            na_position='first', kind='mergesort')
+    else:
+        df = df.sort_values([column, 'filename'], ascending=[ascending, True], kind='mergesort')
+    return df.drop(columns='group')
+
+def render_batch_preview(df, table_slot, chart_slot, key):
+    """Best results so far and charts, redrawn while a batch is running"""
+    with table_slot.container():
+        st.subheader("Batch Analysis Results")
+        st.caption(f"Top {min(PREVIEW_ROWS, len(df))} of {len(df)} resumes so far")
+        st.dataframe(sort_batch_results(df).head(PREVIEW_ROWS), use_container_width=True, hide_index=True)
+    with chart_slot.container():
+        render_batch_charts(df, key)
+
+def render_batch_results(df):
+    """Paginated, sortable results table and charts for a finished batch"""
+    copies = df['duplicate_of'].notna()
+    
+    st.subheader("Batch Analysis Results")
+    if copies.any():
+        st.caption(f"{copies.sum()} identical or near-duplicate resumes reused the score of the resume "
+                   f"named in 'duplicate_of'; charts show each group once")
+    
+    # Sorting and paging happen here, so the browser only ever receives one page
+    col1, col2, col3, col4 = st.columns(4)
+    sort_column = col1.selectbox("Sort by", BATCH_TABLE_COLUMNS, index=1, key="batch_sort",
+                                 on_change=first_batch_page)
+    descending = col2.toggle("Descending", value=True, key="batch_descending", on_change=first_batch_page)
+    page_size = col3.selectbox("Rows per page", BATCH_PAGE_SIZES, key="batch_page_size",
+                               on_change=first_batch_page)
+    pages = max(1, -(-len(df) // page_size))
+    page = col4.number_input("Page", min_value=1, max_value=pages, key="batch_page")
+    
+    ordered = sort_batch_results(df, sort_column, ascending=not descending)
+    start = (page - 1) * page_size
+    st.dataframe(ordered.iloc[start:start + page_size], use_container_width=True, hide_index=True)
+    st.caption(f"Page {page} of {pages}: rows {start + 1}-{min(start + page_size, len(df))} of {len(df)}")
+    st.download_button("Download all results (CSV)", ordered.to_csv(index=False),
+                       file_name="batch_results.csv", mime="text/csv")
+    
+    render_batch_charts(df, key="final")
+
+def first_batch_page():
+    """Go back to the first page when the table's order or page size changes"""
+    st.session_state.batch_page = 1
+
+def render_batch_charts(df, key):
+    """Per-resume charts for small batches; score histogram and top-N bars for large ones"""
+    # One point per group so copies don't crowd the charts
+    df = df[df['duplicate_of'].isna()]
+    
+    col1, col2 = st.columns(2)
+    
+    if len(df) > AGGREGATE_CHART_THRESHOLD:
+        # One trace and a fixed number of bars, however many resumes there are
+        with col1:
+            fig = px.histogram(df, x='overall_score', nbins=20,
+                               title=f"Overall Match Score Distribution ({len(df)} resumes)")
+            fig.update_layout(xaxis_title="Score (%)", yaxis_title="Resumes")
+            st.plotly_chart(fig, use_container_width=True, key=f"batch_histogram_{key}")
+        
+        with col2:
+            top = df.nlargest(TOP_N_CHART, 'overall_score')
+            fig = px.bar(top, x='overall_score', y='filename', orientation='h',
+                         title=f"Top {len(top)} Resumes",
+                         color='overall_score',
+                         color_continuous_scale='Viridis')
+            fig.update_layout(xaxis_title="Score (%)", yaxis_title="Resume",
+                              yaxis={'categoryorder': 'total ascending'})
+            st.plotly_chart(fig, use_container_width=True, key=f"batch_top_{key}")
+        return
+    
+    with col1:
+        fig = px.bar(df, x='filename', y='overall_score',
+                   title="Overall Match Scores by Resume",
+                   color='overall_score',
+                   color_continuous_scale='Viridis')
+        fig.update_layout(xaxis_title="Resume", yaxis_title="Score (%)")
+        st.plotly_chart(fig, use_container_width=True, key=f"batch_bar_{key}")
+    
+    with col2:
+        fig = px.scatter(df, x='overall_score', y='skill_match_score',
+                       size='matched_skills_count', color='filename',
+                       title="Overall Score vs Skill Match Score",
+                       hover_data=['filename'])
+        st.plotly_chart(fig, use_container_width=True, key=f"batch_scatter_{key}")
+
+def render_diagnostics(metrics):
+    """Show where a batch spent its time, plus sizes, cache hit rates and errors"""
+    with st.expander("🩺 Diagnostics", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Files analyzed", metrics.counter('files', status='analyzed'),
+                      help=f"{metrics.counter('files', status='identical')} identical files and "
+                           f"{metrics.counter('files', status='duplicate')} near-duplicates reused a score")
+        with col2:
+            st.metric("Files failed", metrics.counter('files', status='failed'))
+        with col3:
+            hit_rates = metrics.cache_hit_rates()
+            st.metric("Cache hit rate",
+                      f"{sum(hit_rates.values()) / len(hit_rates):.0%}" if hit_rates else "n/a",
+                      help=", ".join(f"{kind}: {rate:.0%}" for kind, rate in hit_rates.items()))
+        
+        stage_df = pd.DataFrame(metrics.stage_rows())
+        if not stage_df.empty:
+            st.markdown("**Time per stage** (summed across worker processes)")
+            st.dataframe(stage_df.sort_values('total_s', ascending=False),
+                         use_container_width=True, hide_index=True)
+            fig = px.bar(stage_df, x='stage', y='total_s', title="Total Time by Stage")
+            fig.update_layout(xaxis_title="Stage", yaxis_title="Seconds")
+            st.plotly_chart(fig, use_container_width=True, key="batch_diagnostics_stages")
+        
+        size_df = pd.DataFrame(metrics.size_rows())
+        if not size_df.empty:
+            st.markdown("**Document sizes** (bytes for files, characters for text)")
+            st.dataframe(size_df, use_container_width=True, hide_index=True)
+        
+        st.download_button("Download metrics (Prometheus format)", metrics.to_prometheus(),
+                           file_name="resume_scorer_metrics.prom", mime="text/plain")
+
+@st.cache_resource(show_spinner="Loading job catalog...")
+def load_job_catalog(path):
+    """Load a prebuilt job catalog once per server process"""
+    return JobCatalog.load(path)
+
+@st.cache_resource(show_spinner="Indexing job postings...")
+def build_job_catalog(data, filename):
+    """Build a job catalog from an uploaded postings file"""
+    postings = read_postings(io.BytesIO(data), filename)
+    if not postings:
+        return None
+    return JobCatalog.build(postings)
+
+def job_matching():
+    """Reverse matching mode: rank job postings for one resume"""
+    st.subheader("🔎 Job Matching")
+    
+    st.info("""
+    Find the best job postings for a resume. Upload a catalog of postings once and
+    match any number of resumes against it.
+    """)
+    
+    # A prebuilt catalog (JobCatalog.save) can be configured for large deployments
+    catalog = None
+    catalog_path = os.environ.get("RESUME_SCORER_JOB_CATALOG")
+    if catalog_path:
+        catalog = load_job_catalog(catalog_path)
+        st.caption(f"Using job catalog {catalog_path} with {len(catalog)} postings")
+    else:
+        postings_file = st.file_uploader("Upload Job Postings",
+                                       type=['csv', 'jsonl', 'json'],
+                                       help="CSV with a 'description' column (optional 'id' and 'title'), "
+                                            "JSONL with the same fields, or a JSON array of them")
+        if postings_file:
+            try:
+                catalog = build_job_catalog(postings_file.getvalue(), postings_file.name)
+                if catalog is None:
+                    st.error("No job postings with a description were found in the file.")
+            except ValueError as e:
+                st.error(f"Could not read {postings_file.name}: {e}")
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        resume_text = resume_input()
+    with col2:
+        st.subheader("⚙️ Options")
+        top_k = st.slider("Number of matches", min_value=1, max_value=50, value=10)
+    
+    if st.button("🔍 Find Matching Jobs", type="primary"):
+        if not (catalog and resume_text):
+            st.warning("Please provide both a job catalog and a resume.")
+            return
+        
+        with st.spinner("Matching your resume against the catalog..."):
+            matches = catalog.top_k(resume_text, top_k)
+        
+        st.markdown("---")
+        st.subheader(f"🏆 Top {len(matches)} Matching Jobs")
+        
+        df = pd.DataFrame([{
+            'rank': rank,
+            'title': title,
+            'overall_score': analysis['overall_score'],
+            'similarity_score': analysis['similarity_score'],
+            'skill_match_score': analysis['skill_match_score'],
+            'missing_skills_count': len(analysis['missing_skills'])
+        } for rank, (_, title, analysis) in enumerate(matches, start=1)])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        for rank, (key, title, analysis) in enumerate(matches, start=1):
+            with st.expander(f"{rank}. {title} — {analysis['overall_score']}%"):
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Overall Match", f"{analysis['overall_score']}%")
+                col2.metric("Skill Match", f"{analysis['skill_match_score']}%")
+                col3.metric("Skills Matched", f"{len(analysis['matched_skills'])}/{len(analysis['job_skills'])}")
+                
+                if analysis['matched_skills']:
+                    st.success("✅ Matched: " + ", ".join(analysis['matched_skills']))
+                if analysis['missing_skills']:
+                    st.error("❌ Missing: " + ", ".join(analysis['missing_skills']))
+                for recommendation in analysis['recommendations']:
+                    st.markdown(f"- {recommendation}")
 
 def about_page():
     """About page with project information"""
@@ -320,6 +669,7 @@ def about_page():
     
     - ✅ Single resume analysis
     - ✅ Batch analysis for multiple resumes
+    - ✅ Job matching: rank a catalog of postings for one resume
     - ✅ Support for multiple file formats (TXT, PDF, DOCX)
     - ✅ Interactive visualizations
     - ✅ Detailed skill matching
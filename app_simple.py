@@ -4,11 +4,18 @@ from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import re
 import string
+from utils.scoring import resolve_engine
 
 # Simple version without NLTK
 class SimpleResumeScorer:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+    def __init__(self, engine=None):
+        # Same switch as the full app: RESUME_SCORER_ENGINE=hashing; unknown names raise
+        self.engine = resolve_engine(engine)
+        if self.engine == 'hashing':
+            from utils.hashing import HashingTfidfVectorizer
+            self.vectorizer = HashingTfidfVectorizer()
+        else:
+            self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
     
     def preprocess_text(self, text):
         """Basic text preprocessing"""
@@ -0,0 +1,61 @@
+"""Measure cold import time of the scoring modules in fresh interpreters
+
+Run from the repository root:
+    python -m benchmarks.bench_import --max-ms 200
+
+With --max-ms the command exits non-zero when any module's median import time
+exceeds the budget, so it can guard against heavy imports creeping back in.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULES = ['utils.scoring', 'utils.batch', 'utils.extraction']
+
+# Modules that must not be imported just by importing the scoring code
+HEAVY_MODULES = ['nltk', 'sklearn', 'pandas', 'scipy', 'PyPDF2', 'docx']
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def time_import(module):
+    """Import time in seconds and heavy modules pulled in, from a fresh interpreter"""
+    output = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)],
+                            check=True, capture_output=True, text=True).stdout.split()
+    return float(output[0]), (output[1].split(',') if len(output) > 1 else [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument('--max-ms', type=float, help="Fail if a median import exceeds this budget")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in MODULES:
+        timings = []
+        heavy = []
+        for _ in range(args.repeat):
+            elapsed, heavy = time_import(module)
+            timings.append(elapsed * 1000)
+        median = statistics.median(timings)
+
+        over_budget = args.max_ms is not None and median > args.max_ms
+        failed = failed or over_budget or bool(heavy)
+        status = "FAIL" if over_budget or heavy else "ok"
+        print(f"{module:20s} median {median:7.1f} ms  min {min(timings):7.1f} ms  {status}"
+              + (f"  (imports {', '.join(heavy)})" if heavy else ""))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Time each stage of the scoring pipeline and track regressions between runs
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --resumes 300 --jobs 5 -o baseline.json
+    python -m benchmarks.bench_pipeline --resumes 300 --jobs 5 --compare baseline.json
+
+Real corpora replace the synthetic ones with --corpus (resume files or
+directories, any format the app reads) and --job-files. Each stage is timed
+per item (document or resume/job pair), reporting throughput and p50/p95/p99
+latency; a second pass under tracemalloc records each stage's peak Python
+heap. With --compare, stages whose p50 latency or throughput got worse than
+--threshold are flagged and the command exits non-zero.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_corpus
+from utils.batch import find_resume_files, read_files
+from utils.extraction import DOCX_TYPE, TEXT_TYPE, extract_text
+from utils.scoring import ENGINES, ResumeJobScorer
+
+STAGES = ['extraction', 'preprocessing', 'skills', 'vectorization', 'similarity',
+          'recommendations', 'end_to_end']
+
+# Latencies below this are too small to compare reliably between runs
+NOISE_FLOOR_MS = 0.005
+
+
+def make_docx(text):
+    """Encode text as DOCX bytes, one paragraph per line"""
+    import docx
+    document = docx.Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+def synthetic_files(resumes, formats):
+    """(filename, data, mime type) for synthetic resumes, cycling through formats"""
+    files = []
+    for i, text in enumerate(resumes):
+        kind = formats[i % len(formats)]
+        if kind == 'docx':
+            files.append((f'resume_{i}.docx', make_docx(text), DOCX_TYPE))
+        else:
+            files.append((f'resume_{i}.txt', text.encode('utf-8'), TEXT_TYPE))
+    return files
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies):
+    """Throughput and latency percentiles for per-item timings in seconds"""
+    total = sum(latencies)
+    ordered = sorted(latencies)
+    return {
+        'items': len(latencies),
+        'total_s': round(total, 6),
+        'throughput_per_s': round(len(latencies) / total, 2) if total else 0.0,
+        'mean_ms': round(total / len(latencies) * 1000, 4) if latencies else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 4),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 4),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 4),
+    }
+
+
+def time_items(function, items):
+    """Call function on each item, returning the results and per-item seconds"""
+    results = []
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        results.append(function(item))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def peak_heap(function, items):
+    """Peak traced Python heap, in bytes, while running function over items"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for item in items:
+            function(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def stage_functions(scorer, fitted):
+    """Stage name -> function timed on one item of that stage"""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    def vectorize(pair):
+        resume, job = pair
+        if fitted:
+            return scorer.vectorizer.transform([resume, job])
+        return scorer._make_vectorizer().fit_transform([resume, job])
+
+    def similarity(matrix):
+        return min(cosine_similarity(matrix[0:1], matrix[1:2])[0][0] * 100, 100)
+
+    def recommend(args):
+        return scorer._build_match(*args)
+
+    def end_to_end(pair):
+        return scorer.analyze_match(*pair)
+
+    return {
+        'preprocessing': scorer._preprocess_text,
+        'skills': scorer.skill_matcher.skills_in,
+        'vectorization': vectorize,
+        'similarity': similarity,
+        'recommendations': recommend,
+        'end_to_end': end_to_end,
+    }
+
+
+def run_pipeline(files, jobs, scorer, fitted, measure_memory, repeat=1):
+    """Run every stage, feeding each one the previous stage's outputs
+
+    Each stage runs repeat times and the run with the lowest total time is
+    kept, which damps scheduler noise when comparing against a baseline.
+    """
+    stages = {}
+    memory = {}
+    functions = stage_functions(scorer, fitted)
+
+    def extract(file):
+        return extract_text(*file)
+
+    # Load NLTK data, sklearn and the file parsers outside the timed region
+    extract(files[0])
+    scorer.analyze_match(jobs[0], jobs[0])
+
+    def record(name, function, items):
+        runs = [time_items(function, items) for _ in range(repeat)]
+        results, latencies = min(runs, key=lambda run: sum(run[1]))
+        stages[name] = summarize(latencies)
+        if measure_memory:
+            memory[name] = peak_heap(function, items)
+        return results
+
+    texts = record('extraction', extract, files)
+    processed = record('preprocessing', functions['preprocessing'], texts + jobs)
+    skills = record('skills', functions['skills'], texts + jobs)
+
+    processed_resumes, processed_jobs = processed[:len(texts)], processed[len(texts):]
+    resume_skills, job_skills = skills[:len(texts)], skills[len(texts):]
+    pairs = [(r, j) for r in range(len(texts)) for j in range(len(jobs))]
+
+    matrices = record('vectorization', functions['vectorization'],
+                      [(processed_resumes[r], processed_jobs[j]) for r, j in pairs])
+    scores = record('similarity', functions['similarity'], matrices)
+    record('recommendations', functions['recommendations'],
+           [(score, resume_skills[r], job_skills[j]) for score, (r, j) in zip(scores, pairs)])
+    record('end_to_end', functions['end_to_end'], [(texts[r], jobs[j]) for r, j in pairs])
+
+    for name, peak in memory.items():
+        stages[name]['peak_heap_mb'] = round(peak / 1024 / 1024, 3)
+    return stages
+
+
+def environment():
+    """Versions and machine details stored with each run"""
+    import numpy
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'sklearn': sklearn.__version__,
+        'commit': commit,
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def compare(current, baseline, threshold):
+    """Print a stage-by-stage comparison; return the names of regressed stages"""
+    regressions = []
+    print(f"\n{'stage':16s} {'p50 ms':>10s} {'baseline':>10s} {'change':>8s}   throughput change")
+    for name in STAGES:
+        now, before = current['stages'].get(name), baseline.get('stages', {}).get(name)
+        if not now or not before:
+            continue
+        p50_change = (now['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0.0
+        rate_change = ((now['throughput_per_s'] - before['throughput_per_s']) / before['throughput_per_s']
+                       if before['throughput_per_s'] else 0.0)
+        regressed = ((p50_change > threshold and now['p50_ms'] - before['p50_ms'] > NOISE_FLOOR_MS)
+                     or rate_change < -threshold)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:16s} {now['p50_ms']:10.3f} {before['p50_ms']:10.3f} {p50_change:+8.1%}   "
+              f"{rate_change:+8.1%}" + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=200, help="Number of synthetic resumes")
+    parser.add_argument('--jobs', type=int, default=5, help="Number of synthetic job descriptions")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--formats', default='txt',
+                        help="Comma-separated synthetic file formats: txt, docx (default: txt)")
+    parser.add_argument('--corpus', nargs='+', help="Real resume files, directories or glob patterns")
+    parser.add_argument('--job-files', nargs='+', help="Real job description text files")
+    parser.add_argument('--fitted', action='store_true',
+                        help="Fit one vocabulary on the corpus instead of per pair, as the index and catalog do")
+    parser.add_argument('--engine', choices=ENGINES, default='tfidf',
+                        help="Vectorizer engine: fitted-vocabulary TF-IDF or feature hashing (default: tfidf)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Runs per stage; the fastest is reported (default: 3)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('-o', '--output', help="Write results as JSON")
+    parser.add_argument('--compare', metavar='BASELINE', help="Flag regressions against an earlier JSON run")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown counted as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    resumes, jobs = make_corpus(resumes=args.resumes, jobs=args.jobs, seed=args.seed)
+    if args.corpus:
+        files = list(read_files(find_resume_files(args.corpus)))
+    else:
+        files = synthetic_files(resumes, args.formats.split(','))
+    if args.job_files:
+        jobs = []
+        for path in args.job_files:
+            with open(path, encoding='utf-8') as f:
+                jobs.append(f.read())
+    if not files or not jobs:
+        raise SystemExit("Need at least one resume and one job description")
+
+    scorer = ResumeJobScorer(engine=args.engine)
+    if args.fitted:
+        texts = [extract_text(*file) for file in files]
+        scorer.fit(texts + jobs)
+
+    stages = run_pipeline(files, jobs, scorer, args.fitted, not args.no_memory, args.repeat)
+
+    result = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'corpus': {
+            'source': 'files' if args.corpus else 'synthetic',
+            'resumes': len(files),
+            'jobs': len(jobs),
+            'pairs': len(files) * len(jobs),
+            'seed': args.seed,
+            'formats': None if args.corpus else args.formats,
+            'fitted': args.fitted,
+            'engine': args.engine,
+            'repeat': args.repeat,
+        },
+        'stages': stages,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+    print(f"{len(files)} resumes x {len(jobs)} jobs, peak RSS {result['peak_rss_mb']} MB")
+    print(f"{'stage':16s} {'items':>7s} {'items/s':>10s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'heap MB':>8s}")
+    for name in STAGES:
+        stats = stages[name]
+        print(f"{name:16s} {stats['items']:7d} {stats['throughput_per_s']:10.1f} {stats['p50_ms']:9.3f} "
+              f"{stats['p95_ms']:9.3f} {stats['p99_ms']:9.3f} {stats.get('peak_heap_mb', 0):8.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus') != result['corpus']:
+            print("Warning: baseline was run on a different corpus; comparison may be meaningless")
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions in: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
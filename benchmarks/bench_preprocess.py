@@ -0,0 +1,58 @@
+"""Compare the NLTK preprocessing path with the fast tokenizer + lemma memo path
+
+Run from the repository root:
+    python -m benchmarks.bench_preprocess --resumes 500
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import make_corpus
+from utils.scoring import ResumeJobScorer
+
+
+def time_preprocessing(scorer, documents, repeat):
+    """Best-of-repeat wall time to preprocess every document once"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            scorer._preprocess_text(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=300, help="Number of synthetic resumes")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    documents, _ = make_corpus(resumes=args.resumes, jobs=0, seed=args.seed)
+    nltk_scorer = ResumeJobScorer(fast=False)
+    fast_scorer = ResumeJobScorer(fast=True)
+
+    # Both paths must produce identical token streams
+    mismatches = sum(nltk_scorer._preprocess_text(doc) != fast_scorer._preprocess_text(doc)
+                     for doc in documents)
+
+    # Start the fast path cold so the memo warm-up is part of the measurement
+    fast_scorer._lemma_memo.clear()
+    nltk_time = time_preprocessing(nltk_scorer, documents, args.repeat)
+    fast_scorer._lemma_memo.clear()
+    fast_time = time_preprocessing(fast_scorer, documents, 1)
+    warm_time = time_preprocessing(fast_scorer, documents, args.repeat)
+
+    chars = sum(len(doc) for doc in documents)
+    print(f"documents: {len(documents)} ({chars / len(documents):.0f} chars avg)")
+    print(f"nltk path:        {nltk_time * 1000:8.1f} ms  ({len(documents) / nltk_time:8.0f} docs/s)")
+    print(f"fast path (cold): {fast_time * 1000:8.1f} ms  ({len(documents) / fast_time:8.0f} docs/s)"
+          f"  {nltk_time / fast_time:5.1f}x")
+    print(f"fast path (warm): {warm_time * 1000:8.1f} ms  ({len(documents) / warm_time:8.0f} docs/s)"
+          f"  {nltk_time / warm_time:5.1f}x")
+    print(f"memoized lemmas:  {len(fast_scorer._lemma_memo)}")
+    print(f"token mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
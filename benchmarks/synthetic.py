@@ -0,0 +1,86 @@
+"""Synthetic resume and job description generators for benchmarks"""
+import random
+
+from utils.skills import COMMON_SKILLS
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn', 'Rowan']
+LAST_NAMES = ['Smith', 'Patel', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Kim', 'Haddad', 'Larsen']
+TITLES = ['Software Engineer', 'Data Scientist', 'Backend Developer', 'DevOps Engineer',
+          'Frontend Developer', 'Machine Learning Engineer', 'Data Analyst', 'Product Designer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Analytics',
+             'Hooli', 'Vandelay Imports', 'Soylent Systems', 'Tyrell Tech']
+DEGREES = ['B.Sc. Computer Science', 'M.Sc. Data Science', 'B.Eng. Software Engineering',
+           'MBA', 'B.A. Mathematics', 'Ph.D. Statistics']
+VERBS = ['Designed', 'Built', 'Led', 'Implemented', 'Optimized', 'Migrated', 'Automated',
+         'Developed', 'Maintained', 'Launched', 'Scaled', 'Refactored', 'Mentored', 'Delivered']
+OBJECTS = ['data pipelines', 'REST services', 'customer-facing dashboards', 'payment systems',
+           'recommendation models', 'internal tooling', 'deployment workflows', 'reporting systems',
+           'search infrastructure', 'mobile applications', 'analytics platforms', 'ETL jobs']
+OUTCOMES = ['reducing latency by {n}%', 'cutting costs by ${n}k per year', 'improving accuracy by {n}%',
+            'serving {n}M requests per day', 'saving {n} engineering hours per week',
+            'increasing conversion by {n}%', 'supporting {n} teams across the company']
+FILLER = ['collaborating closely with stakeholders', 'working in an agile environment',
+          'following best practices for testing and code review', 'owning the roadmap end to end',
+          'while mentoring junior engineers', 'in a fast-paced startup setting']
+
+
+def _bullet(rng, skills):
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    return (f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)} and "
+            f"{rng.choice(skills)}, {outcome}, {rng.choice(FILLER)}.")
+
+
+def make_resume(rng, jobs=3, bullets=4):
+    """Generate one resume with summary, experience, skills and education sections"""
+    skills = rng.sample(COMMON_SKILLS, rng.randint(6, 16))
+    lines = [
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        f"{rng.choice(TITLES)} | {rng.randint(100, 999)}-555-{rng.randint(1000, 9999)} | "
+        f"candidate{rng.randint(1, 99999)}@example.com",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience in "
+        f"{', '.join(skills[:3])}. Passionate about building reliable products and "
+        f"{rng.choice(FILLER)}.",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(jobs):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {year})")
+        lines.extend(_bullet(rng, skills) for _ in range(bullets))
+        lines.append("")
+        year = start
+    lines += [
+        "SKILLS",
+        ', '.join(skill.title() for skill in skills),
+        "",
+        "EDUCATION",
+        f"{rng.choice(DEGREES)}, University of {rng.choice(LAST_NAMES)} ({year - rng.randint(1, 3)})",
+    ]
+    return "\n".join(lines)
+
+
+def make_job(rng):
+    """Generate one job description"""
+    skills = rng.sample(COMMON_SKILLS, rng.randint(5, 10))
+    return "\n".join([
+        f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+        "",
+        f"We are looking for an experienced engineer to join our team, {rng.choice(FILLER)}.",
+        "",
+        "Responsibilities:",
+        *(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}" for _ in range(5)),
+        "",
+        "Requirements:",
+        *(f"- {rng.randint(1, 6)}+ years of experience with {skill}" for skill in skills),
+        "- Strong communication and problem solving skills",
+    ])
+
+
+def make_corpus(resumes=100, jobs=5, seed=0):
+    """Generate a reproducible (resumes, jobs) corpus"""
+    rng = random.Random(seed)
+    return ([make_resume(rng, jobs=rng.randint(2, 5)) for _ in range(resumes)],
+            [make_job(rng) for _ in range(jobs)])
@@ -0,0 +1,104 @@
+"""Build, update and query a memory-mapped resume corpus store
+
+Examples:
+    python corpus_store.py build pool/ resumes/
+    python corpus_store.py add pool/ new_resumes/
+    python corpus_store.py remove pool/ resumes/alice.pdf
+    python corpus_store.py top-k pool/ --job job.txt -k 20
+    python corpus_store.py compact pool/ --refit
+
+See utils/corpus.py for the on-disk format.
+"""
+import argparse
+import copy
+
+from utils.batch import default_workers, iter_texts
+from utils.corpus import CorpusStore
+from utils.scoring import ResumeJobScorer
+
+# Resumes preprocessed and appended per batch
+APPEND_BATCH = 1000
+
+
+def append_all(store, items):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= APPEND_BATCH:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Manage a memory-mapped resume corpus store")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Fit a scorer on resumes and store them in a new store")
+    build.add_argument('store', help="Store directory (must not exist)")
+    build.add_argument('inputs', nargs='+', help="Resume directories, glob patterns or files")
+    build.add_argument('--taxonomy', help="Skill taxonomy file (CSV, JSON or TXT)")
+    build.add_argument('-w', '--workers', type=int, default=default_workers(),
+                       help="Extraction processes (default: number of CPUs)")
+
+    add = commands.add_parser('add', help="Append or replace resumes")
+    add.add_argument('store')
+    add.add_argument('inputs', nargs='+')
+    add.add_argument('-w', '--workers', type=int, default=default_workers())
+
+    remove = commands.add_parser('remove', help="Remove resumes by key (their path when added)")
+    remove.add_argument('store')
+    remove.add_argument('keys', nargs='+')
+
+    compact = commands.add_parser('compact', help="Drop removed resumes from disk")
+    compact.add_argument('store')
+    compact.add_argument('--refit', action='store_true',
+                         help="Refit the vocabulary and IDF on the stored resumes")
+
+    top_k = commands.add_parser('top-k', help="Print the best resumes for a job description")
+    top_k.add_argument('store')
+    job = top_k.add_mutually_exclusive_group(required=True)
+    job.add_argument('--job', help="Path to a text file with the job description")
+    job.add_argument('--job-text', help="Job description text")
+    top_k.add_argument('-k', type=int, default=10, help="Number of resumes (default: 10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        # Texts are needed twice (fit, then store), so this pass keeps them in memory
+        items = list(iter_texts(args.inputs, args.workers))
+        store = CorpusStore.build(args.store, items, ResumeJobScorer(taxonomy=args.taxonomy))
+        print(f"Stored {len(store)} resumes in {args.store}")
+    elif args.command == 'add':
+        store = CorpusStore(args.store)
+        append_all(store, iter_texts(args.inputs, args.workers))
+        print(f"{len(store)} resumes in {args.store}")
+    elif args.command == 'remove':
+        store = CorpusStore(args.store)
+        for key in args.keys:
+            store.remove(key)
+        print(f"{len(store)} resumes in {args.store}")
+    elif args.command == 'compact':
+        store = CorpusStore(args.store)
+        scorer = None
+        if args.refit:
+            # Same taxonomy and blend, new vocabulary
+            scorer = copy.copy(store.scorer).fit_processed(store.processed_texts())
+        store = store.compact(scorer)
+        print(f"Compacted {args.store}: {len(store)} resumes")
+    else:
+        if args.job:
+            with open(args.job, encoding='utf-8') as f:
+                job_description = f.read()
+        else:
+            job_description = args.job_text
+        store = CorpusStore(args.store)
+        for rank, (key, analysis) in enumerate(store.top_k(job_description, args.k), start=1):
+            print(f"{rank:4d}. {analysis['overall_score']:6.2f}  {key}")
+
+
+if __name__ == "__main__":
+    main()
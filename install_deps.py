@@ -1,6 +1,11 @@
+import os
 import subprocess
 import sys
 
+# NLTK data bundled with the app so it runs without network access
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nltk_data")
+NLTK_PACKAGES = ["stopwords", "wordnet", "punkt_tab"]
+
 def install_package(package):
     try:
         subprocess.check_call([sys.executable, "-m", "pip", "install", package])
@@ -10,6 +15,22 @@ def install_package(package):
         print(f"❌ Failed to install {package}")
         return False
 
+def download_nltk_data():
+    try:
+        import nltk
+    except ImportError:
+        print("❌ NLTK is not installed, skipping NLTK data")
+        return False
+    
+    ok = True
+    for package in NLTK_PACKAGES:
+        if nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True):
+            print(f"✅ Downloaded NLTK {package} to {NLTK_DATA_DIR}")
+        else:
+            print(f"❌ Failed to download NLTK {package}")
+            ok = False
+    return ok
+
 def main():
     packages = [
         "streamlit",
@@ -30,6 +51,9 @@ def main():
     
     print(f"\nInstallation complete: {success_count}/{len(packages)} packages installed successfully")
     
+    print("\nDownloading NLTK data...")
+    download_nltk_data()
+    
     if success_count >= 3:  # At least streamlit, pandas, sklearn
         print("\n✅ Minimum requirements met. You can run the basic version.")
         print("Run: streamlit run app_simple.py")
@@ -0,0 +1,195 @@
+"""Score a directory of resumes against a job description without the Streamlit UI
+
+Examples:
+    python score_resumes.py --job job.txt resumes/ -o scores.csv
+    python score_resumes.py --job job.txt "resumes/**/*.pdf" --top-k 50 -o top.jsonl
+    python score_resumes.py --job job.txt resumes/ --corpus past_resumes/ -o scores.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from utils.batch import (default_workers, find_resume_files, iter_batch_analysis, iter_texts,
+                         read_files, result_row, top_k_results)
+from utils.cache import PreprocessCache
+from utils.dedup import DEFAULT_THRESHOLD, NearDuplicateIndex
+from utils.extraction import DEFAULT_MAX_BYTES, DEFAULT_MAX_PAGES, PARALLEL_MIN_PAGES
+from utils.metrics import Metrics
+from utils.scoring import ResumeJobScorer
+
+OUTPUT_FORMATS = ['csv', 'jsonl', 'parquet']
+
+# Rows buffered per Parquet row group
+PARQUET_CHUNK_SIZE = 1000
+
+ROW_FIELDS = ['filename', 'overall_score', 'similarity_score', 'skill_match_score',
+              'matched_skills_count', 'missing_skills_count', 'matched_skills',
+              'missing_skills', 'duplicate_of', 'error']
+
+
+class CsvRowWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, fieldnames=ROW_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        pass
+
+
+class JsonlRowWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(json.dumps(row) + "\n")
+
+    def close(self):
+        pass
+
+
+class ParquetRowWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow: pip install pyarrow")
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ('filename', pa.string()),
+            ('overall_score', pa.float64()),
+            ('similarity_score', pa.float64()),
+            ('skill_match_score', pa.float64()),
+            ('matched_skills_count', pa.int64()),
+            ('missing_skills_count', pa.int64()),
+            ('matched_skills', pa.string()),
+            ('missing_skills', pa.string()),
+            ('duplicate_of', pa.string()),
+            ('error', pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= PARQUET_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def open_writer(output, output_format):
+    """Create a row writer for the output path ('-' for stdout)"""
+    if output_format == 'parquet':
+        if output == '-':
+            raise SystemExit("Parquet output needs a file path (-o)")
+        return ParquetRowWriter(output), None
+
+    stream = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+    writer = CsvRowWriter(stream) if output_format == 'csv' else JsonlRowWriter(stream)
+    return writer, (None if stream is sys.stdout else stream)
+
+
+def report_errors(results):
+    """Pass results through, logging failed files to stderr"""
+    for result in results:
+        if result['error']:
+            print(f"Error processing {result['filename']}: {result['error']}", file=sys.stderr)
+        yield result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score resumes against a job description")
+    parser.add_argument('inputs', nargs='+',
+                        help="Resume directories, glob patterns or files (TXT, PDF, DOCX)")
+    job = parser.add_mutually_exclusive_group(required=True)
+    job.add_argument('--job', help="Path to a text file with the job description")
+    job.add_argument('--job-text', help="Job description text")
+    parser.add_argument('-o', '--output', default='-',
+                        help="Output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=OUTPUT_FORMATS,
+                        help="Output format (default: from the output extension, else csv)")
+    parser.add_argument('-w', '--workers', type=int, default=default_workers(),
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('-k', '--top-k', type=int,
+                        help="Only output the K best matches, best first")
+    parser.add_argument('--taxonomy', help="Skill taxonomy file (CSV, JSON or TXT)")
+    parser.add_argument('--corpus', nargs='+', metavar='PATH',
+                        help="Reference resumes (directories, glob patterns or files) to fit the "
+                             "vocabulary on together with the job; default: the job alone")
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Only read the first N pages of each PDF (default: {DEFAULT_MAX_PAGES})")
+    parser.add_argument('--pdf-workers', type=int, default=1,
+                        help=f"Processes per PDF of {PARALLEL_MIN_PAGES}+ pages, for a few long PDFs "
+                             "(default: 1; lower -w to match)")
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help=f"Skip files larger than this (default: {DEFAULT_MAX_BYTES})")
+    parser.add_argument('--cache', metavar='PATH',
+                        help="SQLite preprocessing cache shared across runs and workers")
+    parser.add_argument('--dedup', type=float, nargs='?', const=DEFAULT_THRESHOLD, metavar='THRESHOLD',
+                        help="Score near-duplicate resumes once, reusing the score for copies "
+                             f"(default similarity threshold: {DEFAULT_THRESHOLD}); --top-k then skips copies")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Write per-stage timings, sizes, cache and error counts "
+                             "in Prometheus text format")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.job:
+        with open(args.job, encoding='utf-8') as f:
+            job_description = f.read()
+    else:
+        job_description = args.job_text
+
+    output_format = args.format
+    if output_format is None:
+        extension = os.path.splitext(args.output)[1].lower().lstrip('.')
+        output_format = extension if extension in OUTPUT_FORMATS else 'csv'
+
+    cache = PreprocessCache(path=args.cache) if args.cache else None
+    metrics = Metrics() if args.metrics else None
+    scorer = ResumeJobScorer(taxonomy=args.taxonomy, cache=cache, metrics=metrics)
+    files = read_files(find_resume_files(args.inputs))
+    extract_options = {'max_pages': args.max_pages, 'max_bytes': args.max_bytes, 'workers': args.pdf_workers}
+    dedup = NearDuplicateIndex(args.dedup) if args.dedup is not None else None
+    reference = [text for _, text in iter_texts(args.corpus, args.workers)] if args.corpus else ()
+    results = report_errors(iter_batch_analysis(files, job_description, scorer=scorer,
+                                                workers=args.workers, extract_options=extract_options,
+                                                dedup=dedup, reference=reference))
+
+    # Top-K keeps only K results in memory; otherwise rows stream straight out
+    if args.top_k:
+        results = top_k_results(results, args.top_k, skip_duplicates=dedup is not None)
+
+    writer, stream = open_writer(args.output, output_format)
+    try:
+        for result in results:
+            writer.write(result_row(result))
+    finally:
+        writer.close()
+        if stream is not None:
+            stream.close()
+
+    if metrics is not None:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            f.write(metrics.to_prometheus())
+
+
+if __name__ == "__main__":
+    main()
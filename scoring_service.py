@@ -0,0 +1,70 @@
+"""Run the resume scoring HTTP service
+
+Examples:
+    python scoring_service.py --port 8000 --workers 4 --corpus resumes/
+    python scoring_service.py --index candidates.pkl --max-wait-ms 20
+
+See utils/service.py for the endpoints.
+"""
+import argparse
+import asyncio
+import sys
+
+from utils.batch import default_workers
+from utils.cache import PreprocessCache
+from utils.scoring import ResumeJobScorer
+from utils.service import DEFAULT_MAX_BATCH, DEFAULT_MAX_PENDING, DEFAULT_MAX_WAIT, ScoringService, run
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume/job scoring over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument('-w', '--workers', type=int, default=default_workers(),
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--index', help="CandidateIndex file for /top-k queries without 'resumes'; "
+                                        "its fitted scorer is used for every endpoint")
+    parser.add_argument('--corpus', nargs='+', metavar='PATH',
+                        help="Resume directories, glob patterns or files to fit the scorer on before "
+                             "serving; without it or --index, requests are scored one by one")
+    parser.add_argument('--taxonomy', help="Skill taxonomy file (CSV, JSON or TXT)")
+    parser.add_argument('--cache', metavar='PATH',
+                        help="SQLite preprocessing cache shared by the workers")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help=f"Resumes per scoring batch (default: {DEFAULT_MAX_BATCH})")
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT * 1000,
+                        help=f"Longest a resume waits for its batch to fill (default: {DEFAULT_MAX_WAIT * 1000:g})")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help=f"Queued resumes before requests get 503 (default: {DEFAULT_MAX_PENDING})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    scorer = None
+    if not args.index:
+        cache = PreprocessCache(path=args.cache) if args.cache else None
+        scorer = ResumeJobScorer(taxonomy=args.taxonomy, cache=cache)
+        if args.corpus:
+            texts = [text for _, text in iter_texts(args.corpus, args.workers)]
+            try:
+                scorer.fit(texts)
+            except ValueError as e:
+                sys.exit(f"Cannot fit on --corpus: {e}")
+            print(f"Fitted the scorer on {len(texts)} resumes")
+
+    service = ScoringService(scorer=scorer, workers=args.workers, index_path=args.index,
+                             max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000,
+                             max_pending=args.max_pending)
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    if not service.fitted:
+        print("No --corpus or --index: requests are not merged; each is scored as its own batch")
+    try:
+        asyncio.run(run(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
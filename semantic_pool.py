@@ -0,0 +1,119 @@
+"""Fit an offline LSA model and rank dense resume embedding pools
+
+Examples:
+    python semantic_pool.py fit model.pkl resumes/ --components 128
+    python semantic_pool.py fit model.pkl --store pool/
+    python semantic_pool.py build vectors/ resumes/ --model model.pkl --int8
+    python semantic_pool.py top-k vectors/ --job job.txt -k 20
+
+Set RESUME_SCORER_SEMANTIC_MODEL=model.pkl to blend the model's similarity
+into the apps' overall scores. See utils/semantic.py for the pool format.
+"""
+import argparse
+import os
+import shutil
+import sys
+
+from utils.batch import default_workers, iter_texts
+from utils.corpus import CorpusStore
+from utils.scoring import ResumeJobScorer
+from utils.semantic import DEFAULT_COMPONENTS, EmbeddingPool, SemanticModel, load_model
+
+# Resumes embedded per pass
+EMBED_BATCH = 4096
+
+
+def processed_corpus(args, scorer):
+    """(keys, preprocessed texts) from --store or the input files"""
+    if args.store:
+        store = CorpusStore(args.store)
+        live = [i for i in range(len(store.docs)) if not store.docs['deleted'][i]]
+        return [store.key(i) for i in live], [store.processed_text(i) for i in live]
+    if not args.inputs:
+        sys.exit("Give resume inputs or --store")
+    keys, processed = [], []
+    for path, text in iter_texts(args.inputs, args.workers):
+        keys.append(path)
+        processed.append(scorer.preprocess_text(text))
+    return keys, processed
+
+
+def embed_all(model, processed):
+    """Embeddings of every document, EMBED_BATCH at a time"""
+    import numpy as np
+    if not processed:
+        return np.zeros((0, model.dimensions), dtype=np.float32)
+    return np.concatenate([model.embed(processed[i:i + EMBED_BATCH])
+                           for i in range(0, len(processed), EMBED_BATCH)])
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument('inputs', nargs='*', help="Resume directories, glob patterns or files")
+    parser.add_argument('--store', help="Read preprocessed resumes from a corpus store instead")
+    parser.add_argument('-w', '--workers', type=int, default=default_workers(),
+                        help="Extraction processes (default: number of CPUs)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fit LSA models and rank dense resume embedding pools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fit = commands.add_parser('fit', help="Fit a semantic model on local resumes")
+    fit.add_argument('model', help="Output model file")
+    add_corpus_arguments(fit)
+    fit.add_argument('-c', '--components', type=int, default=DEFAULT_COMPONENTS,
+                     help=f"Embedding dimensions (default: {DEFAULT_COMPONENTS})")
+
+    build = commands.add_parser('build', help="Embed resumes into a new pool directory")
+    build.add_argument('pool', help="Pool directory (must not exist)")
+    add_corpus_arguments(build)
+    build.add_argument('--model', help="Saved model to embed with (default: fit one on the same resumes)")
+    build.add_argument('-c', '--components', type=int, default=DEFAULT_COMPONENTS)
+    build.add_argument('--int8', action='store_true', help="Store int8-quantized vectors")
+
+    top_k = commands.add_parser('top-k', help="Print the resumes closest to a job description")
+    top_k.add_argument('pool')
+    job = top_k.add_mutually_exclusive_group(required=True)
+    job.add_argument('--job', help="Path to a text file with the job description")
+    job.add_argument('--job-text', help="Job description text")
+    top_k.add_argument('-k', type=int, default=10, help="Number of resumes (default: 10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scorer = ResumeJobScorer()
+
+    if args.command == 'fit':
+        _, processed = processed_corpus(args, scorer)
+        model = SemanticModel(args.components).fit(processed)
+        model.save(args.model)
+        print(f"Fitted {model.dimensions}-dimension model on {len(processed)} resumes: {args.model}")
+    elif args.command == 'build':
+        if os.path.exists(args.pool):
+            sys.exit(f"{args.pool} already exists")
+        keys, processed = processed_corpus(args, scorer)
+        model = load_model(args.model) if args.model else SemanticModel(args.components).fit(processed)
+        pool = EmbeddingPool.from_vectors(keys, embed_all(model, processed), quantized=args.int8)
+        pool.save(args.pool)
+        # The pool keeps the model it was embedded with, so queries use the same projection
+        if args.model:
+            shutil.copyfile(args.model, os.path.join(args.pool, 'model.pkl'))
+        else:
+            model.save(os.path.join(args.pool, 'model.pkl'))
+        print(f"Stored {len(pool)} {'int8' if args.int8 else 'float32'} vectors in {args.pool}")
+    else:
+        if args.job:
+            with open(args.job, encoding='utf-8') as f:
+                job_description = f.read()
+        else:
+            job_description = args.job_text
+        pool = EmbeddingPool.load(args.pool)
+        model = load_model(os.path.join(args.pool, 'model.pkl'))
+        query = model.embed([scorer.preprocess_text(job_description)])[0]
+        for rank, (key, cosine) in enumerate(pool.top_k(query, args.k), start=1):
+            print(f"{rank:4d}. {min(max(cosine, 0.0), 1.0) * 100:6.2f}  {key}")
+
+
+if __name__ == "__main__":
+    main()
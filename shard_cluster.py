@@ -0,0 +1,145 @@
+"""Build resume shards, serve them and rank them with scatter-gather top-K
+
+Examples:
+    python shard_cluster.py build shards/ resumes/ --shards 4
+    python shard_cluster.py worker shards/shard-000 --port 9001
+    python shard_cluster.py coordinator --port 9000 \\
+        --shard http://node1:9001 --shard http://node2:9001,http://node2b:9001
+    python shard_cluster.py query --shard http://node1:9001 --shard http://node2:9001 --job job.txt -k 20
+    python shard_cluster.py local shards/ --job job.txt -k 20
+
+`local` starts one worker process per shard on this machine, standing in for
+nodes, queries them once and stops them. See utils/shards.py for the protocol.
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+from utils.batch import default_workers, iter_texts
+from utils.scoring import ResumeJobScorer
+from utils.shards import (DEFAULT_TIMEOUT, CoordinatorService, ShardCoordinator, ShardWorker,
+                          build_shards, request_json, shard_paths)
+from utils.service import run
+
+# Seconds `local` waits for its workers to come up
+STARTUP_TIMEOUT = 60
+
+
+def read_job(args):
+    if args.job:
+        with open(args.job, encoding='utf-8') as f:
+            return f.read()
+    return args.job_text
+
+
+def print_results(results, failed):
+    for rank, result in enumerate(results, start=1):
+        print(f"{rank:4d}. {result['analysis']['overall_score']:6.2f}  {result['key']}  (shard {result['shard']})")
+    for number, error in sorted(failed.items()):
+        print(f"Shard {number} unavailable: {error}", file=sys.stderr)
+
+
+async def wait_for_workers(urls, timeout=STARTUP_TIMEOUT):
+    """Poll /health until every worker answers"""
+    deadline = time.monotonic() + timeout
+    for url in urls:
+        while True:
+            try:
+                status, _ = await request_json(url, 'GET', '/health')
+                if status == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Worker {url} did not start within {timeout}s")
+            await asyncio.sleep(0.2)
+
+
+def add_job_arguments(parser):
+    job = parser.add_mutually_exclusive_group(required=True)
+    job.add_argument('--job', help="Path to a text file with the job description")
+    job.add_argument('--job-text', help="Job description text")
+    parser.add_argument('-k', type=int, default=10, help="Number of resumes (default: 10)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds to wait for each shard (default: {DEFAULT_TIMEOUT:g})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded scatter-gather resume ranking")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Fit one scorer on resumes and split them into shard stores")
+    build.add_argument('output', help="Directory for the shards (must not exist)")
+    build.add_argument('inputs', nargs='+', help="Resume directories, glob patterns or files")
+    build.add_argument('--shards', type=int, required=True, help="Number of shards")
+    build.add_argument('--taxonomy', help="Skill taxonomy file (CSV, JSON or TXT)")
+    build.add_argument('-w', '--workers', type=int, default=default_workers(),
+                       help="Extraction processes (default: number of CPUs)")
+
+    worker = commands.add_parser('worker', help="Serve one shard")
+    worker.add_argument('store', help="Shard store directory")
+    worker.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: 127.0.0.1)")
+    worker.add_argument('--port', type=int, default=9001)
+
+    coordinator = commands.add_parser('coordinator', help="Serve merged top-K over shard workers")
+    coordinator.add_argument('--shard', action='append', required=True,
+                             help="Worker URL, or comma-separated replica URLs, per shard in pool order")
+    coordinator.add_argument('--host', default='127.0.0.1')
+    coordinator.add_argument('--port', type=int, default=9000)
+    coordinator.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+
+    query = commands.add_parser('query', help="Rank shard workers once and print the merged top-K")
+    query.add_argument('--shard', action='append', required=True)
+    add_job_arguments(query)
+
+    local = commands.add_parser('local', help="Start a worker per shard on this machine and query them")
+    local.add_argument('shards', help="build output directory")
+    local.add_argument('--base-port', type=int, default=9001, help="Port of the first worker (default: 9001)")
+    add_job_arguments(local)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        items = list(iter_texts(args.inputs, args.workers))
+        paths = build_shards(args.output, items, args.shards, ResumeJobScorer(taxonomy=args.taxonomy))
+        print(f"Stored {len(items)} resumes in {len(paths)} shards under {args.output}")
+    elif args.command == 'worker':
+        worker = ShardWorker(args.store)
+        print(f"Serving {worker.name} ({len(worker.store)} resumes) on http://{args.host}:{args.port}")
+        try:
+            asyncio.run(run(worker, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'coordinator':
+        service = CoordinatorService(ShardCoordinator([urls.split(',') for urls in args.shard], args.timeout))
+        print(f"Coordinating {len(args.shard)} shards on http://{args.host}:{args.port}")
+        try:
+            asyncio.run(run(service, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'query':
+        coordinator = ShardCoordinator([urls.split(',') for urls in args.shard], args.timeout)
+        print_results(*coordinator.top_k_sync(read_job(args), args.k))
+    else:
+        paths = shard_paths(args.shards)
+        urls = [f"http://127.0.0.1:{args.base_port + i}" for i in range(len(paths))]
+        processes = [subprocess.Popen([sys.executable, __file__, 'worker', path, '--port', str(args.base_port + i)],
+                                      stdout=subprocess.DEVNULL)
+                     for i, path in enumerate(paths)]
+        try:
+            asyncio.run(wait_for_workers(urls))
+            print_results(*ShardCoordinator(urls, args.timeout).top_k_sync(read_job(args), args.k))
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
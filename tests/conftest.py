@@ -0,0 +1,31 @@
+"""Shared fixtures: a small synthetic corpus and brute-force rankings to check against"""
+import os
+import sys
+
+import pytest
+
+# Tests import the repo's top-level packages (utils, benchmarks) from a plain `pytest` run too
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_corpus
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    """(resumes, jobs) generated with a fixed seed"""
+    return make_corpus(resumes=150, jobs=3, seed=7)
+
+
+def brute_force_scores(scorer, texts, job_description, k):
+    """The k best overall scores of analyze_match over {key: text}, best first"""
+    scores = sorted((scorer.analyze_match(text, job_description)['overall_score'] for text in texts.values()),
+                    reverse=True)
+    return scores[:k]
+
+
+def assert_matches_brute_force(results, scorer, texts, job_description, k):
+    """results ([(key, analysis)], best first) are the top k of analyze_match over texts"""
+    assert [analysis['overall_score'] for _, analysis in results] == \
+        brute_force_scores(scorer, texts, job_description, k)
+    for key, analysis in results:
+        assert analysis == scorer.analyze_match(texts[key], job_description)
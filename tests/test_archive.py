@@ -0,0 +1,97 @@
+"""Streaming ZIP/TAR members and byte-identical file skipping in batch runs"""
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from utils.archive import count_resumes, is_archive, iter_archive, iter_uploads
+from utils.batch import iter_batch_analysis
+from utils.metrics import Metrics
+from utils.scoring import ResumeJobScorer
+
+MEMBERS = {
+    'batch/alice.txt': b'Python developer',
+    'batch/nested/bob.txt': b'Java developer',
+    'batch/notes.md': b'not a resume',
+    '__MACOSX/batch/._alice.txt': b'resource fork',
+    'batch/.hidden.txt': b'hidden',
+}
+RESUMES = [('batch/alice.txt', b'Python developer'), ('batch/nested/bob.txt', b'Java developer')]
+
+
+def zip_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('batch/', b'')
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer
+
+
+def tar_archive(members, mode='w'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer
+
+
+@pytest.mark.parametrize('filename, build', [
+    ('resumes.zip', zip_archive),
+    ('resumes.tar', tar_archive),
+    ('resumes.tar.gz', lambda members: tar_archive(members, 'w:gz')),
+    ('resumes.tbz2', lambda members: tar_archive(members, 'w:bz2')),
+    ('resumes.tar.xz', lambda members: tar_archive(members, 'w:xz')),
+])
+def test_iter_archive_yields_resume_members(filename, build):
+    assert is_archive(filename)
+    members = list(iter_archive(filename, build(MEMBERS)))
+    assert members == [(f'{filename}/{name}', data, None) for name, data in RESUMES]
+
+
+def test_members_are_capped_and_counted():
+    buffer = zip_archive({'a.txt': b'x' * 100, 'b.txt': b'y' * 10})
+    assert [data for _, data, _ in iter_archive('a.zip', buffer, max_bytes=50)] == [b'x' * 51, b'y' * 10]
+    assert count_resumes('a.zip', zip_archive(MEMBERS)) == 2
+    assert count_resumes('a.tar', tar_archive(MEMBERS)) is None
+
+
+def test_tar_members_are_read_as_they_are_needed():
+    members = {f'r{i:03d}.txt': bytes([65 + i % 26]) * 4000 for i in range(200)}
+    buffer = tar_archive(members)
+    stream = iter_archive('big.tar', buffer)
+    assert next(stream)[0] == 'big.tar/r000.txt'
+    # The first member is handed over before most of the archive is read
+    assert buffer.tell() < len(buffer.getvalue()) // 10
+    assert len(list(stream)) == 199
+
+
+def test_iter_uploads_mixes_archives_and_files():
+    uploads = [('a.zip', zip_archive(MEMBERS), 'application/zip'),
+               ('cv.txt', io.BytesIO(b'Go developer'), 'text/plain')]
+    assert [(name, mime_type) for name, _, mime_type in iter_uploads(uploads)] == \
+        [('a.zip/batch/alice.txt', None), ('a.zip/batch/nested/bob.txt', None), ('cv.txt', 'text/plain')]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_identical_files_are_analyzed_once(corpus, workers):
+    resumes, jobs = corpus
+    buffer = zip_archive({f'r{i}.txt': resumes[i].encode() for i in range(4)})
+    uploads = [('a.zip', buffer, 'application/zip'),
+               ('copy.txt', io.BytesIO(resumes[1].encode()), 'text/plain'),
+               ('again.zip', zip_archive({'r0.txt': resumes[0].encode()}), 'application/zip')]
+    metrics = Metrics()
+    results = sorted(iter_batch_analysis(iter_uploads(uploads), jobs[0], scorer=ResumeJobScorer(metrics=metrics),
+                                         workers=workers, skip_identical=True),
+                     key=lambda result: result['index'])
+
+    assert [result['filename'] for result in results] == \
+        ['a.zip/r0.txt', 'a.zip/r1.txt', 'a.zip/r2.txt', 'a.zip/r3.txt', 'copy.txt', 'again.zip/r0.txt']
+    assert [result.get('duplicate_of') for result in results[4:]] == ['a.zip/r1.txt', 'a.zip/r0.txt']
+    assert results[4]['analysis'] == results[1]['analysis']
+    assert results[5]['analysis'] == results[0]['analysis']
+    assert metrics.counter('files', status='analyzed') == 4
+    assert metrics.counter('files', status='identical') == 2
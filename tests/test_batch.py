@@ -0,0 +1,86 @@
+"""iter_batch_analysis scores against analyze_match on the same vocabulary"""
+import csv
+
+import pytest
+
+import score_resumes
+from utils.batch import iter_batch_analysis
+from utils.metrics import Metrics
+from utils.scoring import ResumeJobScorer
+
+
+def as_files(texts):
+    return [(f'r{i:03d}.txt', text.encode(), 'text/plain') for i, text in enumerate(texts)]
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_unfitted_batch_matches_analyze_match(corpus, workers):
+    resumes, jobs = corpus
+    resumes = resumes[:40]
+    results = list(iter_batch_analysis(as_files(resumes), jobs[0], scorer=ResumeJobScorer(), workers=workers))
+
+    # The batch is fitted on the job plus its own resumes, as analyze_match would be
+    reference = ResumeJobScorer(corpus=[jobs[0]] + resumes)
+    assert sorted(result['index'] for result in results) == list(range(len(resumes)))
+    for result in results:
+        assert result['error'] is None
+        assert result['analysis'] == reference.analyze_match(resumes[result['index']], jobs[0])
+
+
+def test_padding_does_not_outscore_a_concise_resume(corpus):
+    resumes, jobs = corpus
+    concise = 'Python developer with SQL, Docker and AWS experience building data pipelines.'
+    # Filler the job never mentions dilutes the resume vector once it is in the vocabulary
+    padded = concise + ' ' + ' '.join(['hobbies include gardening, chess, pottery and travel.'] * 30)
+    job = 'Looking for a Python developer with SQL, Docker and AWS experience building data pipelines.'
+    results = list(iter_batch_analysis(as_files([padded, concise] + resumes[:20]), job, workers=1))
+
+    scores = {result['index']: result['analysis']['similarity_score'] for result in results}
+    assert scores[0] < scores[1]
+    reference = ResumeJobScorer(corpus=[job, padded, concise] + resumes[:20])
+    assert scores[0] == reference.analyze_match(padded, job)['similarity_score']
+
+
+def test_fitted_scorer_streams_analyze_match_results(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer(corpus=resumes + jobs)
+    results = list(iter_batch_analysis(as_files(resumes[:30]), jobs[1], scorer=scorer, workers=2))
+
+    assert len(results) == 30
+    for result in results:
+        assert result['analysis'] == scorer.analyze_match(resumes[result['index']], jobs[1])
+
+
+@pytest.mark.parametrize('fitted', [False, True])
+def test_worker_metrics_are_counted_once(corpus, fitted):
+    resumes, jobs = corpus
+    metrics = Metrics()
+    scorer = ResumeJobScorer(corpus=resumes + jobs, metrics=metrics) if fitted else ResumeJobScorer(metrics=metrics)
+    files = as_files(resumes[:12]) + [('broken.pdf', b'not a pdf', 'application/pdf')] * 3
+    fits = metrics.snapshot()['timings'].get(('fit', ()), [0])[0]
+
+    # The second run forks workers from a parent whose registry already has counts
+    for run in (1, 2):
+        results = list(iter_batch_analysis(files, jobs[0], scorer=scorer, workers=4))
+        assert sum(result['error'] is not None for result in results) == 3
+        assert metrics.counter('files', status='analyzed') == 12 * run
+        assert metrics.counter('files', status='failed') == 3 * run
+        assert metrics.snapshot()['sizes'][('resume_chars', ())][0] == 12 * run
+    # Fitting happens once per unfitted batch, in the parent
+    assert metrics.snapshot()['timings'].get(('fit', ()), [0])[0] == fits + (0 if fitted else 2)
+
+
+def test_cli_scores_match_the_batch_page(tmp_path, corpus):
+    resumes, jobs = corpus
+    for i, text in enumerate(resumes[:10]):
+        (tmp_path / f'r{i}.txt').write_text(text)
+    (tmp_path / 'job.txt').write_text(jobs[0])
+    output = tmp_path / 'scores.csv'
+    score_resumes.main(['--job', str(tmp_path / 'job.txt'), str(tmp_path / 'r*.txt'), '-o', str(output), '-w', '2'])
+
+    # The Batch Analysis page runs the same unfitted scorer through iter_batch_analysis
+    files = [(str(tmp_path / f'r{i}.txt'), text.encode(), None) for i, text in enumerate(resumes[:10])]
+    expected = {result['filename']: result['analysis']['overall_score']
+                for result in iter_batch_analysis(files, jobs[0], workers=1)}
+    with open(output, newline='') as f:
+        assert {row['filename']: float(row['overall_score']) for row in csv.DictReader(f)} == expected
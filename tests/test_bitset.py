@@ -0,0 +1,70 @@
+"""Packed-bitset skill grids against analyze_match and plain set arithmetic"""
+import random
+
+import numpy as np
+import pytest
+
+from utils import bitset
+from utils.bitset import SkillBitsets, popcount, skill_match_grid
+from utils.scoring import ResumeJobScorer
+
+
+def random_skill_lists(count, vocabulary, seed):
+    rng = random.Random(seed)
+    return [rng.sample(vocabulary, rng.randint(0, 40)) for _ in range(count)]
+
+
+def test_grid_matches_analyze_match(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer()
+    grid = scorer.skill_match_grid(resumes[:40], jobs + [''])
+    assert grid.shape == (40, len(jobs) + 1)
+
+    for i, resume in enumerate(resumes[:40]):
+        for j, job in enumerate(jobs + ['']):
+            analysis = scorer.analyze_match(resume, job)
+            assert round(float(grid.percentages[i, j]), 2) == analysis['skill_match_score']
+            assert grid.matched[i, j] == len(analysis['matched_skills'])
+            assert grid.missing[i, j] == len(analysis['missing_skills'])
+            assert sorted(grid.matched_skills(i, j)) == analysis['matched_skills']
+            assert sorted(grid.missing_skills(i, j)) == analysis['missing_skills']
+
+
+@pytest.mark.parametrize('fallback', [False, True])
+def test_grid_over_several_words_matches_sets(monkeypatch, fallback):
+    if fallback:
+        monkeypatch.delattr(np, 'bitwise_count', raising=False)
+    # 150 skills need three uint64 words per row; a small block splits the resumes
+    monkeypatch.setattr(bitset, 'GRID_BLOCK_BYTES', 7 * 5 * 8)
+    names = [f'Skill {i}' for i in range(150)]
+    resume_skills = random_skill_lists(30, names, seed=1)
+    job_skills = random_skill_lists(5, names, seed=2) + [[]]
+
+    grid = skill_match_grid(resume_skills, job_skills)
+    assert grid.vocabulary.words == 3
+    for i, resume in enumerate(resume_skills):
+        for j, job in enumerate(job_skills):
+            matched = set(resume) & set(job)
+            assert grid.matched[i, j] == len(matched)
+            assert grid.missing[i, j] == len(set(job) - set(resume))
+            assert grid.percentages[i, j] == (len(matched) / len(job) * 100 if job else 0.0)
+            assert set(grid.matched_skills(i, j)) == matched
+
+
+def test_popcount_and_decode():
+    words = np.array([0, 1, 2 ** 63, 2 ** 64 - 1, 0x5555], dtype=np.uint64)
+    assert popcount(words).tolist() == [0, 1, 1, 64, 8]
+
+    vocabulary = SkillBitsets(['Python', 'SQL'])
+    bits = vocabulary.encode_many([['SQL', 'Go'], []])
+    # New skills are added to the vocabulary in the order they are seen
+    assert vocabulary.names == ['Python', 'SQL', 'Go']
+    assert vocabulary.decode(bits[0]) == ['SQL', 'Go'] and vocabulary.decode(bits[1]) == []
+
+
+def test_batch_reports_use_the_grid(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer(corpus=resumes + jobs)
+    for job in jobs + ['']:
+        analyses = scorer.analyze_many(resumes[:25], job)
+        assert analyses == [scorer.analyze_match(resume, job) for resume in resumes[:25]]
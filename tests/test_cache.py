@@ -0,0 +1,72 @@
+"""PreprocessCache LRU budget, SQLite tier and scorer results with and without it"""
+import pickle
+
+from utils.batch import iter_batch_analysis
+from utils.cache import PreprocessCache, _entry_size
+from utils.metrics import Metrics
+from utils.scoring import ResumeJobScorer
+
+
+def test_lru_evicts_least_recently_used_within_budget():
+    cache = PreprocessCache(max_bytes=3 * _entry_size('k0', 'x' * 20))
+    for i in range(3):
+        cache.put(f'k{i}', 'x' * 20)
+    assert cache.get('k0') == 'x' * 20
+    cache.put('k3', 'x' * 20)
+
+    # k1 was the least recently used once k0 was read
+    assert cache.get('k1') is None
+    assert [cache.get(key) is not None for key in ('k0', 'k2', 'k3')] == [True, True, True]
+    assert cache.memory_bytes == sum(_entry_size(key, 'x' * 20) for key in ('k0', 'k2', 'k3'))
+
+    # Replacing a value re-counts its size; entries over the whole budget are not kept
+    cache.put('k0', 'y')
+    assert cache.memory_bytes == _entry_size('k0', 'y') + 2 * _entry_size('k2', 'x' * 20)
+    cache.put('big', 'x' * 1000)
+    assert cache.get('big') is None and len(cache) == 3
+    assert cache.stats()['misses'] == 2
+
+
+def test_sqlite_tier_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    PreprocessCache(path=path).put('skills:a', ['Python', 'SQL'])
+
+    reopened = PreprocessCache(path=path)
+    assert reopened.get('skills:a') == ['Python', 'SQL']
+    assert reopened.get('skills:a') == ['Python', 'SQL']
+    assert reopened.stats()['disk_hits'] == 1 and reopened.stats()['hits'] == 2
+
+    # Pickled copies keep the path but not the memory tier or connection
+    copy = pickle.loads(pickle.dumps(reopened))
+    assert len(copy) == 0 and copy.get('skills:a') == ['Python', 'SQL']
+
+    copy.clear()
+    assert PreprocessCache(path=path).get('skills:a') is None
+
+
+def test_cached_scorer_matches_uncached(tmp_path, corpus):
+    resumes, jobs = corpus
+    plain = ResumeJobScorer()
+    metrics = Metrics()
+    cached = ResumeJobScorer(cache=PreprocessCache(path=str(tmp_path / 'cache.db')), metrics=metrics)
+    for _ in range(2):
+        for resume in resumes[:10]:
+            assert cached.analyze_match(resume, jobs[0]) == plain.analyze_match(resume, jobs[0])
+    assert metrics.counter('cache_hits', kind='text') >= 10
+    assert metrics.counter('cache_misses', kind='skills') == 11
+
+
+def test_batch_workers_share_the_sqlite_cache(tmp_path, corpus):
+    resumes, jobs = corpus
+    files = [(f'r{i}.txt', text.encode(), 'text/plain') for i, text in enumerate(resumes[:12])]
+    path = str(tmp_path / 'cache.db')
+    expected = {result['index']: result['analysis'] for result in iter_batch_analysis(files, jobs[0], workers=1)}
+
+    for run in range(2):
+        metrics = Metrics()
+        scorer = ResumeJobScorer(cache=PreprocessCache(path=path), metrics=metrics)
+        results = {result['index']: result['analysis']
+                   for result in iter_batch_analysis(files, jobs[0], scorer=scorer, workers=3)}
+        assert results == expected
+        # Twelve resumes and the job, then a second run that finds them all in the file
+        assert metrics.counter('cache_misses', kind='text') == (13 if run == 0 else 0)
@@ -0,0 +1,46 @@
+"""JobCatalog rankings against brute-force analyze_match, and posting files"""
+import io
+
+import pytest
+
+from utils.catalog import JobCatalog, read_postings
+
+
+@pytest.fixture(scope='module')
+def postings():
+    from benchmarks.synthetic import make_corpus
+    _, jobs = make_corpus(resumes=0, jobs=200, seed=3)
+    return [(f'j{i}', f'Job {i}', text) for i, text in enumerate(jobs)]
+
+
+def test_top_k_matches_brute_force(corpus, postings):
+    resumes, _ = corpus
+    catalog = JobCatalog.build(postings[:150])
+    catalog.add_many(postings[150:])
+    catalog.remove('j5')
+    descriptions = {key: description for key, _, description in postings if key != 'j5'}
+    scorer = catalog.scorer
+
+    for resume in resumes[:3]:
+        for k in (1, 10):
+            results = [(key, analysis) for key, _, analysis in catalog.top_k(resume, k)]
+            # analyze_match takes the posting as the job, so brute force runs per posting
+            expected = sorted((scorer.analyze_match(resume, description)['overall_score']
+                               for description in descriptions.values()), reverse=True)[:k]
+            assert [analysis['overall_score'] for _, analysis in results] == expected
+            for key, analysis in results:
+                assert analysis == scorer.analyze_match(resume, descriptions[key])
+
+
+def test_read_postings_csv_keeps_id_zero():
+    data = "id,title,description\n0,Dev,\"python, sql\"\n,,Data role\n9,Empty,\n"
+    assert read_postings(io.StringIO(data)) == [('0', 'Dev', 'python, sql'), ('1', 'Data role', 'Data role')]
+
+
+def test_read_postings_json_and_jsonl():
+    array = b'[{"id": 0, "description": "python"}, {"title": "Ops", "description": "docker"}]'
+    assert read_postings(io.BytesIO(array), 'postings.json') == [('0', 'python', 'python'), ('1', 'Ops', 'docker')]
+    lines = b'{"id": 0, "description": "python"}\n\n{"id": 7, "description": "docker"}\n'
+    assert read_postings(io.BytesIO(lines), 'postings.jsonl') == [('0', 'python', 'python'), ('7', 'docker', 'docker')]
+    with pytest.raises(ValueError):
+        read_postings(io.BytesIO(b'{"description": "python"}'), 'postings.json')
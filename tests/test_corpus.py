@@ -0,0 +1,64 @@
+"""CorpusStore rankings against brute-force analyze_match"""
+from conftest import assert_matches_brute_force
+
+from utils.corpus import CorpusStore
+from utils.scoring import ResumeJobScorer
+
+
+def items_of(resumes):
+    return [(f'r{i}', text) for i, text in enumerate(resumes)]
+
+
+def test_top_k_matches_brute_force(tmp_path, corpus):
+    resumes, jobs = corpus
+    items = items_of(resumes)
+    store = CorpusStore.build(str(tmp_path / 'store'), items)
+    texts = dict(items)
+    for job in jobs:
+        for k in (1, 10, len(items)):
+            assert_matches_brute_force(store.top_k(job, k), store.scorer, texts, job, k)
+
+
+def test_appends_replacements_and_removals(tmp_path, corpus):
+    resumes, jobs = corpus
+    items = items_of(resumes)
+    store = CorpusStore.build(str(tmp_path / 'store'), items[:100])
+    store.add_many(items[100:])
+    # Unchanged resumes are not stored again
+    store.add_many(items[:5])
+    assert len(store.docs) == len(items)
+
+    texts = dict(items)
+    texts['r1'] = resumes[1] + "\nKubernetes expert"
+    store.add('r1', texts['r1'])
+    store.remove('r2')
+    del texts['r2']
+
+    assert len(store) == len(texts)
+    assert 'r2' not in store
+    for job in jobs:
+        assert_matches_brute_force(store.top_k(job, 10), store.scorer, texts, job, 10)
+
+    # Reopening maps the same files; compacting drops dead rows without changing results
+    reopened = CorpusStore(str(tmp_path / 'store'))
+    before = reopened.top_k(jobs[0], 10)
+    compacted = reopened.compact()
+    assert len(compacted.docs) == len(texts)
+    assert compacted.top_k(jobs[0], 10) == before
+
+
+def test_stored_text_and_skills(tmp_path, corpus):
+    resumes, _ = corpus
+    store = CorpusStore.build(str(tmp_path / 'store'), items_of(resumes[:20]))
+    scorer = store.scorer
+    assert store.processed_text(0) == scorer.preprocess_text(resumes[0])
+    assert store.document_skills(3) == scorer.extract_skills(resumes[3])
+
+
+def test_compact_with_refit_scorer(tmp_path, corpus):
+    resumes, jobs = corpus
+    items = items_of(resumes)
+    store = CorpusStore.build(str(tmp_path / 'store'), items)
+    refit = ResumeJobScorer().fit_processed(store.processed_texts())
+    compacted = store.compact(refit)
+    assert_matches_brute_force(compacted.top_k(jobs[1], 10), refit, dict(items), jobs[1], 10)
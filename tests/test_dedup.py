@@ -0,0 +1,77 @@
+"""MinHash/LSH near-duplicate grouping against exact shingle Jaccard"""
+import pytest
+
+from utils.batch import iter_batch_analysis
+from utils.dedup import MinHasher, NearDuplicateIndex, near_duplicate_groups, shingles, similarity
+from utils.metrics import Metrics
+from utils.scoring import ResumeJobScorer
+
+
+def jaccard(processed1, processed2):
+    a, b = shingles(processed1), shingles(processed2)
+    return len(a & b) / len(a | b)
+
+
+def edited(text, words, every=100):
+    """text with a word replaced every `every` words, starting with words[0]"""
+    tokens = text.split()
+    for n, i in enumerate(range(0, len(tokens), every)):
+        tokens[i] = words[n % len(words)]
+    return ' '.join(tokens)
+
+
+@pytest.fixture(scope='module')
+def processed(corpus):
+    scorer = ResumeJobScorer()
+    return [scorer.preprocess_text(resume) for resume in corpus[0][:40]]
+
+
+def test_signature_estimates_jaccard(processed):
+    hasher = MinHasher()
+    for text in processed[:10]:
+        for other in (edited(text, ['zebra']), edited(text, ['zebra', 'yak'], every=6), processed[-1]):
+            estimate = similarity(hasher.signature(text), hasher.signature(other))
+            assert estimate == pytest.approx(jaccard(text, other), abs=0.15)
+    assert hasher.signature('') is None
+
+
+def test_groups_match_exhaustive_comparison(processed):
+    # Every original followed by a lightly edited copy
+    texts = [variant for text in processed for variant in (text, edited(text, ['zebra', 'yak']))]
+    groups = near_duplicate_groups(texts)
+
+    assert groups == [2 * (i // 2) for i in range(len(texts))]
+    for i, j in ((i, j) for i in range(0, len(texts), 2) for j in range(i + 2, len(texts), 2)):
+        assert jaccard(texts[i], texts[j]) < 0.5
+
+
+def test_index_keeps_the_first_representative(processed):
+    index = NearDuplicateIndex(threshold=0.8)
+    original = processed[0]
+    assert index.add_text('a', original) == 'a'
+    assert index.add_text('b', edited(original, ['zebra'])) == 'a'
+    # Far enough from 'a' to start a group of its own
+    assert index.add_text('c', processed[1]) == 'c'
+    assert index.add_text('empty', '') == 'empty'
+    assert index.add_text('empty again', '') == 'empty again'
+    assert len(index) == 5 and set(index.signatures) == {'a', 'c'}
+
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=16)
+
+
+@pytest.mark.parametrize('fitted', [False, True])
+def test_batch_shares_the_representative_analysis(corpus, fitted):
+    resumes, jobs = corpus
+    texts = [resumes[0], resumes[1], edited(resumes[0], ['zebra']), resumes[2], resumes[1]]
+    files = [(f'r{i}.txt', text.encode(), 'text/plain') for i, text in enumerate(texts)]
+    metrics = Metrics()
+    scorer = ResumeJobScorer(corpus=resumes + jobs, metrics=metrics) if fitted else ResumeJobScorer(metrics=metrics)
+
+    results = sorted(iter_batch_analysis(files, jobs[0], scorer=scorer, workers=2, dedup=NearDuplicateIndex()),
+                     key=lambda result: result['index'])
+    assert [result['duplicate_of'] for result in results] == [None, None, 'r0.txt', None, 'r1.txt']
+    assert results[2]['analysis'] == results[0]['analysis']
+    assert results[4]['analysis'] == results[1]['analysis']
+    assert metrics.counter('files', status='analyzed') == 3
+    assert metrics.counter('files', status='duplicate') == 2
@@ -0,0 +1,72 @@
+"""Hashing-vectorizer IDF statistics merged from shards against one fit on everything"""
+import pickle
+
+import numpy as np
+import pytest
+
+from utils.hashing import HashingTfidfVectorizer
+from utils.scoring import ResumeJobScorer
+
+
+def shards(items, count):
+    return [items[i::count] for i in range(count)]
+
+
+def test_merged_shards_equal_one_fit(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer()
+    documents = [scorer.preprocess_text(text) for text in resumes + jobs]
+
+    whole = HashingTfidfVectorizer().fit(documents)
+    parts = [HashingTfidfVectorizer().partial_fit(shard) for shard in shards(documents, 3)]
+    # A fit_transform leaves sparse statistics behind until they are merged
+    lazy = HashingTfidfVectorizer()
+    lazy.fit_transform(documents[:5])
+    merged = lazy.merge(HashingTfidfVectorizer().fit(documents[5:]))
+    for part in parts[1:]:
+        parts[0].merge(part)
+
+    for vectorizer in (parts[0], merged):
+        assert vectorizer.document_count == whole.document_count
+        assert np.array_equal(vectorizer.document_frequency, whole.document_frequency)
+        assert (vectorizer.transform(documents[:10]) != whole.transform(documents[:10])).nnz == 0
+
+
+def test_fit_transform_matches_fit_then_transform(corpus):
+    resumes, _ = corpus
+    scorer = ResumeJobScorer()
+    documents = [scorer.preprocess_text(text) for text in resumes[:8]]
+    fitted = HashingTfidfVectorizer().fit(documents)
+    assert np.allclose(HashingTfidfVectorizer().fit_transform(documents).toarray(),
+                       fitted.transform(documents).toarray())
+
+    restored = pickle.loads(pickle.dumps(fitted))
+    assert np.allclose(restored.transform(documents).toarray(), fitted.transform(documents).toarray())
+
+
+def test_scorer_merge_idf(corpus):
+    resumes, jobs = corpus
+    whole = ResumeJobScorer(engine='hashing', corpus=resumes + jobs)
+    merged = ResumeJobScorer(engine='hashing')
+    for shard in shards(resumes + jobs, 4):
+        merged.merge_idf(ResumeJobScorer(engine='hashing').partial_fit(shard))
+
+    assert merged.fitted
+    # Same statistics as the vocabulary engine, up to hash collisions
+    vocabulary = ResumeJobScorer(corpus=resumes + jobs)
+    for resume in resumes[:20]:
+        analysis = merged.analyze_match(resume, jobs[0])
+        assert analysis == whole.analyze_match(resume, jobs[0])
+        assert analysis['similarity_score'] == pytest.approx(
+            vocabulary.analyze_match(resume, jobs[0])['similarity_score'], abs=0.05)
+
+
+def test_merge_rejects_mismatched_statistics():
+    with pytest.raises(ValueError):
+        HashingTfidfVectorizer(n_features=2 ** 10).merge(HashingTfidfVectorizer(n_features=2 ** 12))
+    with pytest.raises(ValueError):
+        ResumeJobScorer().merge_idf(ResumeJobScorer(engine='hashing'))
+    with pytest.raises(ValueError):
+        ResumeJobScorer().partial_fit(['python developer'])
+    with pytest.raises(ValueError):
+        HashingTfidfVectorizer().transform(['python developer'])
@@ -0,0 +1,38 @@
+"""IncrementalAnalyzer results against a fresh analyze_match after every edit"""
+import random
+
+import pytest
+
+from utils.incremental import IncrementalAnalyzer
+from utils.scoring import ResumeJobScorer
+
+
+def edits(resumes, steps, seed=1):
+    """Yield a resume text after each random paragraph edit"""
+    rng = random.Random(seed)
+    text = resumes[0]
+    for _ in range(steps):
+        paragraphs = text.split('\n\n')
+        op = rng.random()
+        if op < 0.4:
+            paragraphs[rng.randrange(len(paragraphs))] += ' ' + rng.choice(resumes[1:]).split('\n')[1]
+        elif op < 0.6:
+            paragraphs.insert(rng.randrange(len(paragraphs) + 1), rng.choice(resumes).split('\n\n')[1])
+        elif op < 0.75 and len(paragraphs) > 1:
+            paragraphs.pop(rng.randrange(len(paragraphs)))
+        else:
+            paragraphs[rng.randrange(len(paragraphs))] = rng.choice(['', 'the and of', 'C++ and Node.js'])
+        text = '\n\n'.join(paragraphs)
+        yield text
+
+
+@pytest.mark.parametrize('fitted', [False, True])
+def test_matches_analyze_match_after_each_edit(corpus, fitted):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer(corpus=resumes + jobs) if fitted else ResumeJobScorer()
+    analyzer = IncrementalAnalyzer(scorer)
+    for step, text in enumerate(edits(resumes, 40)):
+        # Switch jobs halfway, which invalidates the cached job side
+        job = jobs[0] if step < 20 else jobs[1]
+        assert analyzer.analyze(text, job) == scorer.analyze_match(text, job)
+    assert analyzer.reused > 0
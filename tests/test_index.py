@@ -0,0 +1,45 @@
+"""CandidateIndex rankings against brute-force analyze_match"""
+from conftest import assert_matches_brute_force
+
+from utils.index import CandidateIndex
+
+
+def pool_of(resumes):
+    return {f'r{i}': text for i, text in enumerate(resumes)}
+
+
+def test_top_k_matches_brute_force(corpus):
+    resumes, jobs = corpus
+    pool = pool_of(resumes)
+    index = CandidateIndex.build(pool)
+    for job in jobs:
+        for k in (1, 10, len(pool)):
+            assert_matches_brute_force(index.top_k(job, k), index.scorer, pool, job, k)
+
+
+def test_top_k_after_add_replace_and_remove(corpus):
+    resumes, jobs = corpus
+    pool = pool_of(resumes)
+    index = CandidateIndex.build(pool)
+
+    for key in ('r3', 'r40', 'r99'):
+        index.remove(key)
+        del pool[key]
+    pool['new'] = resumes[5] + "\nKubernetes and Terraform"
+    index.add('new', pool['new'])
+    pool['r7'] = resumes[9]
+    index.add('r7', pool['r7'])
+
+    assert len(index) == len(pool)
+    assert 'r3' not in index
+    for job in jobs:
+        assert_matches_brute_force(index.top_k(job, 10), index.scorer, pool, job, 10)
+
+
+def test_save_and_load(tmp_path, corpus):
+    resumes, jobs = corpus
+    pool = pool_of(resumes)
+    index = CandidateIndex.build(pool)
+    index.save(str(tmp_path / 'index.pkl'))
+    loaded = CandidateIndex.load(str(tmp_path / 'index.pkl'))
+    assert loaded.top_k(jobs[0], 10) == index.top_k(jobs[0], 10)
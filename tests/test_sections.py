@@ -0,0 +1,82 @@
+"""Resume segmentation and the section-weighted match report"""
+import pytest
+
+from utils.scoring import ResumeJobScorer
+from utils.sections import SectionMatch, SectionScore, segment
+
+RESUME = """Jane Doe
+jane@example.com
+
+## PROFESSIONAL SUMMARY:
+Backend engineer.
+
+Work Experience
+Acme Corp, 2019-2024
+Built APIs in Python.
+Tools: Docker, Kubernetes
+Skills: SQL, Redis
+
+* Education *
+BSc Computer Science
+
+experience
+Globex, 2016-2019
+"""
+
+
+def test_segment_headings():
+    sections = dict(segment(RESUME))
+    assert list(sections) == ['other', 'summary', 'experience', 'skills', 'education']
+    assert sections['other'] == 'Jane Doe\njane@example.com'
+    assert sections['summary'] == 'Backend engineer.'
+    # Inline "Tools:" and "Skills:" lines go to skills without ending the experience
+    # section, and a repeated heading merges into the first one
+    assert sections['experience'].splitlines() == ['Acme Corp, 2019-2024', 'Built APIs in Python.',
+                                                   '', '', 'Globex, 2016-2019']
+    assert sections['skills'] == 'Docker, Kubernetes\nSQL, Redis'
+    assert sections['education'] == 'BSc Computer Science'
+
+
+def test_segment_without_headings():
+    assert segment('Python developer\nSkills are my passion and then some') == \
+        [('other', 'Python developer\nSkills are my passion and then some')]
+    assert segment('') == []
+    assert segment('Skills\n\n') == []
+
+
+def match(sections, job_skills):
+    scores = {name: SectionScore(similarity, skills, 0.0) for name, (similarity, skills) in sections.items()}
+    return SectionMatch(scores, job_skills, sorted({s for _, skills in sections.values() for s in skills}))
+
+
+def test_overall_skill_match_counts_each_job_skill_once():
+    section_match = match({'experience': (40.0, ['Python', 'Docker']),
+                           'skills': (20.0, ['SQL', 'Redis']),
+                           'education': (0.0, [])}, ['Python', 'Docker', 'SQL', 'Redis'])
+    report = section_match.overall({'experience': 0.5, 'skills': 0.5, 'education': 0.0},
+                                   {'similarity': 0.6, 'skills': 0.4})
+    assert report['matched_skills'] == ['Docker', 'Python', 'Redis', 'SQL']
+    assert report['missing_skills'] == []
+    assert report['skill_match_score'] == 100.0
+    # Similarity is weighted over the sections, renormalized over the weights that apply
+    assert report['similarity_score'] == 30.0
+    assert report['overall_score'] == pytest.approx(30.0 * 0.6 + 100.0 * 0.4)
+
+    # A zero weight drops the section's skills from the match and the lists alike
+    report = section_match.overall({'experience': 1.0, 'skills': 0.0}, {'similarity': 0.6, 'skills': 0.4})
+    assert report['missing_skills'] == ['Redis', 'SQL']
+    assert report['skill_match_score'] == 50.0
+    assert report['similarity_score'] == 40.0
+
+
+def test_overall_from_scorer(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer()
+    for resume in resumes[:20]:
+        section_match = scorer.section_match(resume, jobs[0])
+        report = section_match.overall()
+        job_skills = report['job_skills']
+        expected = len(report['matched_skills']) / len(job_skills) * 100 if job_skills else 0.0
+        assert report['skill_match_score'] == round(expected, 2)
+        assert set(report['matched_skills']) | set(report['missing_skills']) == set(job_skills)
+        assert report == scorer.analyze_sections(resume, jobs[0])
@@ -0,0 +1,88 @@
+"""LSA similarity and EmbeddingPool ranking (float32 and int8) against brute force"""
+import numpy as np
+import pytest
+
+from utils.scoring import ResumeJobScorer
+from utils.semantic import EmbeddingPool, SemanticModel, quantize
+
+
+@pytest.fixture(scope='module')
+def model_and_texts(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer()
+    processed = [scorer.preprocess_text(text) for text in resumes]
+    model = SemanticModel(n_components=32).fit(processed)
+    return model, processed, [scorer.preprocess_text(job) for job in jobs]
+
+
+def brute_force_top_k(cosines, keys, k):
+    order = sorted(range(len(keys)), key=lambda i: (-cosines[i], i))[:k]
+    return [(keys[i], float(cosines[i])) for i in order]
+
+
+def test_similarities_match_pairwise_similarity(model_and_texts):
+    model, processed, jobs = model_and_texts
+    batch = model.similarities(processed[:20] + [''], jobs[0])
+    pairs = [model.similarity(text, jobs[0]) for text in processed[:20]]
+    assert batch[:20] == pytest.approx(pairs, abs=1e-3)
+    assert batch[20] == 0.0 and model.similarity('', jobs[0]) == 0.0
+
+    vectors = model.embed(processed[:20])
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+
+@pytest.mark.parametrize('quantized', [False, True])
+@pytest.mark.parametrize('block_rows', [7, 1000])
+def test_pool_top_k_matches_brute_force(model_and_texts, quantized, block_rows):
+    model, processed, jobs = model_and_texts
+    # Repeated rows make ties, which go to the earlier key
+    texts = processed + processed[:10]
+    keys = [f'r{i}' for i in range(len(texts))]
+    vectors = model.embed(texts)
+    pool = EmbeddingPool.from_vectors(keys, vectors, quantized=quantized)
+    assert pool.quantized == quantized
+
+    query = model.embed([jobs[1]])[0]
+    cosines = pool.cosines(query, block_rows=block_rows)
+    assert np.allclose(cosines, vectors @ query, atol=0.01 if quantized else 1e-5)
+    for k in (1, 5, 25, len(keys) + 5):
+        assert pool.top_k(query, k, block_rows=block_rows) == brute_force_top_k(cosines, keys, k)
+
+
+def test_quantized_pool_is_a_quarter_of_the_size(model_and_texts):
+    model, processed, _ = model_and_texts
+    vectors = model.embed(processed)
+    codes, scales = quantize(vectors)
+    assert codes.dtype == np.int8 and codes.nbytes * 4 == vectors.nbytes
+    assert np.abs(codes * scales[:, None] - vectors).max() <= scales.max() / 2 + 1e-6
+
+
+def test_pool_save_and_load(tmp_path, model_and_texts):
+    model, processed, jobs = model_and_texts
+    keys = [f'r{i}' for i in range(30)]
+    vectors = model.embed(processed[:30])
+    query = model.embed([jobs[0]])[0]
+    path = str(tmp_path / 'pool')
+    for quantized in (True, False):
+        pool = EmbeddingPool.from_vectors(keys, vectors, quantized=quantized)
+        pool.save(path)
+        loaded = EmbeddingPool.load(path)
+        # A float32 pool saved over a quantized one drops the stale scales
+        assert loaded.quantized == quantized
+        assert loaded.top_k(query, 5) == pool.top_k(query, 5)
+
+    with pytest.raises(ValueError):
+        EmbeddingPool(keys[:3], vectors)
+
+
+def test_scorer_semantic_component(corpus, model_and_texts):
+    resumes, jobs = corpus
+    model = model_and_texts[0]
+    scorer = ResumeJobScorer(corpus=resumes + jobs, semantic=model)
+    analyses = scorer.analyze_many(resumes[:10], jobs[0])
+    for resume, analysis in zip(resumes[:10], analyses):
+        single = scorer.analyze_match(resume, jobs[0])
+        assert 0.0 <= single['semantic_score'] <= 100.0
+        assert analysis['semantic_score'] == pytest.approx(single['semantic_score'], abs=0.01)
+        assert analysis['similarity_score'] == pytest.approx(single['similarity_score'], abs=0.01)
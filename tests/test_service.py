@@ -0,0 +1,161 @@
+"""MicroBatcher grouping and limits, and the scoring service's HTTP handlers"""
+import asyncio
+import json
+
+import pytest
+
+from utils.index import CandidateIndex
+from utils.scoring import ResumeJobScorer
+from utils.service import HTTPError, MicroBatcher, ScoringService
+
+
+class RecordingPool:
+    """Stands in for a WorkerPool: records each batch and holds it until released"""
+
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def run(self, function, *args):
+        self.batches.append(args)
+        await self.release.wait()
+        if function.__name__ == '_analyze_batch':
+            resumes, job_description = args
+            return [f'{job_description}:{resume}' for resume in resumes]
+        return function.__name__
+
+
+def test_merges_concurrent_requests_per_job():
+    async def scenario():
+        pool = RecordingPool()
+        batcher = MicroBatcher(pool, max_batch=4, max_wait=0.01)
+        results = await asyncio.gather(batcher.analyze(['a', 'b'], 'job1'),
+                                       batcher.analyze(['c'], 'job1'),
+                                       batcher.analyze(['d'], 'job2'),
+                                       batcher.analyze(['e', 'f', 'g'], 'job1'))
+        return pool, batcher, results
+
+    pool, batcher, results = asyncio.run(scenario())
+    assert results == [['job1:a', 'job1:b'], ['job1:c'], ['job2:d'], ['job1:e', 'job1:f', 'job1:g']]
+    # job1's six resumes fill one max_batch of four and leave two for the timer
+    assert sorted(pool.batches) == [(['a', 'b', 'c', 'e'], 'job1'), (['d'], 'job2'), (['f', 'g'], 'job1')]
+    assert batcher.pending == 0 and not batcher.tasks
+    assert batcher.stats()['batches'] == 3
+
+
+def test_unmerged_requests_are_one_batch_each():
+    async def scenario():
+        pool = RecordingPool()
+        batcher = MicroBatcher(pool, max_batch=2, merge=False)
+        await asyncio.gather(batcher.analyze(['a', 'b', 'c'], 'job'), batcher.analyze(['d'], 'job'))
+        return pool
+
+    assert sorted(asyncio.run(scenario()).batches) == [(['a', 'b', 'c'], 'job'), (['d'], 'job')]
+
+
+@pytest.mark.parametrize('merge', [True, False])
+def test_pending_limit(merge):
+    async def scenario():
+        pool = RecordingPool()
+        pool.release.clear()
+        batcher = MicroBatcher(pool, max_pending=3, merge=merge)
+        with pytest.raises(HTTPError) as too_big:
+            await batcher.analyze(['a', 'b', 'c', 'd'], 'job')
+        held = asyncio.ensure_future(batcher.analyze(['a', 'b'], 'job'))
+        index_query = asyncio.ensure_future(batcher.run(1, len))
+        await asyncio.sleep(0.05)
+        pending = batcher.pending
+        with pytest.raises(HTTPError) as busy:
+            await batcher.analyze(['c'], 'job')
+        pool.release.set()
+        await asyncio.gather(held, index_query)
+        return too_big.value, busy.value, pending, batcher.pending
+
+    too_big, busy, pending, after = asyncio.run(scenario())
+    assert too_big.status == 413
+    assert busy.status == 503 and busy.headers == {'Retry-After': '1'}
+    assert (pending, after) == (3, 0)
+
+
+async def request(port, method, path, body=None):
+    """(status, JSON payload) of one HTTP/1.1 request"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + data)
+    # Read by Content-Length: workers forked mid-request hold the socket open past the server's close
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+    length = int(head.lower().split('content-length:', 1)[1].split('\r\n', 1)[0])
+    payload = await reader.readexactly(length)
+    writer.close()
+    return int(head.split()[1]), json.loads(payload)
+
+
+def serve(service, requests):
+    async def scenario():
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return [await request(port, *args) for args in requests]
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    return asyncio.run(scenario())
+
+
+def roundtrip(analysis):
+    return json.loads(json.dumps(analysis))
+
+
+def test_http_handlers(corpus):
+    resumes, jobs = corpus
+    scorer = ResumeJobScorer(corpus=resumes + jobs)
+    service = ScoringService(scorer=scorer, workers=2)
+    responses = serve(service, [
+        ('POST', '/match', {'resume': resumes[0], 'job': jobs[0]}),
+        ('POST', '/batch', {'resumes': resumes[:5], 'job': jobs[1]}),
+        ('POST', '/top-k', {'resumes': resumes[:20], 'job': jobs[2], 'k': 3}),
+        ('POST', '/top-k', {'job': jobs[2]}),
+        ('POST', '/match', b'not json'),
+        ('POST', '/batch', {'resumes': [1], 'job': jobs[0]}),
+        ('GET', '/match'),
+        ('GET', '/nope'),
+        ('GET', '/health'),
+    ])
+    statuses = [status for status, _ in responses]
+    assert statuses == [200, 200, 200, 400, 400, 400, 405, 404, 200]
+
+    assert responses[0][1] == roundtrip(scorer.analyze_match(resumes[0], jobs[0]))
+    assert responses[1][1]['results'] == [roundtrip(scorer.analyze_match(resume, jobs[1])) for resume in resumes[:5]]
+    scores = [scorer.analyze_match(resume, jobs[2])['overall_score'] for resume in resumes[:20]]
+    best = sorted(range(20), key=lambda i: (-scores[i], i))[:3]
+    assert [result['index'] for result in responses[2][1]['results']] == best
+
+    health = responses[-1][1]
+    assert health['status'] == 'ok' and health['fitted'] and health['merging']
+    assert health['pending'] == 0 and health['errors'] == 5
+
+
+def test_http_unfitted_batch_and_index_top_k(tmp_path, corpus):
+    resumes, jobs = corpus
+    index = CandidateIndex.build({f'r{i}': text for i, text in enumerate(resumes[:30])})
+    index.save(str(tmp_path / 'index.pkl'))
+
+    unfitted = serve(ScoringService(workers=1), [
+        ('POST', '/match', {'resume': resumes[0], 'job': jobs[0]}),
+        ('POST', '/batch', {'resumes': resumes[:6], 'job': jobs[0]}),
+    ])
+    assert unfitted[0][1] == roundtrip(ResumeJobScorer().analyze_match(resumes[0], jobs[0]))
+    # Each request is fitted on its own resumes plus the job, as a batch run is
+    batch_scorer = ResumeJobScorer(corpus=[jobs[0]] + resumes[:6])
+    assert unfitted[1][1]['results'] == [roundtrip(batch_scorer.analyze_match(resume, jobs[0]))
+                                         for resume in resumes[:6]]
+
+    indexed = serve(ScoringService(workers=1, index_path=str(tmp_path / 'index.pkl')), [
+        ('POST', '/top-k', {'job': jobs[1], 'k': 4}),
+    ])
+    assert [(result['key'], result['analysis']) for result in indexed[0][1]['results']] == \
+        [(key, roundtrip(analysis)) for key, analysis in index.top_k(jobs[1], 4)]
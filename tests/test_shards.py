@@ -0,0 +1,60 @@
+"""Sharded scatter-gather top-K against brute-force analyze_match over the whole pool"""
+import asyncio
+import os
+import pickle
+
+from utils.scoring import ResumeJobScorer
+from utils.shards import ShardCoordinator, ShardWorker, build_shards, merge_top_k
+
+
+def build(tmp_path, resumes, shards=3):
+    # Exact copies in other shards make ties that cross shard boundaries
+    items = [(f'r{i}', text) for i, text in enumerate(resumes + resumes[:10])]
+    paths = build_shards(str(tmp_path / 'shards'), items, shards, ResumeJobScorer())
+    with open(os.path.join(paths[0], 'scorer.pkl'), 'rb') as f:
+        scorer = pickle.load(f)
+    return items, paths, scorer
+
+
+def expected_top_k(scorer, items, job_description, k):
+    """Keys and analyses of the pool's top k, ties to the earlier resume"""
+    analyses = [scorer.analyze_match(text, job_description) for _, text in items]
+    order = sorted(range(len(items)), key=lambda i: (-analyses[i]['overall_score'], i))[:k]
+    return [items[i][0] for i in order], [analyses[i] for i in order]
+
+
+def test_merged_local_top_k_matches_brute_force(tmp_path, corpus):
+    resumes, jobs = corpus
+    items, paths, scorer = build(tmp_path, resumes)
+    workers = [ShardWorker(path) for path in paths]
+    for job in jobs:
+        for k in (1, 10, len(items)):
+            merged = merge_top_k({number: worker._top_k(job, k) for number, worker in enumerate(workers)}, k)
+            keys, analyses = expected_top_k(scorer, items, job, k)
+            assert [result['key'] for result in merged] == keys
+            assert [result['analysis'] for result in merged] == analyses
+
+
+async def serve_and_query(workers, job_description, k, dead_url=None):
+    servers = [await asyncio.start_server(worker.handle_connection, '127.0.0.1', 0) for worker in workers]
+    try:
+        urls = [f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}" for server in servers]
+        if dead_url:
+            # A dead replica in front of the first shard's live one
+            urls[0] = [dead_url, urls[0]]
+        return await ShardCoordinator(urls, timeout=10).top_k(job_description, k)
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+
+def test_coordinator_over_http(tmp_path, corpus):
+    resumes, jobs = corpus
+    items, paths, scorer = build(tmp_path, resumes)
+    workers = [ShardWorker(path) for path in paths]
+    results, failed = asyncio.run(serve_and_query(workers, jobs[0], 10, dead_url='http://127.0.0.1:9'))
+    assert failed == {}
+    keys, analyses = expected_top_k(scorer, items, jobs[0], 10)
+    assert [result['key'] for result in results] == keys
+    assert [result['analysis'] for result in results] == analyses
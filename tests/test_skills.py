@@ -0,0 +1,31 @@
+"""Tests for SkillMatcher phrase scanning"""
+import os
+
+from utils.skills import SkillMatcher
+from utils.taxonomy import SkillTaxonomy
+
+TAXONOMY = os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'skill_taxonomy.csv')
+
+
+def taxonomy_matcher():
+    return SkillTaxonomy.from_file(TAXONOMY).compile()
+
+
+def test_tokens_inside_a_longer_match_do_not_match_again():
+    matcher = taxonomy_matcher()
+    assert matcher.skills_in("Node.js and Express.js") == ['Node.js', 'Express']
+    assert matcher.skills_in("angular.js apps") == ['AngularJS']
+
+
+def test_standalone_alias_still_matches():
+    matcher = taxonomy_matcher()
+    assert matcher.skills_in("js, ecmascript") == ['JavaScript']
+    assert matcher.skills_in("JavaScript, node.js, react.js") == ['JavaScript', 'Node.js', 'React']
+
+
+def test_longest_phrase_wins_and_spans_cover_it():
+    matcher = SkillMatcher(['machine', 'machine learning', 'learning'])
+    text = "machine learning and learning"
+    matches = matcher.find(text)
+    assert [match.skill for match in matches] == ['Machine Learning', 'Learning']
+    assert text[matches[0].start:matches[0].end] == "machine learning"
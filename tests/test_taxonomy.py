@@ -0,0 +1,84 @@
+"""Taxonomy alias resolution, file formats and the compiled index"""
+import json
+import os
+import shutil
+
+import pytest
+
+from utils import taxonomy as taxonomy_module
+from utils.scoring import ResumeJobScorer
+from utils.skills import SkillMatcher
+from utils.taxonomy import SkillTaxonomy, load_skill_matcher
+
+TAXONOMY = os.path.join(os.path.dirname(__file__), os.pardir, 'data', 'skill_taxonomy.csv')
+
+
+@pytest.fixture
+def taxonomy_path(tmp_path):
+    # A copy, so the index written next to it stays out of the repo
+    path = str(tmp_path / 'skills.csv')
+    shutil.copy(TAXONOMY, path)
+    return path
+
+
+def test_scorer_resolves_aliases_to_canonical_skills(taxonomy_path):
+    scorer = ResumeJobScorer(taxonomy=taxonomy_path)
+    assert scorer.extract_skills("Ran k8s clusters, tuned postgres, trained sklearn models") == \
+        ['Kubernetes', 'PostgreSQL', 'scikit-learn']
+
+    # An alias in the resume matches the canonical name in the job, and vice versa
+    analysis = scorer.analyze_match("Kube, psql and scikit learn", "Kubernetes, PostgreSQL, sklearn and Docker")
+    assert analysis['matched_skills'] == ['Kubernetes', 'PostgreSQL', 'scikit-learn']
+    assert analysis['missing_skills'] == ['Docker']
+    assert analysis['skill_match_score'] == 75.0
+
+
+@pytest.mark.parametrize('filename, content', [
+    ('skills.json', json.dumps({'Kubernetes': ['k8s'], 'Go': ['golang']})),
+    ('skills.json', json.dumps([{'skill': 'Kubernetes', 'aliases': ['k8s']}, {'skill': 'Go', 'aliases': ['golang']}])),
+    ('skills.csv', 'skill,aliases\nKubernetes,k8s\nGo,golang\n'),
+])
+def test_file_formats_load_the_same_taxonomy(tmp_path, filename, content):
+    path = tmp_path / filename
+    path.write_text(content, encoding='utf-8')
+    taxonomy = SkillTaxonomy.from_file(str(path))
+    assert taxonomy.skills == {'Kubernetes': ['k8s'], 'Go': ['golang']}
+    assert taxonomy.compile().skills_in("golang services on k8s") == ['Go', 'Kubernetes']
+
+
+def test_plain_text_and_canonical_names_win(tmp_path):
+    path = tmp_path / 'skills.txt'
+    path.write_text('# comment\nRust\nTerraform\n', encoding='utf-8')
+    assert list(SkillTaxonomy.from_file(str(path)).skills) == ['Rust', 'Terraform']
+
+    taxonomy = SkillTaxonomy()
+    taxonomy.add('Go', ['golang'])
+    taxonomy.add('Golang', ['go'])
+    # 'golang' is another skill's canonical name, so it is not taken over by the alias
+    assert taxonomy.compile().skills_in('go and golang') == ['Go', 'Golang']
+
+
+def test_index_is_reused_until_the_source_changes(taxonomy_path, monkeypatch):
+    matcher = load_skill_matcher(taxonomy_path)
+    index_path = taxonomy_path + '.idx'
+    assert os.path.exists(index_path)
+
+    # A fresh index is loaded without parsing the source again
+    def fail(path):
+        raise AssertionError('taxonomy was parsed again')
+    monkeypatch.setattr(taxonomy_module.SkillTaxonomy, 'from_file', staticmethod(fail))
+    loaded = load_skill_matcher(taxonomy_path)
+    assert loaded.fingerprint() == matcher.fingerprint()
+    assert SkillMatcher.load(index_path).skills_in('k8s') == ['Kubernetes']
+    monkeypatch.undo()
+
+    # A corrupt index is rebuilt
+    with open(index_path, 'wb') as f:
+        f.write(b'not an index')
+    assert load_skill_matcher(taxonomy_path).skills_in('k8s') == ['Kubernetes']
+
+    # So is one older than the source
+    with open(taxonomy_path, 'a', encoding='utf-8') as f:
+        f.write('Terraform,tf\n')
+    os.utime(index_path, (0, 0))
+    assert load_skill_matcher(taxonomy_path).skills_in('tf modules') == ['Terraform']
@@ -0,0 +1,140 @@
+"""Streaming ZIP/TAR resume archives and byte-identical file detection
+
+iter_archive() reads an archive's resume members one at a time, so a batch
+only ever holds the members in flight rather than the unpacked archive.
+ZIP members are read through the central directory; TAR archives (plain or
+gzip/bzip2/xz compressed) are read front to back in stream mode, so they are
+never seeked or decompressed twice. Members are read with a byte cap, which
+keeps a compressed bomb from expanding past the extraction size limit.
+
+IdenticalFiles drops files whose bytes were already seen earlier in a
+stream, keyed by a content hash, so identical copies are never extracted or
+scored twice.
+"""
+import hashlib
+import os
+import posixpath
+import tarfile
+import zipfile
+
+from utils.extraction import DEFAULT_MAX_BYTES, EXTENSION_TYPES
+
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def is_archive(filename):
+    """Whether filename names a ZIP or TAR archive"""
+    name = filename.lower()
+    return name.endswith(ZIP_EXTENSIONS) or name.endswith(TAR_EXTENSIONS)
+
+
+def is_resume_member(name):
+    """Whether an archive member looks like a resume (skips folders and OS metadata files)"""
+    parts = name.replace('\\', '/').split('/')
+    if '__MACOSX' in parts or any(part.startswith('.') for part in parts if part):
+        return False
+    return os.path.splitext(name)[1].lower() in EXTENSION_TYPES
+
+
+def count_resumes(filename, fileobj):
+    """Number of resume members in a ZIP archive, or None where counting needs a full read (TAR)"""
+    if not filename.lower().endswith(ZIP_EXTENSIONS):
+        return None
+    fileobj.seek(0)
+    with zipfile.ZipFile(fileobj) as archive:
+        return sum(1 for info in archive.infolist() if not info.is_dir() and is_resume_member(info.filename))
+
+
+def iter_archive(filename, fileobj, max_bytes=DEFAULT_MAX_BYTES):
+    """Yield (name, data, None) for every resume member of a ZIP or TAR archive
+
+    Names are the archive's filename joined with the member path. Members
+    larger than max_bytes are cut at max_bytes + 1 bytes, enough for
+    extract_text to reject them without reading the rest.
+    """
+    limit = None if max_bytes is None else max_bytes + 1
+    fileobj.seek(0)
+    if filename.lower().endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not is_resume_member(info.filename):
+                    continue
+                with archive.open(info) as member:
+                    data = member.read(limit) if limit else member.read()
+                yield posixpath.join(filename, info.filename), data, None
+        return
+
+    # 'r|*': sequential stream, any compression
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for info in archive:
+            if not info.isfile() or not is_resume_member(info.name):
+                continue
+            member = archive.extractfile(info)
+            data = member.read(limit) if limit else member.read()
+            yield posixpath.join(filename, info.name), data, None
+
+
+def iter_uploads(uploads, max_bytes=DEFAULT_MAX_BYTES):
+    """Expand (filename, fileobj, mime_type) uploads into (filename, data, mime_type) resumes, lazily"""
+    for filename, fileobj, mime_type in uploads:
+        if is_archive(filename):
+            yield from iter_archive(filename, fileobj, max_bytes)
+        else:
+            fileobj.seek(0)
+            yield filename, fileobj.read(), mime_type
+
+
+class IdenticalFiles:
+    """Filters byte-identical copies out of a file stream and hands them their original's result
+
+    unique() passes each distinct file on (in order) and holds back copies;
+    release() maps a result for the n-th unique file back to its input
+    position and returns it together with results for every copy of it.
+    Copies get the original's analysis, with its filename under 'duplicate_of'.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        # content hash -> unique file number
+        self.first = {}
+        # unique file number -> input position
+        self.positions = []
+        # unique file number -> its result, once known
+        self.results = {}
+        # unique file number -> [(input position, filename)] copies waiting for its result
+        self.waiting = {}
+        self.ready = []
+
+    def unique(self, files):
+        for position, (filename, data, mime_type) in enumerate(files):
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            number = self.first.get(digest)
+            if number is None:
+                self.first[digest] = len(self.positions)
+                self.positions.append(position)
+                yield filename, data, mime_type
+            elif number in self.results:
+                self._share(position, filename, self.results[number])
+            else:
+                self.waiting.setdefault(number, []).append((position, filename))
+
+    def release(self, result):
+        """Results to yield for a result of the inner stream (its 'index' is a unique file number)"""
+        number = result['index']
+        result['index'] = self.positions[number]
+        self.results[number] = result
+        for position, filename in self.waiting.pop(number, []):
+            self._share(position, filename, result)
+        ready, self.ready = [result] + self.ready, []
+        return ready
+
+    def pop_ready(self):
+        ready, self.ready = self.ready, []
+        return ready
+
+    def _share(self, position, filename, result):
+        self.ready.append({'index': position, 'filename': filename, 'analysis': result['analysis'],
+                           'error': result['error'], 'duplicate_of': result['filename']})
+        if self.metrics is not None:
+            self.metrics.count('files', status='identical')
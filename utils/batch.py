@@ -0,0 +1,467 @@
+import copy
+import glob
+import heapq
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.archive import IdenticalFiles
+from utils.extraction import EXTENSION_TYPES, extract_text
+from utils.metrics import Metrics
+from utils.scoring import ResumeJobScorer
+
+logger = logging.getLogger(__name__)
+
+# Scorer owned by each pool worker, created once by the pool initializer
+_worker_scorer = None
+
+
+def default_workers():
+    """Number of worker processes to use when none is configured"""
+    return os.cpu_count() or 1
+
+
+def find_resume_files(inputs):
+    """Yield supported resume paths from directories, glob patterns or file paths"""
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, dirs, names in os.walk(pattern):
+                dirs.sort()
+                for name in sorted(names):
+                    if os.path.splitext(name)[1].lower() in EXTENSION_TYPES:
+                        yield os.path.join(root, name)
+        else:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path) and os.path.splitext(path)[1].lower() in EXTENSION_TYPES:
+                    yield path
+
+
+def read_files(paths):
+    """Lazily read paths into (filename, data, mime_type) tuples for iter_batch_analysis"""
+    for path in paths:
+        with open(path, 'rb') as f:
+            yield path, f.read(), None
+
+
+def read_text(path):
+    """(path, text, error) for one resume file"""
+    try:
+        with open(path, 'rb') as f:
+            return path, extract_text(path, f.read()), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def iter_texts(inputs, workers=None):
+    """Yield (path, text) for every readable resume under inputs, extracting in parallel
+
+    Files that fail to extract are logged and skipped.
+    """
+    paths = find_resume_files(inputs)
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as executor:
+        for path, text, error in executor.map(read_text, paths, chunksize=16):
+            if error:
+                logger.warning("Error processing %s: %s", path, error)
+            else:
+                yield path, text
+
+
+def result_row(result):
+    """Flatten a batch result into the summary row shown in the results table"""
+    analysis = result['analysis']
+    if analysis is None:
+        return {
+            'filename': result['filename'],
+            'overall_score': None,
+            'similarity_score': None,
+            'skill_match_score': None,
+            'matched_skills_count': None,
+            'missing_skills_count': None,
+            'matched_skills': None,
+            'missing_skills': None,
+            'duplicate_of': result.get('duplicate_of'),
+            'error': result['error'],
+        }
+    return {
+        'filename': result['filename'],
+        'overall_score': float(analysis['overall_score']),
+        'similarity_score': float(analysis['similarity_score']),
+        'skill_match_score': float(analysis['skill_match_score']),
+        'matched_skills_count': len(analysis['matched_skills']),
+        'missing_skills_count': len(analysis['missing_skills']),
+        'matched_skills': '; '.join(analysis['matched_skills']),
+        'missing_skills': '; '.join(analysis['missing_skills']),
+        'duplicate_of': result.get('duplicate_of'),
+        'error': None,
+    }
+
+
+def batch_scorer(scorer, job_description, processed_resumes=(), reference=()):
+    """Scorer to analyze a whole batch with: fitted once on the job, the batch and reference resumes
+
+    processed_resumes are the batch's own resumes after preprocess_text, so
+    the vocabulary and IDF weights are the ones analyze_match would get from
+    fitting on the same documents. Fitted scorers are used as they are.
+    """
+    scorer = scorer if scorer is not None else ResumeJobScorer()
+    if scorer.fitted:
+        return scorer
+    documents = [scorer.preprocess_text(job_description), *processed_resumes,
+                 *(scorer.preprocess_text(text) for text in reference)]
+    try:
+        return copy.copy(scorer).fit_processed(documents)
+    except ValueError:
+        # Nothing to fit on (an empty job and batch); score each pair on its own
+        return scorer
+
+
+def _init_worker(scorer):
+    global _worker_scorer
+    scorer = scorer if scorer is not None else ResumeJobScorer()
+    if scorer.metrics is not None:
+        # A forked worker inherits the parent's registry, contents and listeners
+        # included; drain() must only ship what this worker recorded
+        scorer = scorer.with_metrics(Metrics())
+    _worker_scorer = scorer
+
+
+def analyze_file(scorer, filename, data, mime_type, job_description, extract_options=None):
+    """Extract and analyze one file, reporting failures instead of raising"""
+    try:
+        resume_text = extract_text(filename, data, mime_type, metrics=scorer.metrics,
+                                   **(extract_options or {}))
+        analysis = scorer.analyze_match(resume_text, job_description)
+        result = {'filename': filename, 'analysis': analysis, 'error': None}
+    except Exception as e:
+        result = {'filename': filename, 'analysis': None, 'error': str(e)}
+    if scorer.metrics is not None:
+        scorer.metrics.count('files', status='failed' if result['error'] else 'analyzed')
+    return result
+
+
+def prepare_file(scorer, filename, data, mime_type, hasher, extract_options=None):
+    """Extract one file and compute its MinHash signature, reporting failures instead of raising"""
+    try:
+        resume_text = extract_text(filename, data, mime_type, metrics=scorer.metrics,
+                                   **(extract_options or {}))
+        processed = scorer.preprocess_text(resume_text)
+        return {'filename': filename, 'text': resume_text, 'processed': processed,
+                'signature': hasher.signature(processed), 'error': None}
+    except Exception as e:
+        if scorer.metrics is not None:
+            scorer.metrics.count('files', status='failed')
+        return {'filename': filename, 'text': None, 'processed': None, 'signature': None, 'error': str(e)}
+
+
+def extract_file(scorer, filename, data, mime_type, hasher=None, extract_options=None):
+    """Extract, preprocess and skill-scan one file for scoring after the batch is fitted
+
+    Only the preprocessed text goes back to the parent, not the extracted
+    text. With a hasher the MinHash signature is included for deduplication.
+    """
+    try:
+        resume_text = extract_text(filename, data, mime_type, metrics=scorer.metrics,
+                                   **(extract_options or {}))
+        if scorer.metrics is not None:
+            scorer.metrics.observe_size('resume_chars', len(resume_text))
+        processed = scorer.preprocess_text(resume_text)
+        return {'filename': filename, 'processed': processed, 'skills': scorer.extract_skills(resume_text),
+                'signature': hasher.signature(processed) if hasher is not None else None, 'error': None}
+    except Exception as e:
+        if scorer.metrics is not None:
+            scorer.metrics.count('files', status='failed')
+        return {'filename': filename, 'processed': None, 'skills': None, 'signature': None, 'error': str(e)}
+
+
+def analyze_prepared(scorer, filename, resume_text, processed, job_description):
+    """Analyze a prepare_file result, reporting failures instead of raising"""
+    try:
+        analysis = scorer.analyze_preprocessed(resume_text, processed, job_description)
+        result = {'filename': filename, 'analysis': analysis, 'error': None}
+    except Exception as e:
+        result = {'filename': filename, 'analysis': None, 'error': str(e)}
+    if scorer.metrics is not None:
+        scorer.metrics.count('files', status='failed' if result['error'] else 'analyzed')
+    return result
+
+
+def _in_worker(function, *args):
+    result = function(_worker_scorer, *args)
+    # Ship this task's metrics back for the parent's registry to merge
+    if _worker_scorer.metrics is not None:
+        result['metrics'] = _worker_scorer.metrics.drain()
+    return result
+
+
+class _DuplicateGroups:
+    """Routes prepared files to scoring or to their near-duplicate group's result"""
+
+    def __init__(self, dedup, metrics):
+        self.dedup = dedup
+        self.metrics = metrics
+        # Representative index -> its scored result
+        self.scored = {}
+        # Representative index -> [(index, filename)] waiting for its result
+        self.waiting = {}
+        # Results ready to be yielded
+        self.ready = []
+
+    def add(self, index, prepared):
+        """Return True when the file represents a new group and must be scored"""
+        if prepared['error']:
+            self.ready.append({'index': index, 'filename': prepared['filename'], 'analysis': None,
+                               'error': prepared['error'], 'duplicate_of': None})
+            return False
+
+        representative = self.dedup.add(index, prepared['signature'])
+        if representative == index:
+            self.waiting[index] = []
+            return True
+        if representative in self.scored:
+            self._share(index, prepared['filename'], self.scored[representative])
+        else:
+            self.waiting[representative].append((index, prepared['filename']))
+        return False
+
+    def add_result(self, index, result):
+        """Record a representative's result and release the duplicates waiting for it"""
+        result['index'] = index
+        result['duplicate_of'] = None
+        self.scored[index] = result
+        self.ready.append(result)
+        for member, filename in self.waiting.pop(index, []):
+            self._share(member, filename, result)
+
+    def _share(self, index, filename, result):
+        self.ready.append({'index': index, 'filename': filename, 'analysis': result['analysis'],
+                           'error': result['error'], 'duplicate_of': result['filename']})
+        if self.metrics is not None:
+            self.metrics.count('files', status='duplicate')
+
+    def pop_ready(self):
+        ready, self.ready = self.ready, []
+        return ready
+
+
+def iter_batch_analysis(files, job_description, scorer=None, workers=None, max_pending=None,
+                        extract_options=None, dedup=None, skip_identical=False, reference=()):
+    """Analyze (filename, data, mime_type) tuples, yielding results as they complete
+
+    Results arrive in completion order, each with the input position under
+    'index'. At most max_pending files are held in flight, so files can be a
+    lazy iterable. extract_options (max_pages, max_bytes, max_chars, workers)
+    are passed to extract_text. When a worker process crashes, the files it took down are
+    retried one at a time in a fresh pool, so only the file that actually
+    crashes is reported as an error and the rest of the batch carries on.
+    Metrics recorded in worker processes are merged into scorer.metrics.
+
+    An unfitted scorer is fitted once on the job description, the batch's
+    own resumes and the reference resume texts (see batch_scorer), so scores
+    match analyze_match with a scorer fitted on the same documents and do not
+    depend on the batch order or the number of workers. Every file is then
+    extracted before any is scored: the preprocessed texts of the whole batch
+    are held in memory until the fit, and results arrive in input order.
+    Pass a fitted scorer to stream large batches instead.
+
+    With a NearDuplicateIndex as dedup, each file is extracted and MinHashed
+    first and only the first file of each near-duplicate group to finish
+    extracting is analyzed; the others get its analysis, with its filename
+    under 'duplicate_of'.
+
+    With skip_identical, files whose bytes match an earlier file are not
+    extracted at all and get the earlier file's analysis the same way.
+    """
+    scorer = scorer if scorer is not None else ResumeJobScorer()
+    if skip_identical:
+        identical = IdenticalFiles(scorer.metrics)
+        for result in _iter_batch_analysis(identical.unique(files), job_description, scorer, workers,
+                                           max_pending, extract_options, dedup, reference):
+            yield from identical.release(result)
+        yield from identical.pop_ready()
+        return
+    yield from _iter_batch_analysis(files, job_description, scorer, workers, max_pending,
+                                    extract_options, dedup, reference)
+
+
+def _iter_batch_analysis(files, job_description, scorer, workers, max_pending, extract_options, dedup,
+                         reference):
+    if not scorer.fitted:
+        yield from _iter_fitted_on_batch(files, job_description, scorer, workers, max_pending,
+                                         extract_options, dedup, reference)
+        return
+
+    groups = _DuplicateGroups(dedup, scorer.metrics) if dedup is not None else None
+
+    def file_task(index, filename, data, mime_type):
+        if groups is None:
+            return (index, filename, analyze_file, (filename, data, mime_type, job_description, extract_options))
+        return (index, filename, prepare_file, (filename, data, mime_type, dedup.hasher, extract_options))
+
+    # Group representatives waiting to be analyzed, run ahead of new files
+    queued = []
+    tasks = (file_task(index, filename, data, mime_type)
+             for index, (filename, data, mime_type) in enumerate(files))
+    for task, result in _run_tasks(tasks, scorer, workers, max_pending, queued):
+        yield from _finish(task, result, groups, queued, job_description)
+
+
+def _iter_fitted_on_batch(files, job_description, scorer, workers, max_pending, extract_options, dedup,
+                          reference):
+    """Extract every file, fit once on the job plus the batch, then score the batch in one pass"""
+    metrics = scorer.metrics
+    hasher = dedup.hasher if dedup is not None else None
+    tasks = ((index, filename, extract_file, (filename, data, mime_type, hasher, extract_options))
+             for index, (filename, data, mime_type) in enumerate(files))
+    extracted = sorted((task[0], result) for task, result in _run_tasks(tasks, scorer, workers, max_pending))
+
+    scorer = batch_scorer(scorer, job_description,
+                          [result['processed'] for _, result in extracted if not result['error']], reference)
+
+    groups = _DuplicateGroups(dedup, metrics) if dedup is not None else None
+    to_score = []
+    for index, result in extracted:
+        if groups is not None:
+            if groups.add(index, result):
+                to_score.append((index, result))
+            yield from groups.pop_ready()
+        elif result['error']:
+            yield {'index': index, 'filename': result['filename'], 'analysis': None, 'error': result['error']}
+        else:
+            to_score.append((index, result))
+
+    try:
+        analyses = scorer.analyze_processed_many([result['processed'] for _, result in to_score],
+                                                 [result['skills'] for _, result in to_score],
+                                                 job_description)
+        error = None
+    except Exception as e:
+        analyses, error = [None] * len(to_score), str(e)
+
+    for (index, result), analysis in zip(to_score, analyses):
+        if metrics is not None:
+            metrics.count('files', status='failed' if error else 'analyzed')
+        scored = {'filename': result['filename'], 'analysis': analysis, 'error': error}
+        if groups is None:
+            scored['index'] = index
+            yield scored
+        else:
+            groups.add_result(index, scored)
+            yield from groups.pop_ready()
+
+
+def _run_tasks(tasks, scorer, workers, max_pending, queued=None):
+    """Run (index, filename, function, args) tasks, yielding (task, result) as each completes
+
+    Tasks the caller appends to queued run ahead of the remaining tasks.
+    """
+    workers = workers or default_workers()
+    metrics = scorer.metrics
+    queued = queued if queued is not None else []
+
+    if workers <= 1:
+        for task in tasks:
+            yield task, task[2](scorer, *task[3])
+            while queued:
+                task = queued.pop(0)
+                yield task, task[2](scorer, *task[3])
+        return
+
+    max_pending = max_pending or workers * 2
+    tasks = iter(tasks)
+    pending = {}
+    # Tasks that were in flight when a worker died; each is retried alone so a
+    # second crash can be blamed on the right file
+    suspects = []
+    exhausted = False
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scorer,))
+
+    def submit(task, isolated):
+        pending[executor.submit(_in_worker, task[2], *task[3])] = (task, isolated)
+
+    try:
+        while pending or suspects or queued or not exhausted:
+            if suspects:
+                if not pending:
+                    submit(suspects.pop(0), True)
+            else:
+                # Keep the pool fed without reading every file up front
+                while queued and len(pending) < max_pending:
+                    submit(queued.pop(0), False)
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        task = next(tasks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    submit(task, False)
+
+            if not pending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            crashed = False
+            for future in done:
+                task, _ = pending[future]
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    crashed = True
+                    continue
+                except Exception as e:
+                    result = {'filename': task[1], 'analysis': None, 'error': str(e)}
+                del pending[future]
+                worker_metrics = result.pop('metrics', None)
+                if worker_metrics is not None and metrics is not None:
+                    metrics.merge(worker_metrics)
+                yield task, result
+
+            if crashed:
+                # A worker died and took every in-flight task with it: restart the pool
+                lost = list(pending.values())
+                pending.clear()
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                               initargs=(scorer,))
+                for task, isolated in lost:
+                    if isolated:
+                        error = "Worker process crashed while analyzing this file"
+                        yield task, {'filename': task[1], 'analysis': None, 'error': error}
+                    else:
+                        suspects.append(task)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _finish(task, result, groups, queued, job_description):
+    """Results to yield for a completed task, queueing analysis of new group representatives"""
+    index, filename, function, _ = task
+    if groups is None:
+        result['index'] = index
+        return [result]
+    if function is prepare_file:
+        if groups.add(index, result):
+            queued.append((index, filename, analyze_prepared,
+                           (filename, result['text'], result['processed'], job_description)))
+    else:
+        groups.add_result(index, result)
+    return groups.pop_ready()
+
+
+def top_k_results(results, k, skip_duplicates=False):
+    """Keep the k best-scoring successful results from a result stream, best first
+
+    With skip_duplicates, near-duplicates of another result are left out so
+    the ranking is not filled with copies of one resume.
+    """
+    heap = []
+    for result in results:
+        if result['analysis'] is None or (skip_duplicates and result.get('duplicate_of')):
+            continue
+        # Ties go to the earlier input so rankings are deterministic
+        entry = (result['analysis']['overall_score'], -result['index'], result)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [result for _, _, result in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
@@ -0,0 +1,124 @@
+"""Packed skill bitsets for vectorized many-to-many skill matching
+
+Skills get integer ids and each document's skill set becomes a row of
+uint64 words. Matched counts for an N x M resume-by-job grid are then
+popcount(resume & job) accumulated one word at a time over blocks of
+resumes, so temporaries stay (block, M) in size. Skill names are only decoded when asked for.
+
+Each row costs ceil(vocabulary / 64) words, so this suits vocabularies up to
+a few thousand skills; for very large taxonomies the sparse skill matrices
+in utils.catalog stay smaller.
+"""
+import numpy as np
+
+# Upper bound on the temporary (block, M) arrays built per grid block
+GRID_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Popcount of every byte value, for NumPy versions without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """Number of set bits per uint64 element"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    as_bytes = words.view(np.uint8).reshape(words.shape + (8,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+class SkillBitsets:
+    """Skill vocabulary that encodes skill lists as packed uint64 bitsets"""
+
+    def __init__(self, skills=()):
+        self.ids = {}
+        self.names = []
+        for skill in skills:
+            self.add(skill)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def words(self):
+        return max(1, -(-len(self.names) // 64))
+
+    def add(self, skill):
+        """Return the id for skill, assigning the next one if it is new"""
+        skill_id = self.ids.get(skill)
+        if skill_id is None:
+            skill_id = self.ids[skill] = len(self.names)
+            self.names.append(skill)
+        return skill_id
+
+    def encode_many(self, skill_lists, words=None):
+        """Encode skill lists into an (n, words) uint64 array, growing the vocabulary"""
+        skill_lists = list(skill_lists)
+        ids = [[self.add(skill) for skill in skills] for skills in skill_lists]
+        words = words or self.words
+
+        bits = np.zeros((len(ids), words), dtype=np.uint64)
+        for row, skill_ids in enumerate(ids):
+            for skill_id in skill_ids:
+                bits[row, skill_id >> 6] |= np.uint64(1) << np.uint64(skill_id & 63)
+        return bits
+
+    def decode(self, bits):
+        """Skill names for one bitset row, in id order"""
+        names = []
+        for word_index, word in enumerate(bits.tolist()):
+            while word:
+                low = word & -word
+                names.append(self.names[(word_index << 6) + low.bit_length() - 1])
+                word ^= low
+        return names
+
+
+class SkillMatchGrid:
+    """Skill-match results for every resume/job pair, decoded to names on demand"""
+
+    def __init__(self, vocabulary, resume_bits, job_bits, matched):
+        self.vocabulary = vocabulary
+        self.resume_bits = resume_bits
+        self.job_bits = job_bits
+        self.matched = matched
+        self.job_counts = popcount(job_bits).sum(axis=1, dtype=np.int64)
+        self.missing = self.job_counts[np.newaxis, :] - matched
+
+        # Same formula as analyze_match: matched / job skills * 100, or 0 without job skills
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.percentages = np.where(self.job_counts > 0,
+                                        matched / np.maximum(self.job_counts, 1) * 100, 0.0)
+
+    @property
+    def shape(self):
+        return self.matched.shape
+
+    def matched_skills(self, resume, job):
+        return self.vocabulary.decode(self.resume_bits[resume] & self.job_bits[job])
+
+    def missing_skills(self, resume, job):
+        return self.vocabulary.decode(self.job_bits[job] & ~self.resume_bits[resume])
+
+
+def skill_match_grid(resume_skills, job_skills, vocabulary=None):
+    """Compute a SkillMatchGrid from per-document skill lists"""
+    vocabulary = vocabulary if vocabulary is not None else SkillBitsets()
+    resume_skills = list(resume_skills)
+    job_skills = list(job_skills)
+
+    # Register every skill first so both sides share one word width
+    for skills in resume_skills + job_skills:
+        for skill in skills:
+            vocabulary.add(skill)
+    resume_bits = vocabulary.encode_many(resume_skills)
+    job_bits = vocabulary.encode_many(job_skills)
+
+    n, m = len(resume_bits), len(job_bits)
+    matched = np.zeros((n, m), dtype=np.int64)
+    block = max(1, GRID_BLOCK_BYTES // max(1, m * 8))
+    for start in range(0, n, block):
+        counts = matched[start:start + block]
+        for word in range(vocabulary.words):
+            counts += popcount(resume_bits[start:start + block, word, np.newaxis] & job_bits[np.newaxis, :, word])
+
+    return SkillMatchGrid(vocabulary, resume_bits, job_bits, matched)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Default memory budget for the in-memory tier
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def content_hash(text):
+    """Stable content hash used as the cache key for a document"""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+def _entry_size(key, value):
+    """Approximate memory footprint of a cached value, in bytes"""
+    if isinstance(value, str):
+        return len(key) + len(value)
+    return len(key) + sum(len(item) + 8 for item in value)
+
+
+class PreprocessCache:
+    """Content-addressed cache for preprocessed text and extracted skills
+
+    Entries live in an in-memory LRU tier bounded by max_bytes and, when a
+    path is given, in a SQLite file shared across processes and runs.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._init_state()
+
+    def _init_state(self):
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = os.getpid()
+
+    def _check_process(self):
+        # A forked worker inherits this object without pickling; never reuse the
+        # parent's SQLite connection or lock from another process
+        if self._pid != os.getpid():
+            self._init_state()
+
+    def __getstate__(self):
+        # Connections and locks don't cross process boundaries; each process
+        # starts with an empty memory tier and reopens the shared SQLite file
+        return {'max_bytes': self.max_bytes, 'path': self.path}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def __len__(self):
+        return len(self._memory)
+
+    @property
+    def memory_bytes(self):
+        return self._memory_bytes
+
+    def _connection(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return self._db
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        self._check_process()
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self.path is not None:
+                row = self._connection().execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """Store a value (a string or a list of strings) under key"""
+        self._check_process()
+        with self._lock:
+            self._remember(key, value)
+            if self.path is not None:
+                db = self._connection()
+                db.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+                db.commit()
+
+    def _remember(self, key, value):
+        size = _entry_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= _entry_size(key, old)
+        self._memory[key] = value
+        self._memory_bytes += size
+
+        # Evict least recently used entries until we are back under budget
+        while self._memory_bytes > self.max_bytes:
+            old_key, old_value = self._memory.popitem(last=False)
+            self._memory_bytes -= _entry_size(old_key, old_value)
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        self._check_process()
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self.path is not None:
+                db = self._connection()
+                db.execute("DELETE FROM cache")
+                db.commit()
+
+    def stats(self):
+        """Hit/miss counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+        }
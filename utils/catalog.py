@@ -0,0 +1,190 @@
+"""Job catalog for reverse matching: rank many job postings for one resume
+
+Each posting's TF-IDF vector (from a scorer with a frozen vocabulary) and
+extracted skills are computed once and stored as sparse matrices. Scoring a
+resume against the whole catalog is one sparse matrix-vector product for
+similarity plus one for skill overlap; full analyze_match-style breakdowns
+are only built for the top K postings.
+"""
+import csv
+import io
+import json
+import pickle
+
+import numpy as np
+from scipy import sparse
+
+from utils.scoring import ResumeJobScorer
+
+# Bump when the saved catalog layout changes
+CATALOG_VERSION = 1
+
+
+def read_postings(file, filename='postings.csv'):
+    """Read (key, title, description) postings from a CSV, JSON or JSONL file object
+
+    CSV files need a 'description' column; 'id' and 'title' are optional.
+    JSONL files hold one object per line with the same fields, JSON files an
+    array of them. Postings without an id are keyed by their position.
+    """
+    data = file.read()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    name = filename.lower()
+    if name.endswith('.jsonl'):
+        rows = [json.loads(line) for line in data.splitlines() if line.strip()]
+    elif name.endswith('.json'):
+        rows = json.loads(data)
+        if not isinstance(rows, list):
+            raise ValueError(f"{filename} must hold a JSON array of postings")
+    else:
+        rows = list(csv.DictReader(io.StringIO(data)))
+
+    postings = []
+    for i, row in enumerate(rows):
+        description = row.get('description') or ''
+        if not description.strip():
+            continue
+        title = row.get('title') or description.strip().splitlines()[0][:80]
+        key = row.get('id')
+        # An id of 0 is a real id; only a missing or blank one falls back
+        if key is None or key == '':
+            key = i
+        postings.append((str(key), title, description))
+    return postings
+
+
+class JobCatalog:
+    """Precomputed vectors and skills for a catalog of job postings"""
+
+    def __init__(self, scorer):
+        if not scorer.fitted:
+            raise ValueError("JobCatalog needs a scorer fitted on a reference corpus "
+                             "(ResumeJobScorer(corpus=...) or JobCatalog.build)")
+        if scorer.semantic is not None:
+            raise ValueError("JobCatalog scores the TF-IDF and skill components only; "
+                             "use a scorer without a semantic model")
+        self.scorer = scorer
+        self.keys = []
+        self.titles = []
+        self.job_skills = []
+        self.skill_ids = {}
+        self.vectors = None
+        self.skill_matrix = None
+        self.skill_counts = np.zeros(0, dtype=np.int64)
+        self.active = np.zeros(0, dtype=bool)
+
+    @classmethod
+    def build(cls, postings, scorer=None):
+        """Fit a scorer on (key, title, description) postings and store them all"""
+        postings = list(postings)
+        scorer = scorer if scorer is not None else ResumeJobScorer()
+        scorer.fit(description for _, _, description in postings)
+        catalog = cls(scorer)
+        catalog.add_many(postings)
+        return catalog
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def add_many(self, postings):
+        """Append (key, title, description) postings"""
+        postings = list(postings)
+        if not postings:
+            return
+
+        processed = [self.scorer.preprocess_text(description) for _, _, description in postings]
+        vectors = self.scorer.vectorizer.transform(processed).tocsr()
+
+        rows = []
+        cols = []
+        for row, (key, title, description) in enumerate(postings):
+            skills = self.scorer.extract_skills(description)
+            self.keys.append(key)
+            self.titles.append(title)
+            self.job_skills.append(skills)
+            for skill in skills:
+                rows.append(row)
+                cols.append(self.skill_ids.setdefault(skill, len(self.skill_ids)))
+
+        skill_matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)),
+                                         shape=(len(postings), len(self.skill_ids)))
+
+        if self.vectors is None:
+            self.vectors = vectors
+            self.skill_matrix = skill_matrix
+        else:
+            # The skill vocabulary may have grown; widen the existing matrix first
+            self.skill_matrix.resize((self.skill_matrix.shape[0], len(self.skill_ids)))
+            self.vectors = sparse.vstack([self.vectors, vectors], format='csr')
+            self.skill_matrix = sparse.vstack([self.skill_matrix, skill_matrix], format='csr')
+
+        self.skill_counts = np.diff(self.skill_matrix.indptr)
+        self.active = np.concatenate([self.active, np.ones(len(postings), dtype=bool)])
+
+    def remove(self, key):
+        """Exclude a posting from future matches"""
+        for i, existing in enumerate(self.keys):
+            if existing == key:
+                self.active[i] = False
+
+    def score(self, resume_text):
+        """Return (overall, similarity, skill match, resume skills) arrays over every posting"""
+        n = len(self.keys)
+        processed_resume = self.scorer.preprocess_text(resume_text)
+        if processed_resume and n:
+            resume_vector = self.scorer.vectorizer.transform([processed_resume])
+            similarity = np.minimum((self.vectors @ resume_vector.T).toarray().ravel() * 100, 100)
+        else:
+            similarity = np.zeros(n)
+
+        resume_skills = self.scorer.extract_skills(resume_text)
+        resume_skill_vector = np.zeros(len(self.skill_ids))
+        for skill in resume_skills:
+            skill_id = self.skill_ids.get(skill)
+            if skill_id is not None:
+                resume_skill_vector[skill_id] = 1.0
+
+        if n:
+            matched = self.skill_matrix @ resume_skill_vector
+            with np.errstate(divide='ignore', invalid='ignore'):
+                skill_match = np.where(self.skill_counts > 0, matched / self.skill_counts * 100, 0.0)
+        else:
+            skill_match = np.zeros(0)
+
+        overall = similarity * self.scorer.blend['similarity'] + skill_match * self.scorer.blend['skills']
+        return overall, similarity, skill_match, resume_skills
+
+    def top_k(self, resume_text, k=10):
+        """Return [(key, title, analysis)] for the k best postings, best first
+
+        Each analysis has the same fields and values as analyze_match(resume, posting).
+        """
+        overall, similarity, _, resume_skills = self.score(resume_text)
+        overall = np.where(self.active, overall, -np.inf)
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+
+        candidates = np.argpartition(-overall, k - 1)[:k]
+        # Best score first; ties among the selected go to earlier postings
+        candidates = candidates[np.lexsort((candidates, -overall[candidates]))]
+
+        return [(self.keys[i], self.titles[i],
+                 self.scorer._build_match(float(similarity[i]), resume_skills, self.job_skills[i]))
+                for i in candidates]
+
+    def save(self, path):
+        """Write the catalog, including its fitted scorer, to a file"""
+        with open(path, 'wb') as f:
+            pickle.dump({'version': CATALOG_VERSION, 'catalog': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Load a catalog written with save()"""
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != CATALOG_VERSION:
+            raise ValueError(f"Unsupported job catalog version in {path}")
+        return data['catalog']
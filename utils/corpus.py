@@ -0,0 +1,495 @@
+"""Memory-mapped on-disk store for preprocessed resume corpora
+
+A CorpusStore is a directory of flat binary arrays, so a pool of resumes can
+be re-ranked against new postings without re-reading the original files or
+re-running preprocess_text and extract_skills:
+
+    manifest.json       format version and the valid byte length of every file
+    scorer.pkl          the fitted ResumeJobScorer whose vocabulary the store uses
+    tokens.txt          token dictionary, one token per line (line number = id)
+    skills.txt          skill dictionary, one skill per line
+    token_offsets.u64   per-document offsets into token_ids.u32 (preprocessed words)
+    tfidf_indptr.u64    per-document offsets into tfidf_indices.i32 / tfidf_data.f64
+    skill_offsets.u64   per-document offsets into skill_ids.u32, in extraction order
+    key_offsets.u64     per-document offsets into keys.bin (UTF-8 document keys)
+    docs.bin            per-document metadata records (DOC_DTYPE)
+
+Opening maps every array with numpy.memmap, which costs the same for ten
+documents or ten million; dictionaries and the key lookup table are read on
+first use. Scoring walks the TF-IDF and skill arrays in row blocks, so only
+the pages being scored need to be resident.
+
+Growth is append-only: new documents are appended to every file and the
+manifest, rewritten atomically last, records the new lengths, so bytes from
+an interrupted append are ignored and truncated by the next one. Removing or
+replacing a document only sets its tombstone flag; compact() rewrites the
+store without tombstoned documents, optionally re-vectorizing the stored
+tokens with a newly fitted scorer.
+"""
+import itertools
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+
+from utils.cache import content_hash
+
+# Bump when the on-disk layout changes
+CORPUS_VERSION = 1
+
+# Per-document metadata record
+DOC_DTYPE = np.dtype([('hash', 'S16'), ('chars', '<u4'), ('deleted', 'u1')])
+
+# file name -> element dtype of every flat array
+ARRAYS = {
+    'token_offsets.u64': np.dtype('<u8'),
+    'token_ids.u32': np.dtype('<u4'),
+    'tfidf_indptr.u64': np.dtype('<u8'),
+    'tfidf_indices.i32': np.dtype('<i4'),
+    'tfidf_data.f64': np.dtype('<f8'),
+    'skill_offsets.u64': np.dtype('<u8'),
+    'skill_ids.u32': np.dtype('<u4'),
+    'key_offsets.u64': np.dtype('<u8'),
+    'keys.bin': np.dtype('u1'),
+    'docs.bin': DOC_DTYPE,
+}
+OFFSET_ARRAYS = ['token_offsets.u64', 'tfidf_indptr.u64', 'skill_offsets.u64', 'key_offsets.u64']
+TEXT_FILES = ['tokens.txt', 'skills.txt']
+
+# Documents scored per block; bounds the temporary arrays to a few MB
+BLOCK_ROWS = 8192
+
+
+def _map(path, dtype, size):
+    """Read-only view of the first size bytes of a file"""
+    if size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(size // dtype.itemsize,))
+
+
+def _read_lines(path, size):
+    with open(path, 'rb') as f:
+        data = f.read(size)
+    return data.decode('utf-8').split('\n')[:-1]
+
+
+def _row_sums(values, offsets):
+    """Sum of values[offsets[i]:offsets[i + 1]] for each row, with empty rows as 0"""
+    sums = np.zeros(len(offsets) - 1)
+    lengths = np.diff(offsets)
+    nonempty = lengths > 0
+    if values.size:
+        sums[nonempty] = np.add.reduceat(values, offsets[:-1][nonempty])
+    return sums
+
+
+class CorpusStore:
+    """Append-only, memory-mapped store of preprocessed resumes"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CORPUS_VERSION:
+            raise ValueError(f"Unsupported corpus store version in {path}")
+        self.sizes = manifest['sizes']
+        self._scorer = None
+        self._tokens = None
+        self._skills = None
+        self._key_ids = None
+        self._open_arrays()
+
+    def _open_arrays(self):
+        for name, dtype in ARRAYS.items():
+            setattr(self, '_' + name.split('.')[0], _map(self._file(name), dtype, self.sizes[name]))
+        self.docs = self._docs
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @classmethod
+    def create(cls, path, scorer):
+        """Create an empty store at path for documents vectorized with a fitted scorer"""
+        if not scorer.fitted:
+            raise ValueError("CorpusStore needs a scorer fitted on a reference corpus "
+                             "(ResumeJobScorer(corpus=...) or CorpusStore.build)")
+        if scorer.semantic is not None:
+            raise ValueError("CorpusStore scores the TF-IDF and skill components only; "
+                             "use a scorer without a semantic model")
+        os.makedirs(path)
+        with open(os.path.join(path, 'scorer.pkl'), 'wb') as f:
+            pickle.dump(scorer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        sizes = {}
+        for name, dtype in ARRAYS.items():
+            with open(os.path.join(path, name), 'wb') as f:
+                if name in OFFSET_ARRAYS:
+                    f.write(np.zeros(1, dtype=dtype).tobytes())
+            sizes[name] = dtype.itemsize if name in OFFSET_ARRAYS else 0
+        for name in TEXT_FILES:
+            open(os.path.join(path, name), 'wb').close()
+            sizes[name] = 0
+        _write_manifest(path, sizes)
+        return cls(path)
+
+    @classmethod
+    def build(cls, path, resumes, scorer=None):
+        """Fit a scorer on (key, resume text) pairs and store them all"""
+        from utils.scoring import ResumeJobScorer
+        resumes = list(resumes)
+        scorer = scorer if scorer is not None else ResumeJobScorer()
+        scorer.fit(text for _, text in resumes)
+        store = cls.create(path, scorer)
+        store.add_many(resumes)
+        return store
+
+    def __len__(self):
+        """Number of live (not removed) documents"""
+        return int(len(self.docs) - np.count_nonzero(self.docs['deleted']))
+
+    def __contains__(self, key):
+        return key in self.key_ids
+
+    @property
+    def scorer(self):
+        """The fitted scorer documents were vectorized with, unpickled on first use"""
+        if self._scorer is None:
+            with open(self._file('scorer.pkl'), 'rb') as f:
+                self._scorer = pickle.load(f)
+        return self._scorer
+
+    @property
+    def tokens(self):
+        """Token dictionary: token id -> token"""
+        if self._tokens is None:
+            self._tokens = _read_lines(self._file('tokens.txt'), self.sizes['tokens.txt'])
+        return self._tokens
+
+    @property
+    def skills(self):
+        """Skill dictionary: skill id -> skill name"""
+        if self._skills is None:
+            self._skills = _read_lines(self._file('skills.txt'), self.sizes['skills.txt'])
+        return self._skills
+
+    @property
+    def key_ids(self):
+        """{key: document id} of live documents"""
+        if self._key_ids is None:
+            self._key_ids = {self.key(i): i for i in np.flatnonzero(self.docs['deleted'] == 0).tolist()}
+        return self._key_ids
+
+    def key(self, doc_id):
+        start, end = self._key_offsets[doc_id], self._key_offsets[doc_id + 1]
+        return bytes(self._keys[start:end]).decode('utf-8')
+
+    def token_ids(self, doc_id):
+        """Token ids of one document's preprocessed text (a view into the mapped file)"""
+        return self._token_ids[self._token_offsets[doc_id]:self._token_offsets[doc_id + 1]]
+
+    def processed_text(self, doc_id):
+        """preprocess_text output of one document, rebuilt from its token ids"""
+        tokens = self.tokens
+        return ' '.join(tokens[i] for i in self.token_ids(doc_id).tolist())
+
+    def processed_texts(self):
+        """preprocess_text output of every live document, e.g. for scorer.fit_processed()"""
+        for doc_id in np.flatnonzero(self.docs['deleted'] == 0).tolist():
+            yield self.processed_text(doc_id)
+
+    def document_skills(self, doc_id):
+        """extract_skills output of one document"""
+        skills = self.skills
+        start, end = self._skill_offsets[doc_id], self._skill_offsets[doc_id + 1]
+        return [skills[i] for i in self._skill_ids[start:end].tolist()]
+
+    def tfidf(self, start=0, stop=None):
+        """TF-IDF rows start:stop as a CSR matrix whose data and indices view the mapped files"""
+        from scipy import sparse
+        stop = len(self.docs) if stop is None else stop
+        indptr = self._tfidf_indptr[start:stop + 1]
+        low, high = int(indptr[0]), int(indptr[-1])
+        return sparse.csr_matrix((self._tfidf_data[low:high], self._tfidf_indices[low:high],
+                                  (indptr - low).astype(np.int64)),
+                                 shape=(stop - start, _n_features(self.scorer.vectorizer)), copy=False)
+
+    def add(self, key, resume_text):
+        """Add or replace one resume"""
+        self.add_many([(key, resume_text)])
+
+    def add_many(self, items):
+        """Append (key, resume text) pairs; a key already stored with the same text is skipped
+
+        A key stored with different text is replaced: the old document is
+        tombstoned and the new one appended.
+        """
+        # The last text given for a key wins
+        items = dict(items)
+        records = []
+        for key, text in items.items():
+            digest = bytes.fromhex(content_hash(text))
+            existing = self.key_ids.get(key)
+            if existing is not None:
+                if self.docs['hash'][existing] == digest:
+                    continue
+                self.remove(key)
+            records.append((key, text, self.scorer.preprocess_text(text), digest))
+        if not records:
+            return
+
+        tokens = self.tokens
+        token_ids = {token: i for i, token in enumerate(tokens)}
+        skills = self.skills
+        skill_ids = {skill: i for i, skill in enumerate(skills)}
+        new_tokens = []
+        new_skills = []
+
+        def token_id(token):
+            i = token_ids.get(token)
+            if i is None:
+                i = token_ids[token] = len(token_ids)
+                new_tokens.append(token)
+            return i
+
+        def skill_id(skill):
+            i = skill_ids.get(skill)
+            if i is None:
+                i = skill_ids[skill] = len(skill_ids)
+                new_skills.append(skill)
+            return i
+
+        matrix = self.scorer.vectorizer.transform([processed for _, _, processed, _ in records]).tocsr()
+
+        doc_tokens = []
+        doc_skills = []
+        keys = []
+        docs = np.zeros(len(records), dtype=DOC_DTYPE)
+        for row, (key, text, processed, digest) in enumerate(records):
+            doc_tokens.append([token_id(token) for token in processed.split()])
+            doc_skills.append([skill_id(skill) for skill in self.scorer.extract_skills(text)])
+            keys.append(key.encode('utf-8'))
+            docs[row] = (digest, len(text), 0)
+
+        self._append({
+            'token_ids.u32': np.array([i for ids in doc_tokens for i in ids], dtype='<u4'),
+            'token_offsets.u64': _offsets(self._token_offsets, map(len, doc_tokens)),
+            'tfidf_indices.i32': matrix.indices.astype('<i4'),
+            'tfidf_data.f64': matrix.data.astype('<f8'),
+            'tfidf_indptr.u64': _offsets(self._tfidf_indptr, np.diff(matrix.indptr)),
+            'skill_ids.u32': np.array([i for ids in doc_skills for i in ids], dtype='<u4'),
+            'skill_offsets.u64': _offsets(self._skill_offsets, map(len, doc_skills)),
+            'keys.bin': np.frombuffer(b''.join(keys), dtype='u1'),
+            'key_offsets.u64': _offsets(self._key_offsets, map(len, keys)),
+            'docs.bin': docs,
+            'tokens.txt': ''.join(token + '\n' for token in new_tokens).encode('utf-8'),
+            'skills.txt': ''.join(skill + '\n' for skill in new_skills).encode('utf-8'),
+        })
+
+        first = len(self.docs) - len(records)
+        tokens.extend(new_tokens)
+        skills.extend(new_skills)
+        for row, key in enumerate(keys):
+            self.key_ids[key.decode('utf-8')] = first + row
+
+    def _append(self, chunks):
+        """Append bytes to every file, then commit the new lengths to the manifest"""
+        sizes = dict(self.sizes)
+        for name, chunk in chunks.items():
+            data = chunk if isinstance(chunk, bytes) else chunk.tobytes()
+            with open(self._file(name), 'r+b') as f:
+                # Drop anything an interrupted append left past the committed length
+                f.truncate(sizes[name])
+                f.seek(sizes[name])
+                f.write(data)
+            sizes[name] += len(data)
+        _write_manifest(self.path, sizes)
+        self.sizes = sizes
+        self._open_arrays()
+
+    def remove(self, key):
+        """Tombstone a document; unknown keys are ignored"""
+        doc_id = self.key_ids.pop(key, None)
+        if doc_id is None:
+            return
+        offset = doc_id * DOC_DTYPE.itemsize + DOC_DTYPE.fields['deleted'][1]
+        with open(self._file('docs.bin'), 'r+b') as f:
+            f.seek(offset)
+            f.write(b'\x01')
+        self._docs = self.docs = _map(self._file('docs.bin'), DOC_DTYPE, self.sizes['docs.bin'])
+
+    def scores(self, job_description):
+        """(overall, similarity, skill match) arrays over every stored document
+
+        Removed documents score -inf overall.
+        """
+        n = len(self.docs)
+        overall = np.empty(n)
+        similarity = np.zeros(n)
+        skill_match = np.zeros(n)
+
+        processed_job = self.scorer.preprocess_text(job_description)
+        job_vector = None
+        if processed_job:
+            job_vector = self.scorer.vectorizer.transform([processed_job]).toarray().ravel()
+
+        job_skills = self.scorer.extract_skills(job_description)
+        skill_ids = {skill: i for i, skill in enumerate(self.skills)}
+        job_skill_ids = np.array([skill_ids[skill] for skill in job_skills if skill in skill_ids],
+                                 dtype='<u4')
+
+        for start in range(0, n, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, n)
+            if job_vector is not None:
+                indptr = self._tfidf_indptr[start:stop + 1].astype(np.int64)
+                low, high = indptr[0], indptr[-1]
+                products = self._tfidf_data[low:high] * job_vector[self._tfidf_indices[low:high]]
+                similarity[start:stop] = np.minimum(_row_sums(products, indptr - low) * 100, 100)
+            if job_skills:
+                offsets = self._skill_offsets[start:stop + 1].astype(np.int64)
+                low, high = offsets[0], offsets[-1]
+                matched = np.isin(self._skill_ids[low:high], job_skill_ids).astype(np.float64)
+                skill_match[start:stop] = _row_sums(matched, offsets - low) / len(job_skills) * 100
+
+        blend = self.scorer.blend
+        np.add(similarity * blend['similarity'], skill_match * blend['skills'], out=overall)
+        overall[self.docs['deleted'] != 0] = -np.inf
+        return overall, similarity, skill_match
+
+    def top_k(self, job_description, k=10):
+        """Return [(key, analysis)] for the k best live documents, best first
+
+        Each analysis has the same fields and values as analyze_match with the
+        store's scorer. Documents are ranked by the reported (rounded)
+        overall_score, ties going to the earlier document, so the order is
+        the one a sort of analyze_match results would give.
+        """
+        overall, similarity, _ = self.scores(job_description)
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+
+        # Anything that may round to the k-th best score is a candidate
+        kth = np.partition(overall, len(overall) - k)[len(overall) - k]
+        candidates = np.flatnonzero(overall >= kth - 0.01)
+        # round() exactly as the match report does; np.round can differ on halves
+        rounded = np.array([round(score, 2) for score in overall[candidates].tolist()])
+        candidates = candidates[np.lexsort((candidates, -rounded))[:k]]
+
+        job_skills = self.scorer.extract_skills(job_description)
+        return [(self.key(i), self.scorer._build_match(float(similarity[i]), self.document_skills(i), job_skills))
+                for i in candidates.tolist()]
+
+    def compact(self, scorer=None):
+        """Rewrite the store without removed documents
+
+        With a newly fitted scorer (say, scorer.fit_processed(store.processed_texts())),
+        TF-IDF rows are recomputed from the stored tokens, without repeating
+        any preprocessing, and the scorer replaces the stored one. Returns the
+        compacted store; this object is closed.
+        """
+        scorer = scorer if scorer is not None else self.scorer
+        if not scorer.fitted:
+            raise ValueError("compact() needs a fitted scorer")
+        live = np.flatnonzero(self.docs['deleted'] == 0)
+        target = self.path.rstrip(os.sep) + '.compacting'
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.makedirs(target)
+        with open(os.path.join(target, 'scorer.pkl'), 'wb') as f:
+            pickle.dump(scorer, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        sizes = {}
+        for name in TEXT_FILES:
+            shutil.copyfile(self._file(name), os.path.join(target, name))
+            sizes[name] = self.sizes[name]
+
+        def gather(values_name, offsets_name):
+            offsets = getattr(self, '_' + offsets_name.split('.')[0])
+            values = getattr(self, '_' + values_name.split('.')[0])
+            starts, ends = offsets[:-1][live], offsets[1:][live]
+            lengths = (ends - starts).astype(np.int64)
+            new_offsets = np.zeros(len(live) + 1, dtype='<u8')
+            np.cumsum(lengths, out=new_offsets[1:])
+            with open(os.path.join(target, values_name), 'wb') as f:
+                for start, end in zip(starts.tolist(), ends.tolist()):
+                    f.write(values[start:end].tobytes())
+            with open(os.path.join(target, offsets_name), 'wb') as f:
+                f.write(new_offsets.tobytes())
+            sizes[values_name] = int(new_offsets[-1]) * values.dtype.itemsize
+            sizes[offsets_name] = new_offsets.nbytes
+
+        gather('token_ids.u32', 'token_offsets.u64')
+        gather('skill_ids.u32', 'skill_offsets.u64')
+        gather('keys.bin', 'key_offsets.u64')
+        with open(os.path.join(target, 'docs.bin'), 'wb') as f:
+            f.write(np.asarray(self.docs[live]).tobytes())
+        sizes['docs.bin'] = len(live) * DOC_DTYPE.itemsize
+
+        if scorer is self.scorer:
+            gather('tfidf_data.f64', 'tfidf_indptr.u64')
+            gather('tfidf_indices.i32', 'tfidf_indptr.u64')
+        else:
+            _write_tfidf(target, sizes, scorer,
+                         (self.processed_text(i) for i in live.tolist()))
+
+        _write_manifest(target, sizes)
+        self._close()
+        # Swap directories; the manifest of each is complete, so either is usable if interrupted
+        retired = self.path.rstrip(os.sep) + '.old'
+        os.replace(self.path, retired)
+        os.replace(target, self.path)
+        shutil.rmtree(retired)
+        return CorpusStore(self.path)
+
+    def _close(self):
+        for name in ARRAYS:
+            setattr(self, '_' + name.split('.')[0], None)
+        self.docs = None
+
+
+def _n_features(vectorizer):
+    """Number of TF-IDF columns: the hashing width, else the fitted vocabulary size"""
+    return getattr(vectorizer, 'n_features', None) or len(vectorizer.vocabulary_)
+
+
+def _offsets(previous, lengths):
+    """New offset entries continuing previous for rows of the given lengths"""
+    lengths = np.fromiter(lengths, dtype='<u8')
+    return (int(previous[-1]) + np.cumsum(lengths)).astype('<u8')
+
+
+def _write_tfidf(target, sizes, scorer, processed_texts, chunk=BLOCK_ROWS):
+    """Vectorize processed texts with scorer into target's TF-IDF files"""
+    indptr = [np.zeros(1, dtype='<u8')]
+    total = 0
+    with open(os.path.join(target, 'tfidf_indices.i32'), 'wb') as indices, \
+            open(os.path.join(target, 'tfidf_data.f64'), 'wb') as data:
+        batch = []
+        for text in itertools.chain(processed_texts, [None]):
+            if text is not None:
+                batch.append(text)
+                if len(batch) < chunk:
+                    continue
+            if batch:
+                matrix = scorer.vectorizer.transform(batch).tocsr()
+                indices.write(matrix.indices.astype('<i4').tobytes())
+                data.write(matrix.data.astype('<f8').tobytes())
+                indptr.append((total + matrix.indptr[1:]).astype('<u8'))
+                total += int(matrix.indptr[-1])
+                batch = []
+    indptr = np.concatenate(indptr)
+    with open(os.path.join(target, 'tfidf_indptr.u64'), 'wb') as f:
+        f.write(indptr.tobytes())
+    sizes['tfidf_indices.i32'] = total * 4
+    sizes['tfidf_data.f64'] = total * 8
+    sizes['tfidf_indptr.u64'] = indptr.nbytes
+
+
+def _write_manifest(path, sizes):
+    temporary = os.path.join(path, 'manifest.json.tmp')
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({'version': CORPUS_VERSION, 'sizes': sizes}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, os.path.join(path, 'manifest.json'))
@@ -0,0 +1,130 @@
+"""Near-duplicate resume detection with MinHash and locality-sensitive hashing
+
+A resume's preprocessed text is cut into overlapping word shingles, and a
+MinHash signature of num_perm values estimates the Jaccard similarity of two
+shingle sets as the fraction of positions where their signatures agree.
+
+NearDuplicateIndex splits each signature into bands and only compares
+resumes that share at least one whole band with an earlier group, so adding a
+resume costs a handful of dictionary lookups instead of a comparison with
+every resume seen so far. With 16 bands of 8 rows, pairs at Jaccard 0.9
+become candidates with probability over 0.999, pairs at 0.8 about 0.95 and
+pairs at 0.5 about 0.06.
+Candidates are then checked against the threshold on the full signature.
+
+Only group representatives (the first resume of each group) are indexed, and
+members are compared with the representative, so groups cannot drift through
+chains of small edits.
+"""
+import zlib
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Universal hashing h(x) = ((a * x + b) mod p) mod 2^32 over 32-bit shingle hashes;
+# a, b < 2^32 keep a * x + b inside uint64
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(processed, size=SHINGLE_SIZE):
+    """32-bit hashes of the word size-grams of preprocessed text"""
+    tokens = processed.split()
+    if len(tokens) <= size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    return {zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+            for i in range(len(tokens) - size + 1)}
+
+
+def similarity(signature1, signature2):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return float(np.count_nonzero(signature1 == signature2)) / len(signature1)
+
+
+class MinHasher:
+    """MinHash signatures from num_perm seeded hash functions"""
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, _MAX_HASH, num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MAX_HASH, num_perm, dtype=np.uint64)
+
+    def signature(self, processed):
+        """uint32 signature of preprocessed text, or None when it has no words"""
+        values = np.fromiter(shingles(processed, self.shingle_size), dtype=np.uint64)
+        if not values.size:
+            return None
+        hashed = (values[:, None] * self.a + self.b) % np.uint64(_PRIME)
+        return (hashed & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Assigns resumes to near-duplicate groups as they arrive"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        # One {band bytes: [representative keys]} table per band
+        self.buckets = [{} for _ in range(bands)]
+        # Representative key -> signature
+        self.signatures = {}
+        # Key -> representative key
+        self.groups = {}
+
+    def __len__(self):
+        return len(self.groups)
+
+    def _bands(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, signature):
+        """Group key by its signature and return its group's representative key
+
+        A resume joins the group whose representative it is most similar to,
+        if that similarity reaches threshold; otherwise it starts a new group.
+        Resumes without a signature (no words) are never grouped.
+        """
+        if signature is None:
+            self.groups[key] = key
+            return key
+
+        bands = self._bands(signature)
+        candidates = []
+        for bucket, band in zip(self.buckets, bands):
+            candidates.extend(bucket.get(band, ()))
+
+        best, best_similarity = None, self.threshold
+        for candidate in dict.fromkeys(candidates):
+            score = similarity(signature, self.signatures[candidate])
+            if score > best_similarity or (score == best_similarity and best is None):
+                best, best_similarity = candidate, score
+
+        if best is None:
+            best = key
+            self.signatures[key] = signature
+            for bucket, band in zip(self.buckets, bands):
+                bucket.setdefault(band, []).append(key)
+        self.groups[key] = best
+        return best
+
+    def add_text(self, key, processed):
+        """add() for preprocessed text"""
+        return self.add(key, self.hasher.signature(processed))
+
+
+def near_duplicate_groups(processed_texts, threshold=DEFAULT_THRESHOLD):
+    """Representative position for each of a list of preprocessed texts"""
+    index = NearDuplicateIndex(threshold)
+    return [index.add_text(i, text) for i, text in enumerate(processed_texts)]
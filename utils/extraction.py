@@ -0,0 +1,187 @@
+"""Text extraction from TXT, PDF and DOCX resumes
+
+Readers are generators that yield text page by page (PDF) or paragraph by
+paragraph (DOCX), so callers can stop early and the full text is joined once.
+Limits on input size, PDF pages and output characters keep a single huge
+document from monopolizing a worker. Nothing here depends on Streamlit;
+failures raise ExtractionError (or the parser's own exception) for the
+caller to report. Passing a utils.metrics.Metrics registry to extract_text
+records input bytes, extraction time and extracted characters per file type.
+"""
+import codecs
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_TYPE = "text/plain"
+
+# File extension -> MIME type, for files that arrive without one
+EXTENSION_TYPES = {
+    '.pdf': PDF_TYPE,
+    '.docx': DOCX_TYPE,
+    '.txt': TEXT_TYPE,
+}
+
+# Short file type names used as metric labels
+TYPE_LABELS = {
+    PDF_TYPE: 'pdf',
+    DOCX_TYPE: 'docx',
+    TEXT_TYPE: 'txt',
+}
+
+# Default limits: far above any real resume, low enough to bound a worker
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_MAX_PAGES = 50
+DEFAULT_MAX_CHARS = 200000
+
+# PDFs with fewer pages than this are never split across processes
+PARALLEL_MIN_PAGES = 16
+
+
+class ExtractionError(ValueError):
+    """A file could not be turned into text"""
+
+
+def _as_bytes(file):
+    """Read a bytes object or binary file object into bytes"""
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        return bytes(file)
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    return file.read()
+
+
+def _extract_page_range(data, start, stop):
+    """Extract pages [start, stop) of a PDF given as bytes (runs in a worker process)"""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [(reader.pages[i].extract_text() or "") + "\n" for i in range(start, stop)]
+
+
+def iter_pdf_pages(file, max_pages=DEFAULT_MAX_PAGES, workers=1):
+    """Yield the text of each PDF page, newline-terminated and in order
+
+    With workers > 1, PDFs of at least PARALLEL_MIN_PAGES pages are split
+    into page ranges extracted in separate processes.
+    """
+    import PyPDF2
+    data = _as_bytes(file)
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+
+    if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+        for i in range(page_count):
+            yield (reader.pages[i].extract_text() or "") + "\n"
+        return
+
+    chunk = -(-page_count // workers)
+    starts = list(range(0, page_count, chunk))
+    stops = [min(start + chunk, page_count) for start in starts]
+    executor = ProcessPoolExecutor(max_workers=len(starts))
+    try:
+        for pages in executor.map(_extract_page_range, [data] * len(starts), starts, stops):
+            yield from pages
+    finally:
+        # The caller may stop early once it has enough text
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_docx_paragraphs(file):
+    """Yield the text of each DOCX paragraph, newline-terminated"""
+    import docx
+    stream = io.BytesIO(file) if isinstance(file, (bytes, bytearray)) else file
+    for paragraph in docx.Document(stream).paragraphs:
+        yield paragraph.text + "\n"
+
+
+def iter_text_chunks(file, chunk_size=64 * 1024):
+    """Yield decoded chunks of a UTF-8 text file, decoding chunk_size bytes at a time
+
+    Characters split across chunk boundaries are held back until complete,
+    so a caller that stops early never decodes the rest of the file.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        view = memoryview(file)
+        blocks = (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+    else:
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        blocks = iter(lambda: file.read(chunk_size), b"")
+    for block in blocks:
+        text = decoder.decode(block)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def file_type(filename, mime_type=None):
+    """Resolve a file's MIME type, falling back to its extension"""
+    if mime_type in (PDF_TYPE, DOCX_TYPE, TEXT_TYPE):
+        return mime_type
+    return EXTENSION_TYPES.get(os.path.splitext(filename)[1].lower())
+
+
+def iter_text(filename, data, mime_type=None, max_bytes=DEFAULT_MAX_BYTES,
+              max_pages=DEFAULT_MAX_PAGES, workers=1):
+    """Yield a document's text in pieces (pages, paragraphs or chunks)"""
+    if max_bytes is not None and len(data) > max_bytes:
+        raise ExtractionError(f"{filename} is {len(data)} bytes, over the {max_bytes} byte limit")
+
+    kind = file_type(filename, mime_type)
+    if kind == TEXT_TYPE:
+        return iter_text_chunks(data)
+    if kind == PDF_TYPE:
+        return iter_pdf_pages(data, max_pages=max_pages, workers=workers)
+    if kind == DOCX_TYPE:
+        return iter_docx_paragraphs(data)
+    raise ExtractionError(f"Unsupported file type: {filename}")
+
+
+def join_limited(pieces, max_chars=DEFAULT_MAX_CHARS):
+    """Join text pieces, stopping once max_chars characters have been collected"""
+    if max_chars is None:
+        return "".join(pieces)
+
+    parts = []
+    total = 0
+    for piece in pieces:
+        parts.append(piece)
+        total += len(piece)
+        if total >= max_chars:
+            break
+    return "".join(parts)[:max_chars]
+
+
+def extract_text(filename, data, mime_type=None, max_bytes=DEFAULT_MAX_BYTES,
+                 max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS, workers=1, metrics=None):
+    """Extract text from raw file bytes; raises on unsupported or unreadable files"""
+    if metrics is None:
+        pieces = iter_text(filename, data, mime_type, max_bytes=max_bytes,
+                           max_pages=max_pages, workers=workers)
+        return join_limited(pieces, max_chars=max_chars)
+
+    label = TYPE_LABELS.get(file_type(filename, mime_type), 'unknown')
+    metrics.observe_size('file_bytes', len(data), type=label)
+    with metrics.time('extract', type=label):
+        pieces = iter_text(filename, data, mime_type, max_bytes=max_bytes,
+                           max_pages=max_pages, workers=workers)
+        text = join_limited(pieces, max_chars=max_chars)
+    metrics.observe_size('extracted_chars', len(text), type=label)
+    return text
+
+
+def read_pdf(file, max_pages=DEFAULT_MAX_PAGES):
+    """Extract text from PDF file"""
+    return join_limited(iter_pdf_pages(file, max_pages=max_pages))
+
+
+def read_docx(file):
+    """Extract text from DOCX file"""
+    return join_limited(iter_docx_paragraphs(file))
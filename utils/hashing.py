@@ -0,0 +1,152 @@
+"""Feature-hashing TF-IDF with mergeable document frequencies
+
+HashingTfidfVectorizer is a drop-in for the scorer's TfidfVectorizer that
+needs no vocabulary: terms are hashed straight to one of n_features columns,
+so any process can vectorize a document on its own and memory stays fixed
+however large the corpus grows. IDF statistics are just a document count and
+a per-column document frequency array. partial_fit() adds documents to them
+and merge() adds another vectorizer's, so workers can fit disjoint shards and
+the parent combines the results.
+
+IDF uses the same smoothed formula as TfidfVectorizer, ln((1 + n) / (1 + df)) + 1,
+columns no fitted document contains get zero weight (as terms outside a
+fitted vocabulary are ignored), and rows are L2-normalized, so scores match
+the vocabulary engine except where two terms hash to the same column.
+
+Select it with ResumeJobScorer(engine='hashing'), or for both apps at once
+by setting RESUME_SCORER_ENGINE=hashing.
+"""
+import numpy as np
+
+# 2^18 columns: about 2 MB of document frequencies, with few collisions for resume vocabularies
+DEFAULT_N_FEATURES = 2 ** 18
+
+# The dense document frequency array is only allocated once statistics are
+# accumulated (partial_fit, fit, merge or a transform after fit_transform);
+# a throwaway fit_transform, as for an unfitted per-pair analyze_match, keeps
+# frequencies for just the columns its documents use.
+
+
+class HashingTfidfVectorizer:
+    """TF-IDF over hashed features with incrementally accumulated IDF statistics"""
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, stop_words='english'):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.n_features = n_features
+        # Vocabulary-size cap, for code written against TfidfVectorizer; columns never exceed it
+        self.max_features = n_features
+        self.hasher = HashingVectorizer(n_features=n_features, stop_words=stop_words,
+                                        alternate_sign=False, norm=None)
+        self.document_count = 0
+        self._document_frequency = None
+        # (columns, frequencies) left by fit_transform until the dense array is needed
+        self._sparse_frequency = None
+        self._idf = None
+
+    def __getstate__(self):
+        # The IDF array is derived from the statistics; rebuild it after unpickling
+        state = dict(self.__dict__)
+        state['_idf'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Vectorizers pickled before the array became lazy stored it under its public name
+        if 'document_frequency' in state:
+            state['_document_frequency'] = state.pop('document_frequency')
+        state.setdefault('_sparse_frequency', None)
+        self.__dict__.update(state)
+
+    @property
+    def document_frequency(self):
+        """Per-column document counts, as a dense n_features int64 array"""
+        if self._document_frequency is None:
+            document_frequency = np.zeros(self.n_features, dtype=np.int64)
+            if self._sparse_frequency is not None:
+                columns, frequencies = self._sparse_frequency
+                document_frequency[columns] = frequencies
+                self._sparse_frequency = None
+            self._document_frequency = document_frequency
+        return self._document_frequency
+
+    def counts(self, documents):
+        """Raw term counts of documents as a CSR matrix over the hashed columns"""
+        return self.hasher.transform(documents)
+
+    def build_analyzer(self):
+        """Callable returning a document's hashed column ids, one per term occurrence
+
+        Counting its output gives the same per-column counts as counts().
+        """
+        def analyze(document):
+            row = self.counts([document])
+            return [column for column, count in zip(row.indices.tolist(), row.data.tolist())
+                    for _ in range(int(count))]
+        return analyze
+
+    def _add_counts(self, counts):
+        self.document_count += counts.shape[0]
+        document_frequency = self.document_frequency
+        document_frequency += np.bincount(counts.indices, minlength=self.n_features)
+        self._idf = None
+
+    def reset(self):
+        self.document_count = 0
+        self._document_frequency = None
+        self._sparse_frequency = None
+        self._idf = None
+
+    def partial_fit(self, documents):
+        """Add documents to the IDF statistics"""
+        self._add_counts(self.counts(documents))
+        return self
+
+    def fit(self, documents):
+        """Replace the IDF statistics with those of documents"""
+        self.reset()
+        return self.partial_fit(documents)
+
+    def merge(self, other):
+        """Add another vectorizer's IDF statistics to this one's"""
+        if other.n_features != self.n_features:
+            raise ValueError(f"Cannot merge {other.n_features}-feature statistics "
+                             f"into {self.n_features}-feature statistics")
+        self.document_count += other.document_count
+        document_frequency = self.document_frequency
+        document_frequency += other.document_frequency
+        self._idf = None
+        return self
+
+    @property
+    def idf_(self):
+        idf = self._idf
+        if idf is None:
+            idf = np.log((1 + self.document_count) / (1 + self.document_frequency)) + 1
+            idf[self.document_frequency == 0] = 0.0
+            self._idf = idf
+        return idf
+
+    def _weight(self, counts, idf):
+        """L2-normalized rows of counts weighted by idf, given per stored entry"""
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+        tfidf = sparse.csr_matrix((counts.data * idf, counts.indices, counts.indptr), shape=counts.shape)
+        return normalize(tfidf, norm='l2', copy=False)
+
+    def transform(self, documents):
+        """L2-normalized TF-IDF rows using the accumulated statistics"""
+        if not self.document_count:
+            raise ValueError("HashingTfidfVectorizer has no IDF statistics; call fit or partial_fit first")
+        counts = self.counts(documents)
+        return self._weight(counts, self.idf_[counts.indices])
+
+    def fit_transform(self, documents):
+        """fit() then transform(), hashing documents once"""
+        counts = self.counts(documents)
+        self.reset()
+        # A row lists each column once, so counting columns over all rows gives
+        # document frequencies; only the columns these documents use are kept
+        columns, positions = np.unique(counts.indices, return_inverse=True)
+        frequencies = np.bincount(positions, minlength=len(columns))
+        self.document_count = counts.shape[0]
+        self._sparse_frequency = (columns, frequencies)
+        return self._weight(counts, np.log((1 + self.document_count) / (1 + frequencies[positions])) + 1)
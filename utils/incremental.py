@@ -0,0 +1,172 @@
+"""Incremental re-analysis of a resume while it is being edited
+
+The resume is split into paragraphs at blank lines. Each paragraph's
+preprocessed text and TF-IDF term counts are kept between calls, so an edit
+only reprocesses the paragraphs that changed; the job description's side
+(preprocessed text, term counts, skills, fitted vector) is reused for as long
+as the job text stays the same. Paragraph boundaries are whitespace, so the
+joined paragraphs preprocess to exactly the same tokens as the whole resume
+and scores equal ResumeJobScorer.analyze_match.
+
+Without a fitted vocabulary, analyze_match fits TF-IDF on just the resume and
+the job. Two-document IDF only depends on whether a term occurs in one or both
+documents, so the cosine is computed here from cached term counts instead of
+refitting a vectorizer on every keystroke.
+
+After each call, `changes` lists the paragraphs that were added, removed or
+edited since the previous call, each with the score change that edit alone
+would have caused.
+"""
+import difflib
+import math
+import re
+from collections import Counter, namedtuple
+
+from utils.cache import content_hash
+
+# Blank lines (possibly containing spaces) separate paragraphs
+PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')
+
+# Edits attributed individually per call; beyond this they are summarized
+MAX_ATTRIBUTED_CHANGES = 20
+
+# Characters of a paragraph shown when describing a change
+PREVIEW_CHARS = 60
+
+Paragraph = namedtuple('Paragraph', ['key', 'text', 'processed', 'counts'])
+JobState = namedtuple('JobState', ['key', 'text', 'processed', 'counts', 'skills', 'vector'])
+
+
+def split_paragraphs(text):
+    """Non-blank paragraphs of text, split at blank lines"""
+    return [paragraph for paragraph in PARAGRAPH_BREAK.split(text or '') if paragraph.strip()]
+
+
+def _preview(text):
+    text = ' '.join(text.split())
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS - 1] + '…'
+
+
+class IncrementalAnalyzer:
+    """Per-user editing state on top of a (possibly shared) ResumeJobScorer"""
+
+    def __init__(self, scorer):
+        self.scorer = scorer
+        vectorizer = scorer._make_vectorizer()
+        self._analyzer = vectorizer.build_analyzer()
+        self._max_features = vectorizer.max_features
+        # Paragraphs of the last analyzed resume, by content hash
+        self.paragraphs = {}
+        self.job = None
+        self.previous = None
+        self.changes = []
+        self.reprocessed = 0
+        self.reused = 0
+
+    def _paragraph(self, text):
+        key = content_hash(text)
+        paragraph = self.paragraphs.get(key)
+        if paragraph is not None:
+            self.reused += 1
+            return paragraph
+        self.reprocessed += 1
+        processed = self.scorer.preprocess_text(text)
+        return Paragraph(key, text, processed, Counter(self._analyzer(processed)))
+
+    def _job_state(self, job_description):
+        key = content_hash(job_description)
+        if self.job is not None and self.job.key == key:
+            return self.job
+        processed = self.scorer.preprocess_text(job_description)
+        vector = None
+        if self.scorer.fitted and processed:
+            vector = self.scorer.vectorizer.transform([processed])
+        self.job = JobState(key, job_description, processed, Counter(self._analyzer(processed)),
+                            self.scorer.extract_skills(job_description), vector)
+        return self.job
+
+    def _similarity(self, paragraphs, job):
+        """Same value as scorer.calculate_similarity for the joined paragraphs"""
+        processed = ' '.join(paragraph.processed for paragraph in paragraphs if paragraph.processed)
+        if not processed or not job.processed:
+            return 0.0
+
+        if self.scorer.fitted:
+            resume_vector = self.scorer.vectorizer.transform([processed])
+            return min(float((resume_vector @ job.vector.T).toarray()[0, 0]) * 100, 100)
+
+        counts = Counter()
+        for paragraph in paragraphs:
+            counts.update(paragraph.counts)
+        terms = counts.keys() | job.counts.keys()
+        if not counts or not job.counts:
+            return 0.0
+        if len(terms) > self._max_features:
+            # Vocabulary truncation is left to sklearn
+            return self.scorer.calculate_similarity(processed, job.text)
+
+        # Smooth IDF over two documents: ln(3 / (1 + df)) + 1
+        shared_idf = math.log(3 / 3) + 1
+        single_idf = math.log(3 / 2) + 1
+        dot = resume_norm = job_norm = 0.0
+        for term in terms:
+            resume_count = counts.get(term, 0)
+            job_count = job.counts.get(term, 0)
+            idf = shared_idf if resume_count and job_count else single_idf
+            resume_norm += (resume_count * idf) ** 2
+            job_norm += (job_count * idf) ** 2
+            dot += resume_count * job_count * idf * idf
+        return min(dot / math.sqrt(resume_norm * job_norm) * 100, 100)
+
+    def _analysis(self, paragraphs, job):
+        text = '\n\n'.join(paragraph.text for paragraph in paragraphs)
+        semantic = None
+        if self.scorer.semantic is not None:
+            processed = ' '.join(paragraph.processed for paragraph in paragraphs if paragraph.processed)
+            semantic = self.scorer.semantic_similarity(processed, job.processed)
+        return self.scorer._build_match(self._similarity(paragraphs, job),
+                                        self.scorer.extract_skills(text), job.skills, semantic)
+
+    def analyze(self, resume_text, job_description):
+        """Analyze like analyze_match, reusing unchanged paragraphs and job state"""
+        self.reprocessed = self.reused = 0
+        job = self._job_state(job_description)
+        paragraphs = [self._paragraph(text) for text in split_paragraphs(resume_text)]
+        analysis = self._analysis(paragraphs, job)
+
+        previous = self.previous
+        if previous is not None and previous[1] is job:
+            self.changes = self._attribute(previous[0], paragraphs, previous[2], analysis, job)
+        else:
+            self.changes = []
+
+        # Only the current version's paragraphs are kept, so memory stays bounded
+        self.paragraphs = {paragraph.key: paragraph for paragraph in paragraphs}
+        self.previous = (paragraphs, job, analysis)
+        return analysis
+
+    def _attribute(self, old, new, old_analysis, new_analysis, job):
+        """Score change caused by each edit applied on its own to the previous version"""
+        matcher = difflib.SequenceMatcher(None, [p.key for p in old], [p.key for p in new], autojunk=False)
+        edits = [opcode for opcode in matcher.get_opcodes() if opcode[0] != 'equal']
+
+        changes = []
+        for tag, i1, i2, j1, j2 in edits[:MAX_ATTRIBUTED_CHANGES]:
+            version = old[:i1] + new[j1:j2] + old[i2:]
+            # With a single edit the version is the new resume, already analyzed
+            analysis = new_analysis if len(edits) == 1 else self._analysis(version, job)
+            kind = {'insert': 'added', 'delete': 'removed', 'replace': 'edited'}[tag]
+            changed = new[j1:j2] or old[i1:i2]
+            changes.append({
+                'change': kind,
+                'paragraph': _preview(' '.join(p.text for p in changed)),
+                'score_delta': round(analysis['overall_score'] - old_analysis['overall_score'], 2),
+                'skills_gained': sorted(set(analysis['matched_skills']) - set(old_analysis['matched_skills'])),
+                'skills_lost': sorted(set(old_analysis['matched_skills']) - set(analysis['matched_skills'])),
+            })
+        if len(edits) > MAX_ATTRIBUTED_CHANGES:
+            changes.append({
+                'change': f'{len(edits) - MAX_ATTRIBUTED_CHANGES} more edits',
+                'paragraph': '', 'score_delta': None, 'skills_gained': [], 'skills_lost': [],
+            })
+        return changes
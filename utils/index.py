@@ -0,0 +1,250 @@
+"""Inverted index over a resume pool for fast top-K retrieval per job
+
+The index stores each resume's TF-IDF vector (from a scorer with a frozen
+vocabulary) and extracted skills, with posting lists per vocabulary term and
+per skill. A job's overall score decomposes into a sum of per-term
+contributions:
+
+    overall = a * 100 * sum_t(q_t * d_t) + b * 100 / |J| * |R & J|
+
+(a, b being the scorer's similarity and skill blend weights)
+
+so top-K queries run MaxScore over the posting lists: terms whose summed
+upper bounds cannot lift a document into the current top K are never
+iterated, only probed for documents that are already competitive. Scores
+equal ResumeJobScorer.analyze_match with the same fitted scorer.
+"""
+import heapq
+import pickle
+
+from utils.scoring import ResumeJobScorer
+
+# Bump when the saved index layout changes
+INDEX_VERSION = 1
+
+
+class CandidateIndex:
+    """Incrementally updatable index of resumes for top-K job matching"""
+
+    def __init__(self, scorer):
+        if not scorer.fitted:
+            raise ValueError("CandidateIndex needs a scorer fitted on a reference corpus "
+                             "(ResumeJobScorer(corpus=...) or CandidateIndex.build)")
+        if scorer.semantic is not None:
+            raise ValueError("CandidateIndex scores the TF-IDF and skill components only; "
+                             "use a scorer without a semantic model")
+        self.scorer = scorer
+        self.next_id = 0
+        # key -> doc id, and doc id -> (key, term ids, term weights, skills)
+        self.ids = {}
+        self.docs = {}
+        # Posting lists: {doc id: weight} in ascending doc id order (ids only
+        # grow and dicts keep insertion order), plus each list's max weight
+        self.term_postings = {}
+        self.term_max = {}
+        self.skill_postings = {}
+
+    @classmethod
+    def build(cls, resumes, scorer=None):
+        """Fit a scorer on a {key: resume text} pool and index every resume"""
+        scorer = scorer if scorer is not None else ResumeJobScorer()
+        scorer.fit(resumes.values())
+        index = cls(scorer)
+        index.add_many(resumes.items())
+        return index
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, key):
+        return key in self.ids
+
+    def add(self, key, resume_text):
+        """Add or replace one resume"""
+        self.add_many([(key, resume_text)])
+
+    def add_many(self, items):
+        """Add or replace (key, resume text) pairs, vectorizing them in one batch"""
+        items = list(items)
+        if not items:
+            return
+
+        processed = [self.scorer.preprocess_text(text) for _, text in items]
+        matrix = self.scorer.vectorizer.transform(processed).tocsr()
+
+        for row, (key, text) in enumerate(items):
+            if key in self.ids:
+                self.remove(key)
+
+            doc_id = self.next_id
+            self.next_id += 1
+            self.ids[key] = doc_id
+
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            terms = matrix.indices[start:end].tolist()
+            weights = matrix.data[start:end].tolist()
+            for term, weight in zip(terms, weights):
+                self.term_postings.setdefault(term, {})[doc_id] = weight
+                if weight > self.term_max.get(term, 0.0):
+                    self.term_max[term] = weight
+
+            skills = self.scorer.extract_skills(text)
+            for skill in skills:
+                self.skill_postings.setdefault(skill, {})[doc_id] = 1.0
+
+            self.docs[doc_id] = (key, terms, weights, skills)
+
+    def remove(self, key):
+        """Remove a resume; unknown keys are ignored"""
+        doc_id = self.ids.pop(key, None)
+        if doc_id is None:
+            return
+
+        _, terms, _, skills = self.docs.pop(doc_id)
+        # Stale term maxima stay valid (if loose) upper bounds
+        for term in terms:
+            postings = self.term_postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.term_postings[term]
+                del self.term_max[term]
+        for skill in skills:
+            postings = self.skill_postings[skill]
+            del postings[doc_id]
+            if not postings:
+                del self.skill_postings[skill]
+
+    def _job_vector(self, job_description):
+        """{term id: TF-IDF weight} for a job description"""
+        processed_job = self.scorer.preprocess_text(job_description)
+        if not processed_job:
+            return {}
+        job_vector = self.scorer.vectorizer.transform([processed_job])
+        return dict(zip(job_vector.indices.tolist(), job_vector.data.tolist()))
+
+    def _query_terms(self, job_vector, job_skills):
+        """(upper bound, factor, postings) for every list contributing to the overall score"""
+        terms = []
+
+        scale = self.scorer.blend['similarity'] * 100
+        for term, weight in job_vector.items():
+            postings = self.term_postings.get(term)
+            if postings:
+                factor = scale * weight
+                terms.append((factor * self.term_max[term], factor, postings))
+
+        if job_skills:
+            factor = self.scorer.blend['skills'] * 100 / len(job_skills)
+            for skill in job_skills:
+                postings = self.skill_postings.get(skill)
+                if postings:
+                    terms.append((factor, factor, postings))
+
+        return terms
+
+    def top_k_scores(self, job_description, k=10):
+        """Return [(overall score, doc id)] for the k best resumes, best first"""
+        return self._top_k(self._job_vector(job_description),
+                           self.scorer.extract_skills(job_description), k)
+
+    def _top_k(self, job_vector, job_skills, k):
+        if k <= 0:
+            return []
+        terms = self._query_terms(job_vector, job_skills)
+
+        # Ascending upper bounds; bounds[i] = sum of the first i+1 upper bounds
+        terms.sort(key=lambda term: term[0])
+        bounds = []
+        total = 0.0
+        for upper, _, _ in terms:
+            total += upper
+            bounds.append(total)
+
+        # Terms before `first_essential` are non-essential: a document found
+        # only in them cannot beat the current k-th best score
+        first_essential = 0
+        top = []
+        threshold = -1.0
+
+        cursors = [iter(postings.items()) for _, _, postings in terms]
+        frontier = []
+        for i, cursor in enumerate(cursors):
+            entry = next(cursor, None)
+            if entry is not None:
+                frontier.append((entry[0], i, entry[1]))
+        heapq.heapify(frontier)
+
+        while frontier:
+            doc_id = frontier[0][0]
+            score = 0.0
+            # Consume every essential cursor positioned on doc_id
+            while frontier and frontier[0][0] == doc_id:
+                _, i, weight = heapq.heappop(frontier)
+                if i < first_essential:
+                    continue  # Became non-essential; dropped from the merge
+                score += terms[i][1] * weight
+                entry = next(cursors[i], None)
+                if entry is not None:
+                    heapq.heappush(frontier, (entry[0], i, entry[1]))
+
+            # Probe non-essential lists, most promising first, while the doc can still qualify
+            for i in range(first_essential - 1, -1, -1):
+                if score + bounds[i] <= threshold:
+                    break
+                weight = terms[i][2].get(doc_id)
+                if weight is not None:
+                    score += terms[i][1] * weight
+
+            if len(top) < k:
+                heapq.heappush(top, (score, -doc_id))
+            elif score > threshold:
+                heapq.heapreplace(top, (score, -doc_id))
+            else:
+                continue
+
+            if len(top) == k:
+                threshold = top[0][0]
+                while first_essential < len(terms) and bounds[first_essential] <= threshold:
+                    first_essential += 1
+
+        ranked = [(score, -neg_id) for score, neg_id in sorted(top, reverse=True)]
+
+        # Resumes sharing nothing with the job score zero; pad with them in index order
+        if len(ranked) < k:
+            seen = {doc_id for _, doc_id in ranked}
+            for doc_id in self.docs:
+                if len(ranked) == k:
+                    break
+                if doc_id not in seen:
+                    ranked.append((0.0, doc_id))
+        return ranked
+
+    def top_k(self, job_description, k=10):
+        """Return [(key, analysis)] for the k best resumes, best first
+
+        Each analysis has the same fields and values as analyze_match.
+        """
+        job_vector = self._job_vector(job_description)
+        job_skills = self.scorer.extract_skills(job_description)
+
+        results = []
+        for _, doc_id in self._top_k(job_vector, job_skills, k):
+            key, terms, weights, skills = self.docs[doc_id]
+            cosine = sum(weight * job_vector.get(term, 0.0) for term, weight in zip(terms, weights))
+            similarity = min(cosine * 100, 100)
+            results.append((key, self.scorer._build_match(similarity, skills, job_skills)))
+        return results
+
+    def save(self, path):
+        """Write the index, including its fitted scorer, to a file"""
+        with open(path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'index': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written with save()"""
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported candidate index version in {path}")
+        return data['index']
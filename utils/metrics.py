@@ -0,0 +1,249 @@
+"""Opt-in metrics for the scoring pipeline
+
+A Metrics registry records per-stage timings (as histograms), document
+sizes, cache hits and misses and error counts. Attach one to a scorer with
+ResumeJobScorer(metrics=Metrics()) and pass it to extract_text(metrics=...);
+without one, instrumented code paths cost a single attribute check.
+
+Worker processes record into a registry of their own, created empty when
+the worker starts (a forked worker would otherwise inherit the parent's
+contents), and send drain() snapshots back to be merge()d, so batch runs
+report totals across every process. Listeners get each observation made in their
+own process as it happens;
+to_prometheus() renders everything in the Prometheus text exposition format.
+"""
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds, in seconds, of the stage timing histogram buckets
+TIMING_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Returned by stage() when no registry is attached; reusable and free to enter
+NO_METRICS = nullcontext()
+
+
+def stage(metrics, name, **labels):
+    """Time a block under metrics, or do nothing when metrics is None"""
+    return NO_METRICS if metrics is None else metrics.time(name, **labels)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Metrics:
+    """Thread-safe registry of stage timings, document sizes and counters"""
+
+    def __init__(self):
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # (stage, labels) -> [count, total seconds, max seconds, bucket counts]
+        self.timings = {}
+        # (kind, labels) -> [count, total, max]
+        self.sizes = {}
+        # (name, labels) -> value
+        self.counters = {}
+
+    def __getstate__(self):
+        # Pickled copies (spawned workers) start empty; listeners stay behind
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def add_listener(self, callback):
+        """Call callback(kind, name, labels, value) for every observation"""
+        self.listeners.append(callback)
+
+    def _notify(self, kind, name, labels, value):
+        for callback in self.listeners:
+            callback(kind, name, dict(labels), value)
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Record the duration of a block; exceptions also count as errors"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count('errors', stage=name, **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def observe(self, name, seconds, **labels):
+        """Record one stage duration in seconds"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            entry = self.timings.get(key)
+            if entry is None:
+                entry = self.timings[key] = [0, 0.0, 0.0, [0] * len(TIMING_BUCKETS)]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            for i, bound in enumerate(TIMING_BUCKETS):
+                if seconds <= bound:
+                    entry[3][i] += 1
+                    break
+        if self.listeners:
+            self._notify('timing', name, key[1], seconds)
+
+    def observe_size(self, kind, size, **labels):
+        """Record the size of one document (characters or bytes, per kind)"""
+        key = (kind, _label_key(labels))
+        with self._lock:
+            entry = self.sizes.get(key)
+            if entry is None:
+                entry = self.sizes[key] = [0, 0, 0]
+            entry[0] += 1
+            entry[1] += size
+            entry[2] = max(entry[2], size)
+        if self.listeners:
+            self._notify('size', kind, key[1], size)
+
+    def count(self, name, value=1, **labels):
+        """Increment a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        if self.listeners:
+            self._notify('counter', name, key[1], value)
+
+    def snapshot(self):
+        """Plain-data copy of everything recorded so far"""
+        with self._lock:
+            return {
+                'timings': {key: [c, t, m, list(b)] for key, (c, t, m, b) in self.timings.items()},
+                'sizes': {key: list(entry) for key, entry in self.sizes.items()},
+                'counters': dict(self.counters),
+            }
+
+    def drain(self):
+        """Return a snapshot and reset, for shipping worker metrics to the parent"""
+        with self._lock:
+            data = {'timings': self.timings, 'sizes': self.sizes, 'counters': self.counters}
+            self._reset()
+            return data
+
+    def merge(self, data):
+        """Add a snapshot from another registry into this one"""
+        with self._lock:
+            for key, (count, total, peak, buckets) in data['timings'].items():
+                entry = self.timings.get(key)
+                if entry is None:
+                    self.timings[key] = [count, total, peak, list(buckets)]
+                else:
+                    entry[0] += count
+                    entry[1] += total
+                    entry[2] = max(entry[2], peak)
+                    entry[3] = [a + b for a, b in zip(entry[3], buckets)]
+            for key, (count, total, peak) in data['sizes'].items():
+                entry = self.sizes.get(key)
+                if entry is None:
+                    self.sizes[key] = [count, total, peak]
+                else:
+                    entry[0] += count
+                    entry[1] += total
+                    entry[2] = max(entry[2], peak)
+            for key, value in data['counters'].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def stage_rows(self):
+        """One dict per timed stage: calls, total and mean seconds, max, errors"""
+        data = self.snapshot()
+        rows = []
+        for (name, labels), (count, total, peak, _) in sorted(data['timings'].items()):
+            errors = data['counters'].get(('errors', _label_key({'stage': name, **dict(labels)})), 0)
+            rows.append({
+                'stage': name + ''.join(f' [{value}]' for _, value in labels),
+                'calls': count,
+                'total_s': round(total, 4),
+                'mean_ms': round(total / count * 1000, 3) if count else 0.0,
+                'max_ms': round(peak * 1000, 3),
+                'errors': errors,
+            })
+        return rows
+
+    def size_rows(self):
+        """One dict per document kind: count, mean and max size"""
+        rows = []
+        for (kind, labels), (count, total, peak) in sorted(self.snapshot()['sizes'].items()):
+            rows.append({
+                'kind': kind + ''.join(f' [{value}]' for _, value in labels),
+                'documents': count,
+                'mean': round(total / count, 1) if count else 0.0,
+                'max': peak,
+            })
+        return rows
+
+    def counter(self, name, **labels):
+        """Current value of one counter"""
+        with self._lock:
+            return self.counters.get((name, _label_key(labels)), 0)
+
+    def cache_hit_rates(self):
+        """{cache kind: hit rate} from the cache_hits / cache_misses counters"""
+        data = self.snapshot()
+        kinds = {dict(labels).get('kind') for name, labels in data['counters']
+                 if name in ('cache_hits', 'cache_misses')}
+        rates = {}
+        for kind in sorted(kinds, key=str):
+            hits = data['counters'].get(('cache_hits', _label_key({'kind': kind})), 0)
+            misses = data['counters'].get(('cache_misses', _label_key({'kind': kind})), 0)
+            rates[kind] = hits / (hits + misses) if hits + misses else 0.0
+        return rates
+
+    def to_prometheus(self, prefix='resume_scorer'):
+        """Render every metric in the Prometheus text exposition format"""
+        data = self.snapshot()
+        lines = []
+
+        if data['timings']:
+            name = f'{prefix}_stage_seconds'
+            lines += [f'# HELP {name} Time spent in each pipeline stage.', f'# TYPE {name} histogram']
+            for (stage_name, labels), (count, total, _, buckets) in sorted(data['timings'].items()):
+                labels = (('stage', stage_name),) + labels
+                cumulative = 0
+                for bound, bucket in zip(TIMING_BUCKETS, buckets):
+                    cumulative += bucket
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", repr(bound))])} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total!r}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        if data['sizes']:
+            name = f'{prefix}_document_size'
+            lines += [f'# HELP {name} Size of documents seen by each stage.', f'# TYPE {name} summary']
+            for (kind, labels), (count, total, _) in sorted(data['sizes'].items()):
+                labels = (('kind', kind),) + labels
+                lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        counter_names = sorted({name for name, _ in data['counters']})
+        for counter in counter_names:
+            name = f'{prefix}_{counter}_total'
+            lines += [f'# HELP {name} Count of {counter.replace("_", " ")}.', f'# TYPE {name} counter']
+            for (key_name, labels), value in sorted(data['counters'].items(), key=str):
+                if key_name == counter:
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,91 @@
+"""Lazily loaded NLTK resources shared by every scorer in the process
+
+Nothing here imports NLTK until a resource is first needed. Data is looked up
+in $RESUME_SCORER_NLTK_DATA, then the bundled data/nltk_data directory, then
+NLTK's usual locations. Missing resources are downloaded unless
+$RESUME_SCORER_OFFLINE is set, in which case a LookupError explains what to
+install.
+"""
+import functools
+import os
+import threading
+
+# Bundled NLTK data directory (populated by install_deps.py)
+BUNDLED_NLTK_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'data', 'nltk_data')
+
+# Package name -> resource path checked with nltk.data.find
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'punkt_tab': 'tokenizers/punkt_tab',
+}
+
+_lock = threading.Lock()
+_ready = set()
+
+# Serializes corpus loading; separate from _lock, which require() takes
+_load_lock = threading.Lock()
+
+
+def nltk_data_dirs():
+    """Local directories searched for NLTK data before NLTK's defaults"""
+    dirs = [path for path in os.environ.get('RESUME_SCORER_NLTK_DATA', '').split(os.pathsep) if path]
+    dirs.append(BUNDLED_NLTK_DATA)
+    return dirs
+
+
+def offline():
+    return bool(os.environ.get('RESUME_SCORER_OFFLINE'))
+
+
+def require(name):
+    """Make an NLTK resource available, downloading it only when allowed"""
+    if name in _ready:
+        return
+
+    with _lock:
+        if name in _ready:
+            return
+
+        import nltk
+        for path in reversed(nltk_data_dirs()):
+            if path not in nltk.data.path:
+                nltk.data.path.insert(0, path)
+
+        try:
+            nltk.data.find(NLTK_RESOURCES[name])
+        except LookupError:
+            if offline():
+                raise LookupError(f"NLTK resource '{name}' not found in {nltk_data_dirs()} or "
+                                  f"NLTK's default paths; run install_deps.py to bundle it")
+            nltk.download(name, quiet=True)
+            nltk.data.find(NLTK_RESOURCES[name])
+
+        _ready.add(name)
+
+
+@functools.lru_cache(maxsize=None)
+def stop_words():
+    """English stopword set"""
+    require('stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+@functools.lru_cache(maxsize=None)
+def lemmatizer():
+    """WordNet lemmatizer, with WordNet loaded up front so threads never race its lazy load"""
+    require('wordnet')
+    with _load_lock:
+        from nltk.corpus import wordnet
+        from nltk.stem import WordNetLemmatizer
+        wordnet.ensure_loaded()
+        return WordNetLemmatizer()
+
+
+def word_tokenize(text):
+    """NLTK word tokenizer (Punkt + Treebank)"""
+    require('punkt_tab')
+    from nltk.tokenize import word_tokenize
+    return word_tokenize(text)
@@ -1,104 +1,419 @@
+import copy
+import logging
+import os
 import re
-import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
-import string
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+from utils import resources
+from utils.cache import content_hash
+from utils.metrics import stage
+from utils.taxonomy import resolve_skill_matcher
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+logger = logging.getLogger(__name__)
+
+# Characters dropped before tokenizing
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+# Whole words that word_tokenize splits even in letters-only text; the fast
+# tokenizer mirrors it so both paths produce identical tokens
+TREEBANK_SPLITS = {
+    'cannot': ['can', 'not'],
+    'gimme': ['gim', 'me'],
+    'gonna': ['gon', 'na'],
+    'gotta': ['got', 'ta'],
+    'lemme': ['lem', 'me'],
+    'wanna': ['wan', 'na'],
+}
+
+# Maximum number of memoized lemmas before the table is reset
+LEMMA_MEMO_SIZE = 100000
+
+# Default weights of the similarity and skill components in overall_score
+DEFAULT_BLEND = {'similarity': 0.6, 'skills': 0.4}
+
+# Default weights when a semantic model adds a third component
+DEFAULT_SEMANTIC_BLEND = {'similarity': 0.4, 'semantic': 0.2, 'skills': 0.4}
+
+# Vectorizer engines: fitted-vocabulary TF-IDF, or feature hashing (utils.hashing)
+ENGINES = ('tfidf', 'hashing')
+
+# Environment variable choosing the engine when none is passed
+ENGINE_ENV = 'RESUME_SCORER_ENGINE'
+
+# token -> lemma ('' for dropped tokens); lemmas depend only on the shared
+# stopwords and WordNet, so one table serves every scorer in the process
+LEMMA_MEMO = {}
+
+def resolve_engine(engine=None):
+    """engine, else $RESUME_SCORER_ENGINE, else 'tfidf'; raises on unknown names"""
+    engine = engine or os.environ.get(ENGINE_ENV) or 'tfidf'
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scoring engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    return engine
+
+def fast_tokenize(text):
+    """Tokenize letters-only text exactly like word_tokenize, without Punkt/Treebank"""
+    tokens = text.split()
+    if TREEBANK_SPLITS.keys().isdisjoint(tokens):
+        return tokens
+    return [part for token in tokens for part in TREEBANK_SPLITS.get(token, (token,))]
 
 class ResumeJobScorer:
-    def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
-        self.vectorizer = TfidfVectorizer(max_features=5000, stop_words='english')
+    """Scores resumes against job descriptions
+
+    Expensive resources (stopwords, WordNet, the skill matcher, the lemma memo)
+    are shared process-wide, and every call keeps its intermediate state local,
+    so one scorer can serve many threads. Only fit(), partial_fit() and
+    merge_idf() mutate the scorer; call them before sharing.
+    """
+    
+    # Class-level defaults so scorers pickled before these were configurable still load
+    blend = DEFAULT_BLEND
+    engine = 'tfidf'
+    semantic = None
+    
+    def __init__(self, corpus=None, taxonomy=None, cache=None, fast=True, metrics=None, blend=None,
+                 engine=None, semantic=None):
+        # Fast mode: whitespace tokenizer plus memoized lemmas (same tokens as the NLTK path)
+        self.fast = fast
+        
+        # 'tfidf' (fitted vocabulary) or 'hashing' (feature hashing, mergeable IDF);
+        # defaults to RESUME_SCORER_ENGINE
+        self.engine = resolve_engine(engine)
+        self._lemma_memo = LEMMA_MEMO
+        
+        # Set by fit(); sklearn is only imported once a vectorizer is needed
+        self.vectorizer = None
+        self.fitted = False
+        
+        # Skill vocabulary: built-in list, or a taxonomy file/object with aliases
+        self.skill_matcher = resolve_skill_matcher(taxonomy)
+        
+        # Optional PreprocessCache: known documents skip the NLP pipeline
+        self.cache = cache
+        
+        # Optional Metrics registry: per-stage timings, sizes, cache and error counts
+        self.metrics = metrics
+        
+        # Optional SemanticModel (or the path of a saved one) adding an LSA similarity component
+        if isinstance(semantic, str):
+            from utils.semantic import load_model
+            semantic = load_model(semantic)
+        if semantic is not None:
+            self.semantic = semantic
+            self.blend = DEFAULT_SEMANTIC_BLEND
+        
+        # {'similarity': w, 'skills': w[, 'semantic': w]}: how overall_score blends the components
+        if blend is not None:
+            self.blend = dict(blend)
+        
+        # Fit once on a reference corpus so later scores share one vocabulary/IDF
+        if corpus is not None:
+            self.fit(corpus)
+    
+    @property
+    def lemmatizer(self):
+        # Loaded on first use and shared by every scorer in the process
+        return resources.lemmatizer()
+    
+    @property
+    def stop_words(self):
+        return resources.stop_words()
+    
+    def with_metrics(self, metrics):
+        """Shallow copy that shares every resource but records into its own metrics"""
+        scorer = copy.copy(self)
+        scorer.metrics = metrics
+        return scorer
+    
+    def _make_vectorizer(self):
+        """Create an unfitted TF-IDF vectorizer"""
+        if self.engine == 'hashing':
+            from utils.hashing import HashingTfidfVectorizer
+            return HashingTfidfVectorizer()
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        return TfidfVectorizer(max_features=5000, stop_words='english')
+    
+    def fit(self, documents):
+        """Fit the vectorizer once on a reference corpus and freeze it"""
+        return self.fit_processed(self.preprocess_text(doc) for doc in documents)
+    
+    def fit_processed(self, processed_documents):
+        """fit() on documents that already went through preprocess_text"""
+        processed = [doc for doc in processed_documents if doc]
+        if not processed:
+            raise ValueError("Cannot fit vectorizer on an empty corpus")
+        
+        self.vectorizer = self._make_vectorizer()
+        with stage(self.metrics, 'fit'):
+            self.vectorizer.fit(processed)
+        self.fitted = True
+        return self
+    
+    def partial_fit(self, documents):
+        """Add documents to the IDF statistics without refitting (hashing engine only)"""
+        if self.engine != 'hashing':
+            raise ValueError("partial_fit needs engine='hashing'; the tfidf engine can only fit()")
+        processed = [doc for doc in (self.preprocess_text(doc) for doc in documents) if doc]
+        if self.vectorizer is None:
+            self.vectorizer = self._make_vectorizer()
+        with stage(self.metrics, 'fit'):
+            self.vectorizer.partial_fit(processed)
+        self.fitted = self.vectorizer.document_count > 0
+        return self
+    
+    def merge_idf(self, other):
+        """Add the IDF statistics of another hashing-engine scorer, e.g. one fitted in a worker"""
+        if self.engine != 'hashing' or other.engine != 'hashing':
+            raise ValueError("merge_idf needs two scorers with engine='hashing'")
+        if other.vectorizer is None:
+            return self
+        if self.vectorizer is None:
+            self.vectorizer = self._make_vectorizer()
+        self.vectorizer.merge(other.vectorizer)
+        self.fitted = self.vectorizer.document_count > 0
+        return self
         
     def preprocess_text(self, text):
         """Clean and preprocess text"""
         if not text:
             return ""
         
-        # Convert to lowercase
-        text = text.lower()
+        if self.cache is None:
+            return self._preprocess_text(text)
+        
+        key = 'text:' + content_hash(text)
+        processed = self.cache.get(key)
+        if processed is None:
+            processed = self._preprocess_text(text)
+            self.cache.put(key, processed)
+            self._count_cache('cache_misses', 'text')
+        else:
+            self._count_cache('cache_hits', 'text')
+        return processed
+    
+    def _count_cache(self, name, kind):
+        if self.metrics is not None:
+            self.metrics.count(name, kind=kind)
+    
+    def _preprocess_text(self, text):
+        """Run the cleanup, tokenization and lemmatization pipeline"""
+        with stage(self.metrics, 'clean'):
+            # Convert to lowercase
+            text = text.lower()
+            
+            # Remove punctuation and numbers
+            text = NON_ALPHA_PATTERN.sub('', text)
         
-        # Remove punctuation and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        if self.fast:
+            with stage(self.metrics, 'tokenize'):
+                tokens = fast_tokenize(text)
+            with stage(self.metrics, 'lemmatize'):
+                # get() rather than `in` + [] so a concurrent reset cannot raise KeyError
+                memo = self._lemma_memo
+                lemmas = [memo.get(token) for token in tokens]
+                if None in lemmas:
+                    lemmas = [self._lemma(token) if lemma is None else lemma
+                              for token, lemma in zip(tokens, lemmas)]
+                return ' '.join(filter(None, lemmas))
         
         # Tokenize
-        tokens = word_tokenize(text)
+        with stage(self.metrics, 'tokenize'):
+            tokens = resources.word_tokenize(text)
         
         # Remove stopwords and short tokens, then lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens 
-                 if token not in self.stop_words and len(token) > 2]
+        with stage(self.metrics, 'lemmatize'):
+            tokens = [self.lemmatizer.lemmatize(token) for token in tokens 
+                     if token not in self.stop_words and len(token) > 2]
         
         return ' '.join(tokens)
     
+    def _lemma(self, token):
+        """Lemmatize one token, or return '' for stopwords and short tokens (memoized)"""
+        if token in self.stop_words or len(token) <= 2:
+            lemma = ''
+        else:
+            lemma = self.lemmatizer.lemmatize(token)
+        
+        # Vocabulary repeats heavily across resumes; reset rather than grow unbounded
+        if len(self._lemma_memo) >= LEMMA_MEMO_SIZE:
+            self._lemma_memo.clear()
+        self._lemma_memo[token] = lemma
+        return lemma
+    
     def calculate_similarity(self, resume_text, job_description):
         """Calculate cosine similarity between resume and job description"""
         # Preprocess texts
         processed_resume = self.preprocess_text(resume_text)
         processed_job = self.preprocess_text(job_description)
-        
+        return self._processed_similarity(processed_resume, processed_job)
+    
+    def _processed_similarity(self, processed_resume, processed_job):
         if not processed_resume or not processed_job:
             return 0.0
         
-        # Create TF-IDF vectors
+        # Create TF-IDF vectors (reuse the frozen vocabulary when fitted)
         try:
-            tfidf_matrix = self.vectorizer.fit_transform([processed_resume, processed_job])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
+            with stage(self.metrics, 'vectorize'):
+                if self.fitted:
+                    tfidf_matrix = self.vectorizer.transform([processed_resume, processed_job])
+                else:
+                    tfidf_matrix = self._make_vectorizer().fit_transform([processed_resume, processed_job])
+            with stage(self.metrics, 'similarity'):
+                from sklearn.metrics.pairwise import cosine_similarity
+                similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
             return min(similarity[0][0] * 100, 100)  # Cap at 100%
         except Exception as e:
-            print(f"Similarity calculation error: {e}")
+            # The stage has already counted the error in self.metrics
+            logger.warning("Similarity calculation error: %s", e)
             return 0.0
     
+    def score_many(self, resumes, job_description):
+        """Calculate cosine similarity of many resumes against one job description"""
+        processed_resumes = [self.preprocess_text(resume) for resume in resumes]
+        return self.score_processed_many(processed_resumes, self.preprocess_text(job_description))
+    
+    def score_processed_many(self, processed_resumes, processed_job):
+        """score_many for resumes and a job that already went through preprocess_text"""
+        if not processed_resumes or not processed_job:
+            return [0.0] * len(processed_resumes)
+        
+        # Without a reference corpus, fit once on the whole batch
+        if self.fitted:
+            vectorizer = self.vectorizer
+        else:
+            vectorizer = self._make_vectorizer()
+            try:
+                with stage(self.metrics, 'fit'):
+                    vectorizer.fit([doc for doc in processed_resumes if doc] + [processed_job])
+            except ValueError as e:
+                # Counted in self.metrics by the fit stage
+                logger.warning("Similarity calculation error: %s", e)
+                return [0.0] * len(processed_resumes)
+        
+        # Rows are L2-normalised, so one sparse matrix-vector product gives every cosine
+        with stage(self.metrics, 'vectorize'):
+            resume_matrix = vectorizer.transform(processed_resumes)
+            job_vector = vectorizer.transform([processed_job])
+        with stage(self.metrics, 'similarity'):
+            similarities = (resume_matrix @ job_vector.T).toarray().ravel()
+        return [min(float(s) * 100, 100) for s in similarities]
+    
     def extract_skills(self, text):
         """Extract potential skills from text"""
-        common_skills = [
-            'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'angular',
-            'node', 'express', 'django', 'flask', 'mongodb', 'mysql', 'postgresql',
-            'aws', 'azure', 'docker', 'kubernetes', 'git', 'jenkins', 'linux', 'unix',
-            'machine learning', 'data analysis', 'statistics', 'tableau', 'power bi',
-            'excel', 'word', 'powerpoint', 'project management', 'agile', 'scrum',
-            'communication', 'leadership', 'teamwork', 'problem solving', 'analytical',
-            'c++', 'c#', 'php', 'ruby', 'go', 'swift', 'kotlin', 'typescript',
-            'vue', 'angularjs', 'jquery', 'bootstrap', 'sass', 'less',
-            'rest', 'api', 'graphql', 'microservices', 'ci/cd', 'devops',
-            'tensorflow', 'pytorch', 'keras', 'pandas', 'numpy', 'scikit',
-            'big data', 'hadoop', 'spark', 'kafka', 'elasticsearch',
-            'ui/ux', 'photoshop', 'figma', 'adobe', 'illustrator'
-        ]
-        
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in common_skills:
-            if skill in text_lower:
-                found_skills.append(skill.title())
-        
-        return list(set(found_skills))  # Remove duplicates
+        if self.cache is None or not text:
+            with stage(self.metrics, 'skills'):
+                return self.skill_matcher.skills_in(text)
+        
+        key = f'skills:{self.skill_matcher.fingerprint()}:{content_hash(text)}'
+        skills = self.cache.get(key)
+        if skills is None:
+            with stage(self.metrics, 'skills'):
+                skills = self.skill_matcher.skills_in(text)
+            self.cache.put(key, skills)
+            self._count_cache('cache_misses', 'skills')
+        else:
+            self._count_cache('cache_hits', 'skills')
+        return skills
+    
+    def find_skills(self, text):
+        """Locate skills in text, with character positions for each match"""
+        return self.skill_matcher.find(text)
     
     def analyze_match(self, resume_text, job_description):
         """Comprehensive analysis of resume-job match"""
-        similarity_score = self.calculate_similarity(resume_text, job_description)
+        if self.metrics is not None:
+            self.metrics.observe_size('resume_chars', len(resume_text or ''))
+            self.metrics.observe_size('job_chars', len(job_description or ''))
+        
+        processed_resume = self.preprocess_text(resume_text)
+        processed_job = self.preprocess_text(job_description)
+        similarity_score = self._processed_similarity(processed_resume, processed_job)
         
         resume_skills = self.extract_skills(resume_text)
         job_skills = self.extract_skills(job_description)
         
-        # Calculate skill match
+        return self._build_match(similarity_score, resume_skills, job_skills,
+                                 self.semantic_similarity(processed_resume, processed_job))
+    
+    def analyze_preprocessed(self, resume_text, processed_resume, job_description):
+        """analyze_match for a resume whose preprocess_text output is already known"""
+        if self.metrics is not None:
+            self.metrics.observe_size('resume_chars', len(resume_text or ''))
+            self.metrics.observe_size('job_chars', len(job_description or ''))
+        
+        processed_job = self.preprocess_text(job_description)
+        similarity_score = self._processed_similarity(processed_resume, processed_job)
+        
+        return self._build_match(similarity_score, self.extract_skills(resume_text),
+                                 self.extract_skills(job_description),
+                                 self.semantic_similarity(processed_resume, processed_job))
+    
+    def analyze_processed_many(self, processed_resumes, resume_skills, job_description):
+        """analyze_many for resumes already preprocessed and skill-scanned, e.g. by batch workers"""
+        processed_job = self.preprocess_text(job_description)
+        similarity_scores = self.score_processed_many(processed_resumes, processed_job)
+        job_skills = self.extract_skills(job_description)
+        
+        semantic_scores = [None] * len(processed_resumes)
+        if self.semantic is not None:
+            with stage(self.metrics, 'semantic'):
+                semantic_scores = self.semantic.similarities(processed_resumes, processed_job)
+        
+        # Skill overlap for the whole batch in one bitset pass; names are decoded per report
+        overlaps = [None] * len(resume_skills)
         if job_skills:
+            from utils.bitset import skill_match_grid
+            grid = skill_match_grid(resume_skills, [job_skills])
+            overlaps = [(grid.matched_skills(i, 0), grid.missing_skills(i, 0), float(grid.percentages[i, 0]))
+                        for i in range(len(resume_skills))]
+        
+        return [self._build_match(similarity_score, skills, job_skills, semantic_score, overlap)
+                for skills, similarity_score, semantic_score, overlap
+                in zip(resume_skills, similarity_scores, semantic_scores, overlaps)]
+    
+    def analyze_many(self, resumes, job_description):
+        """Analyze many resumes against one job description in a single batch"""
+        if self.metrics is not None:
+            for resume in resumes:
+                self.metrics.observe_size('resume_chars', len(resume or ''))
+            self.metrics.observe_size('job_chars', len(job_description or ''))
+        
+        return self.analyze_processed_many([self.preprocess_text(resume) for resume in resumes],
+                                           [self.extract_skills(resume) for resume in resumes],
+                                           job_description)
+    
+    def semantic_similarity(self, processed_resume, processed_job):
+        """LSA similarity (0-100) of two preprocessed documents, or None without a semantic model"""
+        if self.semantic is None:
+            return None
+        with stage(self.metrics, 'semantic'):
+            return self.semantic.similarity(processed_resume, processed_job)
+    
+    def skill_match_grid(self, resumes, job_descriptions):
+        """Skill-match percentages and counts for every resume/job pair as a SkillMatchGrid"""
+        from utils.bitset import skill_match_grid
+        return skill_match_grid([self.extract_skills(resume) for resume in resumes],
+                                [self.extract_skills(job) for job in job_descriptions])
+    
+    def section_match(self, resume_text, job_description):
+        """Per-section similarity and skill scores as a SectionMatch, re-weightable without re-parsing"""
+        from utils.sections import section_match
+        return section_match(self, resume_text, job_description)
+    
+    def analyze_sections(self, resume_text, job_description, weights=None):
+        """analyze_match with section-weighted scores and a per-section breakdown"""
+        return self.section_match(resume_text, job_description).overall(weights, self.blend)
+    
+    def _build_match(self, similarity_score, resume_skills, job_skills, semantic_score=None, overlap=None):
+        """Combine similarity, skill overlap and (when given) semantic similarity into the match report"""
+        with stage(self.metrics, 'recommendations'):
+            return self._match_report(similarity_score, resume_skills, job_skills, semantic_score, overlap)
+    
+    def _match_report(self, similarity_score, resume_skills, job_skills, semantic_score=None, overlap=None):
+        # Calculate skill match; batches pass (matched, missing, percentage) from a SkillMatchGrid
+        if overlap is not None:
+            matched_skills, missing_skills, skill_match_percentage = overlap
+        elif job_skills:
             matched_skills = set(resume_skills) & set(job_skills)
             skill_match_percentage = (len(matched_skills) / len(job_skills)) * 100
         else:
@@ -106,23 +421,30 @@ class ResumeJobScorer:
             matched_skills = set()
         
         # Missing skills
-        missing_skills = set(job_skills) - set(resume_skills)
+        if overlap is None:
+            missing_skills = set(job_skills) - set(resume_skills)
         
         # Overall score (weighted average)
-        overall_score = (similarity_score * 0.6) + (skill_match_percentage * 0.4)
+        overall_score = (similarity_score * self.blend['similarity']) + (skill_match_percentage * self.blend['skills'])
+        if semantic_score is not None:
+            overall_score += semantic_score * self.blend.get('semantic', 0.0)
         
-        return {
+        report = {
             'overall_score': round(overall_score, 2),
             'similarity_score': round(similarity_score, 2),
             'skill_match_score': round(skill_match_percentage, 2),
             'resume_skills': resume_skills,
             'job_skills': job_skills,
-            'matched_skills': list(matched_skills),
-            'missing_skills': list(missing_skills),
-            'recommendations': self.generate_recommendations(missing_skills, overall_score)
+            'matched_skills': sorted(matched_skills),
+            'missing_skills': sorted(missing_skills),
+            'recommendations': self.generate_recommendations(sorted(missing_skills), overall_score)
         }
+        if semantic_score is not None:
+            report['semantic_score'] = round(semantic_score, 2)
+        return report
     
-    def generate_recommendations(self, missing_skills, score):
+    @staticmethod
+    def generate_recommendations(missing_skills, score):
         """Generate improvement recommendations"""
         recommendations = []
         
@@ -0,0 +1,204 @@
+"""Resume section segmentation and weighted per-section scoring
+
+segment() splits a resume into summary, experience, skills, education and
+projects sections in one pass over its lines: a line is a heading when it is
+just a known heading phrase (any case, optionally decorated with #, *, -, =
+or a trailing colon) and starts a new section. A heading followed by a
+colon and inline content ("Skills: Python, SQL") files only that line under
+its section; the lines after it stay in the current section, so "Tools:
+Docker" inside an experience entry does not end the experience section.
+Text before the first heading, such as the name and contact line, goes to
+'other'.
+
+section_match() vectorizes the job and every section in one TF-IDF pass and
+skill-scans each section once. The resulting SectionMatch holds only
+per-section numbers and skill lists, so overall() can re-weight it any
+number of times without touching the text again.
+"""
+import re
+from collections import namedtuple
+
+from utils.cache import content_hash
+from utils.scoring import DEFAULT_BLEND, ResumeJobScorer
+
+SECTION_NAMES = ['summary', 'experience', 'skills', 'education', 'projects', 'other']
+
+HEADING_ALIASES = {
+    'summary': ['summary', 'professional summary', 'career summary', 'profile', 'professional profile',
+                'objective', 'career objective', 'about', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'relevant experience',
+                   'employment', 'employment history', 'work history', 'career history'],
+    'skills': ['skills', 'technical skills', 'core skills', 'key skills', 'skills and tools',
+               'core competencies', 'competencies', 'technologies', 'tech stack', 'tools'],
+    'education': ['education', 'academic background', 'education and training', 'certifications',
+                  'certificates', 'training', 'qualifications'],
+    'projects': ['projects', 'personal projects', 'selected projects', 'side projects', 'open source'],
+}
+
+# Weight of each section in the similarity component; sections a resume lacks
+# are left out and the remaining weights renormalized. Skills count towards
+# the skill match from every section with a non-zero weight
+DEFAULT_SECTION_WEIGHTS = {
+    'summary': 0.15,
+    'experience': 0.35,
+    'skills': 0.25,
+    'education': 0.1,
+    'projects': 0.15,
+    'other': 0.1,
+}
+
+_HEADING_SECTIONS = {alias: name for name, aliases in HEADING_ALIASES.items() for alias in aliases}
+
+HEADING_PATTERN = re.compile(
+    r'^[\s#*=_\-•]*(?P<heading>' +
+    '|'.join(re.escape(alias).replace(r'\ ', r'\s+')
+             for alias in sorted(_HEADING_SECTIONS, key=len, reverse=True)) +
+    r')[\s#*=_\-]*(?::\s*(?P<rest>.*?))?\s*$',
+    re.IGNORECASE)
+
+SectionScore = namedtuple('SectionScore', ['similarity', 'skills', 'skill_match'])
+
+
+def segment(text):
+    """Split resume text into [(section name, section text)] in document order
+
+    Repeated headings for the same section are merged into one entry.
+    """
+    order = []
+    lines = {}
+    current = 'other'
+    for line in (text or '').splitlines():
+        section = current
+        match = HEADING_PATTERN.match(line) if len(line) <= 80 else None
+        if match:
+            section = _HEADING_SECTIONS[' '.join(match.group('heading').lower().split())]
+            line = match.group('rest') or ''
+            # Only a heading on a line of its own starts a section
+            if not line:
+                current = section
+        if section not in lines:
+            order.append(section)
+            lines[section] = []
+        lines[section].append(line)
+
+    sections = []
+    for name in order:
+        body = '\n'.join(lines[name]).strip()
+        if body:
+            sections.append((name, body))
+    return sections
+
+
+def cached_segment(text, cache=None):
+    """segment() with the result stored in a PreprocessCache under the text's hash"""
+    if cache is None or not text:
+        return segment(text)
+
+    key = 'sections:' + content_hash(text)
+    flat = cache.get(key)
+    if flat is None:
+        sections = segment(text)
+        cache.put(key, [part for section in sections for part in section])
+        return sections
+    return list(zip(flat[0::2], flat[1::2]))
+
+
+class SectionMatch:
+    """Per-section similarity and skill scores for one resume/job pair"""
+
+    def __init__(self, sections, job_skills, resume_skills, semantic=None):
+        # section name -> SectionScore, in document order
+        self.sections = sections
+        self.job_skills = job_skills
+        self.resume_skills = resume_skills
+        # Whole-resume semantic similarity, when the scorer has a semantic model
+        self.semantic = semantic
+
+    def _weighted(self, weights, field):
+        present = [(weights.get(name, 0.0), score) for name, score in self.sections.items()]
+        total = sum(weight for weight, _ in present)
+        if total <= 0:
+            return 0.0
+        return sum(weight * getattr(score, field) for weight, score in present) / total
+
+    def overall(self, weights=None, blend=None):
+        """Match report in analyze_match's format, plus a per-section breakdown
+
+        weights maps section names to their share of each component (default
+        DEFAULT_SECTION_WEIGHTS); blend sets the similarity and skill
+        components' shares of overall_score (default DEFAULT_BLEND), plus the
+        semantic component's when the match has one. skill_match_score is the
+        share of job skills found in any section with a non-zero weight, the
+        same skills matched_skills and missing_skills list; resume_skills lists
+        every skill in the resume.
+        """
+        weights = DEFAULT_SECTION_WEIGHTS if weights is None else weights
+        blend = DEFAULT_BLEND if blend is None else blend
+
+        # A job skill is matched once any weighted section mentions it, so
+        # spreading skills over several sections does not dilute the match
+        weighted_skills = {skill for name, score in self.sections.items() if weights.get(name, 0.0) > 0
+                           for skill in score.skills}
+        matched = weighted_skills & set(self.job_skills)
+        missing = sorted(set(self.job_skills) - weighted_skills)
+
+        similarity_score = self._weighted(weights, 'similarity')
+        skill_match_score = len(matched) / len(self.job_skills) * 100 if self.job_skills else 0.0
+        overall_score = similarity_score * blend['similarity'] + skill_match_score * blend['skills']
+        if self.semantic is not None:
+            overall_score += self.semantic * blend.get('semantic', 0.0)
+        recommendations = ResumeJobScorer.generate_recommendations(missing, overall_score)
+        report = {
+            'overall_score': round(overall_score, 2),
+            'similarity_score': round(similarity_score, 2),
+            'skill_match_score': round(skill_match_score, 2),
+            'resume_skills': self.resume_skills,
+            'job_skills': self.job_skills,
+            'matched_skills': sorted(matched),
+            'missing_skills': missing,
+            'recommendations': recommendations,
+            'section_scores': [{
+                'section': name,
+                'weight': weights.get(name, 0.0),
+                'similarity_score': round(score.similarity, 2),
+                'skill_match_score': round(score.skill_match, 2),
+                'skills': score.skills,
+            } for name, score in self.sections.items()],
+        }
+        if self.semantic is not None:
+            report['semantic_score'] = round(self.semantic, 2)
+        return report
+
+
+def section_match(scorer, resume_text, job_description):
+    """Segment, vectorize and skill-scan a resume once against a job, as a SectionMatch"""
+    sections = cached_segment(resume_text, scorer.cache)
+    job_skills = scorer.extract_skills(job_description)
+    processed_job = scorer.preprocess_text(job_description)
+    processed_sections = [scorer.preprocess_text(body) for _, body in sections]
+
+    similarities = [0.0] * len(sections)
+    if processed_job and any(processed_sections):
+        # One TF-IDF pass over the job and every section (IDF across them when unfitted)
+        documents = [processed_job] + processed_sections
+        try:
+            if scorer.fitted:
+                matrix = scorer.vectorizer.transform(documents)
+            else:
+                matrix = scorer._make_vectorizer().fit_transform(documents)
+            cosines = (matrix[1:] @ matrix[0].T).toarray().ravel()
+            similarities = [min(float(cosine) * 100, 100) for cosine in cosines]
+        except ValueError:
+            pass  # Only stop words on both sides: every similarity stays 0
+
+    scores = {}
+    for (name, body), similarity in zip(sections, similarities):
+        skills = scorer.extract_skills(body)
+        matched = set(skills) & set(job_skills)
+        skill_match = len(matched) / len(job_skills) * 100 if job_skills else 0.0
+        scores[name] = SectionScore(similarity, skills, skill_match)
+
+    semantic = None
+    if scorer.semantic is not None:
+        semantic = scorer.semantic_similarity(scorer.preprocess_text(resume_text), processed_job)
+    return SectionMatch(scores, job_skills, scorer.extract_skills(resume_text), semantic)
@@ -0,0 +1,229 @@
+"""Latent semantic (LSA) similarity and dense embedding pools
+
+TF-IDF cosine only credits words two documents share, so "PostgreSQL" and
+"relational databases" score as unrelated. SemanticModel fits a truncated SVD
+of a TF-IDF matrix built from a local corpus of preprocessed resumes; terms
+that keep appearing in the same documents load on the same components, so
+documents using either wording land close together in the reduced space.
+Fitting and embedding only need scikit-learn and run offline on the CPU.
+
+Embeddings are L2-normalized float32 rows, so cosine similarity is a dot
+product. EmbeddingPool keeps a pool of them, optionally quantized to int8
+with one scale per row (a quarter of the float32 size, with cosines within
+about 0.01), and ranks it against a query in row blocks: one dense
+matrix-vector product and an argpartition per block, so temporaries stay
+bounded and memory-mapped pools only page in the block being scored.
+
+Give a fitted model to ResumeJobScorer(semantic=...) to add a
+'semantic_score' component to analyze_match; the blend's 'semantic' weight
+sets its share of overall_score.
+"""
+import json
+import os
+import pickle
+
+import numpy as np
+
+DEFAULT_COMPONENTS = 128
+
+# Vocabulary cap of the model's own TF-IDF
+DEFAULT_MAX_FEATURES = 20000
+
+# Rows scored per block; 8192 rows of 128 float32s are 4 MB
+BLOCK_ROWS = 8192
+
+# Environment variable with the path of a saved model for the apps
+SEMANTIC_MODEL_ENV = 'RESUME_SCORER_SEMANTIC_MODEL'
+
+
+def normalize_rows(vectors):
+    """float32 copy of vectors with unit-length rows (all-zero rows stay zero)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def quantize(vectors):
+    """(int8 codes, float32 per-row scales) with codes * scale ~= vectors"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def load_model(path):
+    """Load a SemanticModel saved with SemanticModel.save()"""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class SemanticModel:
+    """Truncated-SVD projection of TF-IDF vectors into a small dense space"""
+
+    def __init__(self, n_components=DEFAULT_COMPONENTS, max_features=DEFAULT_MAX_FEATURES):
+        self.n_components = n_components
+        self.max_features = max_features
+        self.vectorizer = None
+        # (n_components, n_terms) float32 projection
+        self.components = None
+
+    @property
+    def fitted(self):
+        return self.components is not None
+
+    @property
+    def dimensions(self):
+        return self.components.shape[0]
+
+    def fit(self, processed_documents, random_state=0):
+        """Fit the TF-IDF vocabulary and SVD on preprocessed documents"""
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        processed = [doc for doc in processed_documents if doc]
+        if not processed:
+            raise ValueError("Cannot fit a semantic model on an empty corpus")
+
+        vectorizer = TfidfVectorizer(max_features=self.max_features, stop_words='english',
+                                     sublinear_tf=True)
+        matrix = vectorizer.fit_transform(processed)
+        # TruncatedSVD needs fewer components than terms
+        n_components = min(self.n_components, matrix.shape[1] - 1)
+        if n_components < 1:
+            raise ValueError("Semantic model corpus needs at least two distinct terms")
+        svd = TruncatedSVD(n_components=n_components, algorithm='randomized', random_state=random_state)
+        svd.fit(matrix)
+
+        self.vectorizer = vectorizer
+        self.components = svd.components_.astype(np.float32)
+        return self
+
+    def embed(self, processed_documents):
+        """(n, dimensions) unit-length float32 embeddings of preprocessed documents
+
+        Documents with no known terms embed to zero vectors.
+        """
+        if not self.fitted:
+            raise ValueError("SemanticModel is not fitted; call fit first")
+        matrix = self.vectorizer.transform(list(processed_documents))
+        return normalize_rows(matrix @ self.components.T)
+
+    def similarity(self, processed_resume, processed_job):
+        """Cosine of two preprocessed documents in the semantic space, as 0-100"""
+        if not processed_resume or not processed_job:
+            return 0.0
+        resume_vector, job_vector = self.embed([processed_resume, processed_job])
+        return min(max(float(resume_vector @ job_vector) * 100, 0.0), 100.0)
+
+    def similarities(self, processed_resumes, processed_job):
+        """similarity() of many preprocessed resumes against one job, in one embedding pass"""
+        if not processed_job:
+            return [0.0] * len(processed_resumes)
+        vectors = self.embed(list(processed_resumes) + [processed_job])
+        cosines = vectors[:-1] @ vectors[-1]
+        return [min(max(float(cosine) * 100, 0.0), 100.0) if resume else 0.0
+                for resume, cosine in zip(processed_resumes, cosines)]
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class EmbeddingPool:
+    """Dense document embeddings (float32, or int8 with row scales) ranked by cosine
+
+    A saved pool is a directory of keys.json, vectors.npy and, when
+    quantized, scales.npy; load() memory-maps the arrays.
+    """
+
+    def __init__(self, keys, vectors, scales=None):
+        if len(keys) != len(vectors):
+            raise ValueError(f"{len(keys)} keys for {len(vectors)} vectors")
+        self.keys = list(keys)
+        self.vectors = vectors
+        self.scales = scales
+
+    @classmethod
+    def from_vectors(cls, keys, vectors, quantized=False):
+        """Pool of unit-length vectors, stored as int8 when quantized"""
+        if quantized:
+            codes, scales = quantize(vectors)
+            return cls(keys, codes, scales)
+        return cls(keys, np.asarray(vectors, dtype=np.float32))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = 'r' if mmap else None
+        with open(os.path.join(path, 'keys.json'), encoding='utf-8') as f:
+            keys = json.load(f)
+        vectors = np.load(os.path.join(path, 'vectors.npy'), mmap_mode=mode)
+        scales = None
+        if os.path.exists(os.path.join(path, 'scales.npy')):
+            scales = np.load(os.path.join(path, 'scales.npy'), mmap_mode=mode)
+        return cls(keys, vectors, scales)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'vectors.npy'), np.asarray(self.vectors))
+        if self.scales is not None:
+            np.save(os.path.join(path, 'scales.npy'), np.asarray(self.scales))
+        elif os.path.exists(os.path.join(path, 'scales.npy')):
+            os.remove(os.path.join(path, 'scales.npy'))
+        with open(os.path.join(path, 'keys.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.keys, f)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def quantized(self):
+        return self.scales is not None
+
+    def _block_cosines(self, query, start, stop):
+        block = self.vectors[start:stop]
+        if self.scales is None:
+            return block @ query
+        return (block.astype(np.float32) @ query) * self.scales[start:stop]
+
+    def cosines(self, query, block_rows=BLOCK_ROWS):
+        """Cosine of every pooled vector with a unit-length query"""
+        query = np.asarray(query, dtype=np.float32)
+        cosines = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), block_rows):
+            stop = min(start + block_rows, len(self))
+            cosines[start:stop] = self._block_cosines(query, start, stop)
+        return cosines
+
+    def top_k(self, query, k=10, block_rows=BLOCK_ROWS):
+        """[(key, cosine)] of the k pooled vectors closest to a unit-length query, best first
+
+        Each block keeps only its own k best rows, so at most k rows per block
+        are ever compared globally. Ties go to the earlier row.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        k = min(k, len(self))
+        if k <= 0:
+            return []
+
+        rows = []
+        values = []
+        for start in range(0, len(self), block_rows):
+            stop = min(start + block_rows, len(self))
+            cosines = self._block_cosines(query, start, stop)
+            if len(cosines) > k:
+                best = np.argpartition(-cosines, k - 1)[:k]
+                # argpartition picks arbitrarily among rows tied with the k-th
+                kth = cosines[best].min()
+                best = np.concatenate([np.flatnonzero(cosines > kth),
+                                       np.flatnonzero(cosines == kth)])[:k]
+            else:
+                best = np.arange(len(cosines))
+            rows.append(best + start)
+            values.append(cosines[best])
+
+        rows = np.concatenate(rows)
+        values = np.concatenate(values)
+        order = np.lexsort((rows, -values))[:k]
+        return [(self.keys[row], float(values[i])) for i, row in zip(order.tolist(), rows[order].tolist())]
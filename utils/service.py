@@ -0,0 +1,429 @@
+"""Asyncio HTTP scoring service with per-job micro-batching
+
+Endpoints (JSON in, JSON out):
+
+    GET  /health   status, queue depth and counters
+    POST /match    {"resume": ..., "job": ...}              -> analysis
+    POST /batch    {"resumes": [...], "job": ...}           -> {"results": [...]}
+    POST /top-k    {"job": ..., "k": 10, "resumes": [...]}  -> {"results": [...]}
+
+CPU work runs in a process pool. Resumes from concurrent requests that
+target the same job description are merged into one analyze_many call,
+dispatched once max_batch resumes are waiting or max_wait seconds after the
+first one arrived. Once max_pending resumes are queued or running, new
+requests get 503 with Retry-After instead of piling up. /top-k without
+"resumes" queries a CandidateIndex loaded into every worker.
+
+If a worker process dies, the pool is replaced and the tasks it took down
+are retried once in the new pool; a task that crashes its worker again
+fails on its own. /health reports "degraded" while the pool is broken.
+
+Merging across requests only happens with a scorer fitted on a reference
+corpus (or an index's scorer), whose frozen vocabulary makes analyze_many
+match analyze_match. An unfitted scorer fits on each batch, so then every
+request is dispatched whole as its own batch: /batch scores are the batch
+CLI's for the same files, and /match is analyze_match.
+"""
+import asyncio
+import json
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.cache import content_hash
+from utils.scoring import ResumeJobScorer
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT = 0.01
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Seconds a client may take to send a complete request
+READ_TIMEOUT = 30
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    408: 'Request Timeout',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+# Scorer and optional candidate index owned by each pool worker
+_worker_scorer = None
+_worker_index = None
+
+
+class HTTPError(Exception):
+    """An error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _init_worker(scorer, index_path):
+    global _worker_scorer, _worker_index
+    # Forked workers inherit the event loop's signal wakeup fd; a broken pool
+    # SIGTERMs its workers, which would otherwise stop the parent service too
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if index_path:
+        from utils.index import CandidateIndex
+        _worker_index = CandidateIndex.load(index_path)
+        _worker_scorer = _worker_index.scorer
+    else:
+        _worker_scorer = scorer if scorer is not None else ResumeJobScorer()
+
+
+def _analyze_batch(resumes, job_description):
+    """Analyze resumes against one job in a worker process"""
+    return _worker_scorer.analyze_many(resumes, job_description)
+
+
+def _index_top_k(job_description, k):
+    """Top-K candidates from the worker's index as [{'key', 'analysis'}]"""
+    return [{'key': key, 'analysis': analysis} for key, analysis in _worker_index.top_k(job_description, k)]
+
+
+class WorkerPool:
+    """Process pool that replaces itself when one of its workers dies"""
+
+    def __init__(self, workers, initializer, initargs):
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.restarts = 0
+        self.executor = self._start()
+
+    def _start(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer,
+                                   initargs=self.initargs)
+
+    @property
+    def broken(self):
+        # Set by the executor as soon as it notices a dead worker
+        return getattr(self.executor, '_broken', False)
+
+    def _replace(self, executor):
+        # Concurrent tasks that saw the same crash replace the pool only once
+        if executor is self.executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._start()
+            self.restarts += 1
+
+    async def run(self, function, *args):
+        """function(*args) in a worker, retried once in a fresh pool if the pool breaks"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                return await loop.run_in_executor(executor, function, *args)
+            except BrokenProcessPool:
+                self._replace(executor)
+        raise RuntimeError("A worker process crashed twice while handling this request")
+
+    def shutdown(self):
+        # Waiting costs nothing at exit, where the workers are joined anyway, and
+        # avoids a race with the interpreter's own executor cleanup
+        self.executor.shutdown(cancel_futures=True)
+
+
+class MicroBatcher:
+    """Groups resumes for the same job into batches dispatched to a WorkerPool"""
+
+    def __init__(self, pool, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT,
+                 max_pending=DEFAULT_MAX_PENDING, merge=True):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        # Without merge, each request's resumes are one batch of their own
+        self.merge = merge
+        # job hash -> (job description, [(resume, future)], flush timer)
+        self.groups = {}
+        # Dispatched batches, kept referenced until they finish
+        self.tasks = set()
+        self.pending = 0
+        self.batches = 0
+        self.batched_resumes = 0
+
+    def check_capacity(self, count):
+        """Raise an HTTPError if count more resumes would exceed max_pending"""
+        if count > self.max_pending:
+            raise HTTPError(413, f"At most {self.max_pending} resumes per request")
+        if self.pending + count > self.max_pending:
+            raise HTTPError(503, f"Server busy: {self.pending} resumes pending", {'Retry-After': '1'})
+
+    async def run(self, count, function, *args):
+        """function(*args) in the pool, counting count resumes as pending meanwhile"""
+        self.check_capacity(count)
+        self.pending += count
+        try:
+            return await self.pool.run(function, *args)
+        finally:
+            self.pending -= count
+
+    async def analyze(self, resumes, job_description):
+        """Analyze resumes against a job, sharing batches with concurrent requests"""
+        if not self.merge:
+            self.batches += 1
+            self.batched_resumes += len(resumes)
+            return await self.run(len(resumes), _analyze_batch, resumes, job_description)
+
+        self.check_capacity(len(resumes))
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in resumes]
+        self.pending += len(resumes)
+
+        key = content_hash(job_description)
+        for resume, future in zip(resumes, futures):
+            group = self.groups.get(key)
+            if group is None:
+                timer = loop.call_later(self.max_wait, self._flush, key)
+                group = self.groups[key] = (job_description, [], timer)
+            group[1].append((resume, future))
+            if len(group[1]) >= self.max_batch:
+                self._flush(key)
+
+        return await asyncio.gather(*futures)
+
+    def _flush(self, key):
+        group = self.groups.pop(key, None)
+        if group is None:
+            return
+        job_description, items, timer = group
+        timer.cancel()
+        self.batches += 1
+        self.batched_resumes += len(items)
+        task = asyncio.ensure_future(self._run(job_description, items))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, job_description, items):
+        try:
+            results = await self.pool.run(_analyze_batch, [resume for resume, _ in items], job_description)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.pending -= len(items)
+
+    def stats(self):
+        return {
+            'pending': self.pending,
+            'merging': self.merge,
+            'batches': self.batches,
+            'batched_resumes': self.batched_resumes,
+            'mean_batch_size': round(self.batched_resumes / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def _field(body, name, kind):
+    value = body.get(name)
+    if not isinstance(value, kind):
+        raise HTTPError(400, f"'{name}' is required and must be a {kind.__name__}")
+    return value
+
+
+class JSONService:
+    """Minimal HTTP/1.1 JSON server; subclasses fill self.routes with (method, path) -> handler"""
+
+    def __init__(self, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        self.max_body_bytes = max_body_bytes
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.routes = {}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {'error': str(e)}, e.headers, keep_alive=False)
+                    break
+                except asyncio.TimeoutError:
+                    await self._respond(writer, 408, {'error': "Request timed out"}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, body, keep_alive = request
+                status, payload, headers = await self._dispatch(method, path, body)
+                await self._respond(writer, status, payload, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """Return (method, path, body bytes, keep-alive) or None at end of stream"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPError(400, "Incomplete request")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request headers too large")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ')
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HTTPError(413, f"Request body over the {self.max_body_bytes} byte limit")
+        body = await reader.readexactly(length) if length else b''
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, target.split('?', 1)[0], body, keep_alive
+
+    async def _dispatch(self, method, path, body):
+        """Run a route, returning (status, payload, extra headers)"""
+        self.requests += 1
+        try:
+            handler = self.routes.get((method, path))
+            if handler is None:
+                if any(route_path == path for _, route_path in self.routes):
+                    raise HTTPError(405, f"{method} not allowed on {path}")
+                raise HTTPError(404, f"No route for {path}")
+
+            if method == 'POST':
+                try:
+                    body = json.loads(body or b'{}')
+                except ValueError:
+                    raise HTTPError(400, "Request body must be JSON")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "Request body must be a JSON object")
+            return 200, await handler(body), {}
+        except HTTPError as e:
+            self.errors += 1
+            return e.status, {'error': str(e)}, e.headers
+        except Exception as e:
+            self.errors += 1
+            return 500, {'error': str(e)}, {}
+
+    async def _respond(self, writer, status, payload, headers=None, keep_alive=True):
+        data = json.dumps(payload).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(data)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8000):
+        """Accept connections until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Release resources held by the service; called when serve() stops"""
+
+
+async def run(service, host, port):
+    """Serve until interrupted, shutting the worker pool down on SIGTERM too"""
+    task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        await service.serve(host, port)
+    except asyncio.CancelledError:
+        pass
+
+
+class ScoringService(JSONService):
+    """HTTP front end: parses requests, applies limits and routes to the batcher"""
+
+    def __init__(self, scorer=None, workers=1, index_path=None, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait=DEFAULT_MAX_WAIT, max_pending=DEFAULT_MAX_PENDING,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        super().__init__(max_body_bytes)
+        self.workers = workers
+        self.index_path = index_path
+        self.fitted = bool(index_path) or (scorer is not None and scorer.fitted)
+        self.pool = WorkerPool(workers, _init_worker, (scorer, index_path))
+        self.batcher = MicroBatcher(self.pool, max_batch=max_batch, max_wait=max_wait,
+                                    max_pending=max_pending, merge=self.fitted)
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/match'): self.match,
+            ('POST', '/batch'): self.batch,
+            ('POST', '/top-k'): self.top_k,
+        }
+
+    async def health(self, body):
+        return {
+            'status': 'degraded' if self.pool.broken else 'ok',
+            'workers': self.workers,
+            'pool_restarts': self.pool.restarts,
+            'index': bool(self.index_path),
+            'fitted': self.fitted,
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'requests': self.requests,
+            'errors': self.errors,
+            **self.batcher.stats(),
+        }
+
+    async def match(self, body):
+        resume = _field(body, 'resume', str)
+        job_description = _field(body, 'job', str)
+        return (await self.batcher.analyze([resume], job_description))[0]
+
+    async def batch(self, body):
+        resumes = _field(body, 'resumes', list)
+        job_description = _field(body, 'job', str)
+        if not all(isinstance(resume, str) for resume in resumes):
+            raise HTTPError(400, "'resumes' must be a list of strings")
+        return {'results': await self.batcher.analyze(resumes, job_description)}
+
+    async def top_k(self, body):
+        job_description = _field(body, 'job', str)
+        k = body.get('k', 10)
+        if not isinstance(k, int) or k < 0:
+            raise HTTPError(400, "'k' must be a non-negative integer")
+
+        if 'resumes' not in body:
+            if not self.index_path:
+                raise HTTPError(400, "No candidate index loaded; pass 'resumes' to rank")
+            return {'results': await self.batcher.run(1, _index_top_k, job_description, k)}
+
+        results = (await self.batch(body))['results']
+        # Best score first; ties go to the earlier resume
+        order = sorted(range(len(results)), key=lambda i: (-results[i]['overall_score'], i))[:k]
+        return {'results': [{'index': i, 'analysis': results[i]} for i in order]}
+
+    def close(self):
+        self.pool.shutdown()
@@ -0,0 +1,247 @@
+"""Sharded scatter-gather top-K ranking across worker nodes
+
+A resume pool too large for one machine is split into shards, each a
+CorpusStore holding a contiguous slice of the pool. build_shards() fits one
+scorer on the whole pool and vectorizes every shard with it, so a resume
+gets the same scores whichever shard holds it.
+
+ShardWorker serves one shard over HTTP (see utils/service.py for the
+server):
+
+    GET  /health   shard name, document count, scorer fingerprint
+    POST /top-k    {"job": ..., "k": 10}
+                   -> {"shard", "scorer", "documents", "results": [{"position", "key", "analysis"}]}
+
+ShardCoordinator sends a job to every shard at once, waits at most timeout
+seconds for each (trying a shard's replica URLs in turn), and merges the
+partial lists. Every shard ranks by the reported overall_score with ties to
+its earlier document, and the pool order is shard order then document
+order, so the global top K is always within the union of the local top Ks.
+Merging them by (overall_score, shard, position) gives exactly the ranking
+of analyze_match over the whole pool with ties to the earlier resume.
+Shards that fail or time out are reported rather than silently dropped.
+
+CoordinatorService puts a coordinator behind the same HTTP interface, so
+clients only need one address.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from utils.corpus import CorpusStore
+from utils.service import DEFAULT_MAX_BODY_BYTES, HTTPError, JSONService, _field
+
+# Seconds to wait for one shard's answer before trying its next replica
+DEFAULT_TIMEOUT = 10.0
+
+# Shard directory names inside a build_shards() output directory
+SHARD_NAME = 'shard-{:03d}'
+
+ShardedTopK = namedtuple('ShardedTopK', ['results', 'failed'])
+
+
+def shard_paths(path):
+    """Shard directories of a build_shards() output directory, in pool order"""
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith('shard-'))
+
+
+def build_shards(path, resumes, shards, scorer):
+    """Split (key, resume text) pairs into shards contiguous CorpusStores under path
+
+    The scorer is fitted once on every resume first; returns the shard paths.
+    """
+    resumes = list(resumes)
+    if shards < 1:
+        raise ValueError("Need at least one shard")
+    scorer.fit(text for _, text in resumes)
+
+    os.makedirs(path)
+    paths = []
+    size = -(-len(resumes) // shards) if resumes else 0
+    for number in range(shards):
+        shard_path = os.path.join(path, SHARD_NAME.format(number))
+        store = CorpusStore.create(shard_path, scorer)
+        store.add_many(resumes[number * size:(number + 1) * size])
+        paths.append(shard_path)
+    return paths
+
+
+def scorer_fingerprint(store_path):
+    """Hash of a store's pickled scorer; shards are only comparable when theirs match"""
+    with open(os.path.join(store_path, 'scorer.pkl'), 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def merge_top_k(partials, k):
+    """Global top k of per-shard lists, best first
+
+    partials maps shard number to that shard's results, each a dict with
+    'position' and 'analysis'; ties go to the earlier shard, then position.
+    """
+    merged = [dict(result, shard=shard) for shard, results in partials.items() for result in results]
+    merged.sort(key=lambda result: (-result['analysis']['overall_score'], result['shard'], result['position']))
+    return merged[:k]
+
+
+async def request_json(url, method, path, payload=None):
+    """(status, decoded JSON body) of one HTTP request to a JSON service"""
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        head = [f"{method} {parts.path.rstrip('/')}{path} HTTP/1.1",
+                f"Host: {parts.netloc}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(data)}",
+                "Connection: close"]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+        lines = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ')[1])
+        length = None
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        body = await (reader.readexactly(length) if length is not None else reader.read())
+        return status, json.loads(body or b'null')
+    finally:
+        writer.close()
+
+
+class ShardWorker(JSONService):
+    """Serves local top-K queries against one CorpusStore shard"""
+
+    def __init__(self, store_path, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        super().__init__(max_body_bytes)
+        self.store = CorpusStore(store_path)
+        self.name = os.path.basename(os.path.normpath(store_path))
+        self.fingerprint = scorer_fingerprint(store_path)
+        # Unpickle the scorer now rather than on the first, timed, query
+        self.store.scorer
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/top-k'): self.top_k,
+        }
+
+    async def health(self, body):
+        return {
+            'status': 'ok',
+            'shard': self.name,
+            'scorer': self.fingerprint,
+            'documents': len(self.store),
+            'requests': self.requests,
+            'errors': self.errors,
+        }
+
+    def _top_k(self, job_description, k):
+        return [{'position': self.store.key_ids[key], 'key': key, 'analysis': analysis}
+                for key, analysis in self.store.top_k(job_description, k)]
+
+    async def top_k(self, body):
+        job_description = _field(body, 'job', str)
+        k = body.get('k', 10)
+        if not isinstance(k, int) or k < 0:
+            raise HTTPError(400, "'k' must be a non-negative integer")
+        # Scoring is NumPy-heavy; a thread keeps /health answering meanwhile
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, self._top_k, job_description, k)
+        return {'shard': self.name, 'scorer': self.fingerprint, 'documents': len(self.store),
+                'results': results}
+
+
+class ShardCoordinator:
+    """Broadcasts top-K queries to shard workers and merges their answers
+
+    shards lists one entry per shard, in pool order: a worker URL, or a list
+    of replica URLs serving copies of the same shard.
+    """
+
+    def __init__(self, shards, timeout=DEFAULT_TIMEOUT):
+        self.shards = [[urls] if isinstance(urls, str) else list(urls) for urls in shards]
+        self.timeout = timeout
+
+    async def _query_shard(self, urls, job_description, k):
+        """The first replica's answer, or raise with the last replica's error"""
+        error = None
+        for url in urls:
+            try:
+                status, payload = await asyncio.wait_for(
+                    request_json(url, 'POST', '/top-k', {'job': job_description, 'k': k}), self.timeout)
+            except asyncio.TimeoutError:
+                error = f"{url} timed out after {self.timeout:g}s"
+                continue
+            except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                error = f"{url} failed: {e}"
+                continue
+            if status == 200:
+                return payload
+            error = f"{url} answered {status}: {(payload or {}).get('error')}"
+        raise RuntimeError(error)
+
+    async def top_k(self, job_description, k=10):
+        """ShardedTopK of the merged results and {shard number: error} for shards that failed
+
+        Each result is a shard worker's result plus its 'shard' number.
+        Raises ValueError when shards answer with different scorers, since
+        their scores would not be comparable.
+        """
+        answers = await asyncio.gather(*(self._query_shard(urls, job_description, k) for urls in self.shards),
+                                       return_exceptions=True)
+        partials = {}
+        failed = {}
+        for number, answer in enumerate(answers):
+            if isinstance(answer, Exception):
+                failed[number] = str(answer)
+            else:
+                partials[number] = answer
+
+        fingerprints = {answer['scorer'] for answer in partials.values()}
+        if len(fingerprints) > 1:
+            raise ValueError("Shards were vectorized with different scorers; rebuild them with build_shards")
+        return ShardedTopK(merge_top_k({number: answer['results'] for number, answer in partials.items()}, k),
+                           failed)
+
+    def top_k_sync(self, job_description, k=10):
+        """top_k() from synchronous code"""
+        return asyncio.run(self.top_k(job_description, k))
+
+
+class CoordinatorService(JSONService):
+    """HTTP front end for a ShardCoordinator
+
+    POST /top-k {"job": ..., "k": 10, "allow_partial": false} answers 503
+    when a shard is unavailable, unless allow_partial is set, in which case
+    the response lists the missing shards under "failed".
+    """
+
+    def __init__(self, coordinator, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        super().__init__(max_body_bytes)
+        self.coordinator = coordinator
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/top-k'): self.top_k,
+        }
+
+    async def health(self, body):
+        return {
+            'status': 'ok',
+            'shards': len(self.coordinator.shards),
+            'requests': self.requests,
+            'errors': self.errors,
+        }
+
+    async def top_k(self, body):
+        job_description = _field(body, 'job', str)
+        k = body.get('k', 10)
+        if not isinstance(k, int) or k < 0:
+            raise HTTPError(400, "'k' must be a non-negative integer")
+        results, failed = await self.coordinator.top_k(job_description, k)
+        if failed and not body.get('allow_partial'):
+            raise HTTPError(503, f"{len(failed)} of {len(self.coordinator.shards)} shards unavailable: " +
+                            "; ".join(failed.values()), {'Retry-After': '1'})
+        return {'results': results, 'failed': {str(number): error for number, error in failed.items()}}
@@ -0,0 +1,156 @@
+import hashlib
+import pickle
+import re
+from collections import namedtuple
+
+# Default skill vocabulary
+COMMON_SKILLS = [
+    'python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'angular',
+    'node', 'express', 'django', 'flask', 'mongodb', 'mysql', 'postgresql',
+    'aws', 'azure', 'docker', 'kubernetes', 'git', 'jenkins', 'linux', 'unix',
+    'machine learning', 'data analysis', 'statistics', 'tableau', 'power bi',
+    'excel', 'word', 'powerpoint', 'project management', 'agile', 'scrum',
+    'communication', 'leadership', 'teamwork', 'problem solving', 'analytical',
+    'c++', 'c#', 'php', 'ruby', 'go', 'swift', 'kotlin', 'typescript',
+    'vue', 'angularjs', 'jquery', 'bootstrap', 'sass', 'less',
+    'rest', 'api', 'graphql', 'microservices', 'ci/cd', 'devops',
+    'tensorflow', 'pytorch', 'keras', 'pandas', 'numpy', 'scikit',
+    'big data', 'hadoop', 'spark', 'kafka', 'elasticsearch',
+    'ui/ux', 'photoshop', 'figma', 'adobe', 'illustrator'
+]
+
+# A token is either an alphanumeric run with optional trailing '+'/'#' (c++, c#)
+# or a single symbol, so 'ci/cd' tokenizes as ['ci', '/', 'cd'] and 'java'
+# can never match inside 'javascript'
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+[+#]*|[^\sa-z0-9]', re.IGNORECASE)
+
+# Phrase-table value for a token sequence that only prefixes longer skills
+_PREFIX = -1
+
+# Bump when the serialized matcher layout changes
+INDEX_VERSION = 1
+
+SkillMatch = namedtuple('SkillMatch', ['skill', 'start', 'end'])
+
+
+def tokenize(text):
+    """Split text into lowercase skill-matching tokens"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class SkillMatcher:
+    """Phrase-table matcher that finds every known skill in one pass over the text"""
+
+    def __init__(self, skills=None):
+        # Space-joined token sequence -> skill id, or _PREFIX for prefixes of
+        # longer phrases. Tokens never contain spaces, so keys are unambiguous
+        self.phrases = {}
+        self.names = []
+        self.name_ids = {}
+        self._fingerprint = None
+        for skill in (COMMON_SKILLS if skills is None else skills):
+            self.add(skill)
+
+    @property
+    def size(self):
+        return len(self.names)
+
+    def add(self, phrase, name=None):
+        """Register a skill phrase, reported as name (title-cased phrase by default)"""
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+
+        self._fingerprint = None
+        if name is None:
+            name = phrase.title()
+        skill_id = self.name_ids.get(name)
+        if skill_id is None:
+            skill_id = self.name_ids[name] = len(self.names)
+            self.names.append(name)
+
+        key = tokens[0]
+        for token in tokens[1:]:
+            self.phrases.setdefault(key, _PREFIX)
+            key += ' ' + token
+
+        # The first registration of a phrase wins
+        if self.phrases.get(key, _PREFIX) == _PREFIX:
+            self.phrases[key] = skill_id
+
+    def find(self, text):
+        """Return a SkillMatch with character positions for every skill in text"""
+        if not text:
+            return []
+
+        spans = list(TOKEN_PATTERN.finditer(text))
+        tokens = [span.group().lower() for span in spans]
+        phrases = self.phrases
+        names = self.names
+        matches = []
+
+        # Report the longest phrase starting at each token and resume after it,
+        # so tokens inside a match never match again; each probe is one hash
+        # lookup, so the scan is linear in text length for any vocabulary size
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            value = phrases.get(token)
+            if value is None:
+                i += 1
+                continue
+
+            best = None
+            key = token
+            j = i
+            while value is not None:
+                if value != _PREFIX:
+                    best = (value, j)
+                j += 1
+                if j == len(tokens):
+                    break
+                key += ' ' + tokens[j]
+                value = phrases.get(key)
+
+            if best is None:
+                i += 1
+                continue
+            skill_id, last = best
+            matches.append(SkillMatch(names[skill_id], spans[i].start(), spans[last].end()))
+            i = last + 1
+
+        return matches
+
+    def skills_in(self, text):
+        """Return the distinct skill names found in text, in order of appearance"""
+        return list(dict.fromkeys(match.skill for match in self.find(text)))
+
+    def fingerprint(self):
+        """Hash of the vocabulary, so caches of extracted skills notice taxonomy changes"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=8)
+            for key, value in self.phrases.items():
+                digest.update(f'{key}\t{value}\n'.encode())
+            digest.update('\n'.join(self.names).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def save(self, path):
+        """Serialize the compiled phrase table to a binary index file"""
+        with open(path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'names': self.names, 'phrases': self.phrases},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Load a matcher previously written with save()"""
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported skill index version in {path}")
+
+        matcher = cls(skills=[])
+        matcher.names = data['names']
+        matcher.phrases = data['phrases']
+        matcher.name_ids = {name: i for i, name in enumerate(matcher.names)}
+        return matcher
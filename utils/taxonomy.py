@@ -0,0 +1,121 @@
+import csv
+import functools
+import json
+import os
+import pickle
+
+from utils.skills import SkillMatcher
+
+
+class SkillTaxonomy:
+    """Canonical skills with their aliases, compiled into a SkillMatcher"""
+
+    def __init__(self):
+        # Canonical skill -> list of aliases, in load order
+        self.skills = {}
+
+    def __len__(self):
+        return len(self.skills)
+
+    def add(self, skill, aliases=()):
+        """Add a canonical skill and any aliases that should resolve to it"""
+        skill = skill.strip()
+        if not skill:
+            return
+        known = self.skills.setdefault(skill, [])
+        for alias in aliases:
+            alias = alias.strip()
+            if alias and alias not in known:
+                known.append(alias)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a taxonomy from a CSV, JSON or plain-text file
+
+        CSV:  'skill,aliases' rows with aliases separated by '|'
+        JSON: {"Kubernetes": ["k8s"], ...} or [{"skill": ..., "aliases": [...]}, ...]
+        TXT:  one canonical skill per line
+        """
+        taxonomy = cls()
+        extension = os.path.splitext(path)[1].lower()
+
+        with open(path, encoding='utf-8') as f:
+            if extension == '.json':
+                data = json.load(f)
+                if isinstance(data, dict):
+                    data = [{'skill': skill, 'aliases': aliases} for skill, aliases in data.items()]
+                for entry in data:
+                    taxonomy.add(entry['skill'], entry.get('aliases') or [])
+            elif extension == '.csv':
+                for row in csv.DictReader(f):
+                    aliases = (row.get('aliases') or '').split('|')
+                    taxonomy.add(row['skill'], aliases)
+            else:
+                for line in f:
+                    if not line.startswith('#'):
+                        taxonomy.add(line)
+
+        return taxonomy
+
+    def compile(self):
+        """Build a matcher that resolves every alias to its canonical skill"""
+        matcher = SkillMatcher(skills=[])
+        # Canonical names first so they win over a clashing alias of another skill
+        for skill in self.skills:
+            matcher.add(skill, skill)
+        for skill, aliases in self.skills.items():
+            for alias in aliases:
+                matcher.add(alias, skill)
+        return matcher
+
+
+def load_skill_matcher(path, index_path=None):
+    """Load a compiled matcher for a taxonomy file, rebuilding its index when stale
+
+    The binary index is written next to the source file (or to index_path) so
+    later loads skip parsing and compilation.
+    """
+    if index_path is None:
+        index_path = path + '.idx'
+
+    if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(path):
+        try:
+            return SkillMatcher.load(index_path)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            pass  # Fall through and rebuild a corrupt or outdated index
+
+    matcher = SkillTaxonomy.from_file(path).compile()
+    try:
+        matcher.save(index_path)
+    except OSError:
+        pass  # Read-only location: use the in-memory matcher
+    return matcher
+
+
+@functools.lru_cache(maxsize=None)
+def default_skill_matcher():
+    """Matcher for the built-in skill list, built once and shared by every scorer"""
+    return SkillMatcher()
+
+
+@functools.lru_cache(maxsize=16)
+def _shared_file_matcher(path, mtime):
+    return load_skill_matcher(path)
+
+
+def resolve_skill_matcher(taxonomy):
+    """Turn a taxonomy argument (None, path, SkillTaxonomy or SkillMatcher) into a matcher
+
+    Matchers for the built-in list and for taxonomy files are shared process-wide
+    (a file is reloaded when it changes); they are read-only once built.
+    """
+    if taxonomy is None:
+        return default_skill_matcher()
+    if isinstance(taxonomy, SkillMatcher):
+        return taxonomy
+    if isinstance(taxonomy, SkillTaxonomy):
+        return taxonomy.compile()
+    if str(taxonomy).endswith('.idx'):
+        return SkillMatcher.load(taxonomy)
+    path = os.path.abspath(str(taxonomy))
+    return _shared_file_matcher(path, os.path.getmtime(path))